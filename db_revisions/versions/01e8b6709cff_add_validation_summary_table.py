@@ -0,0 +1,41 @@
+"""add validation summary table
+
+Revision ID: 01e8b6709cff
+Revises: 27fd1b6b25e0
+Create Date: 2026-10-19 14:02:37.510648
+
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = "01e8b6709cff"
+down_revision: Union[str, None] = "27fd1b6b25e0"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        "validation_summary",
+        sa.Column("id", sa.INTEGER, autoincrement=True),
+        sa.Column("submission", sa.Integer, nullable=False),
+        sa.Column("validation_id", sa.String, nullable=False),
+        sa.Column("severity", sa.String, nullable=False),
+        sa.Column("scope", sa.String, nullable=True),
+        sa.Column("field_name", sa.String, nullable=True),
+        sa.Column("finding_count", sa.Integer, nullable=False),
+        sa.Column("record_count", sa.Integer, nullable=False),
+        sa.PrimaryKeyConstraint("id", name="validation_summary_pkey"),
+        sa.ForeignKeyConstraint(["submission"], ["submission.id"], name="validation_summary_submission_fkey"),
+    )
+    op.create_index("ix_validation_summary_submission", "validation_summary", ["submission"])
+
+
+def downgrade() -> None:
+    op.drop_index("ix_validation_summary_submission", table_name="validation_summary")
+    op.drop_table("validation_summary")
@@ -0,0 +1,70 @@
+"""Add SUBMISSION_SUPERSEDED state
+
+Revision ID: 27fd1b6b25e0
+Revises: 6ec12afa5b37
+Create Date: 2026-10-19 10:14:52.318204
+
+"""
+
+from typing import Sequence, Union
+
+from alembic import op, context
+from sqlalchemy.dialects import postgresql
+
+
+# revision identifiers, used by Alembic.
+revision: str = "27fd1b6b25e0"
+down_revision: Union[str, None] = "6ec12afa5b37"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+old_submission_state = postgresql.ENUM(
+    "SUBMISSION_ACCEPTED",
+    "SUBMISSION_STARTED",
+    "SUBMISSION_UPLOADED",
+    "SUBMISSION_UPLOAD_MALFORMED",
+    "UPLOAD_FAILED",
+    "VALIDATION_EXPIRED",
+    "VALIDATION_IN_PROGRESS",
+    "VALIDATION_WITH_ERRORS",
+    "VALIDATION_WITH_WARNINGS",
+    "VALIDATION_SUCCESSFUL",
+    "VALIDATION_ERROR",
+    name="submissionstate",
+    create_type=False,
+)
+
+new_submission_state = postgresql.ENUM(
+    "SUBMISSION_ACCEPTED",
+    "SUBMISSION_STARTED",
+    "SUBMISSION_UPLOADED",
+    "SUBMISSION_UPLOAD_MALFORMED",
+    "UPLOAD_FAILED",
+    "VALIDATION_EXPIRED",
+    "VALIDATION_IN_PROGRESS",
+    "VALIDATION_WITH_ERRORS",
+    "VALIDATION_WITH_WARNINGS",
+    "VALIDATION_SUCCESSFUL",
+    "VALIDATION_ERROR",
+    "SUBMISSION_SUPERSEDED",
+    name="submissionstate",
+    create_type=False,
+)
+
+
+def upgrade() -> None:
+    if "sqlite" not in context.get_context().dialect.name:
+        op.execute("ALTER TYPE submissionstate RENAME TO submissionstate_old")
+        new_submission_state.create(op.get_bind(), checkfirst=True)
+        op.execute("ALTER TABLE submission ALTER COLUMN state TYPE submissionstate USING state::text::submissionstate")
+        op.execute("DROP TYPE submissionstate_old")
+
+
+def downgrade() -> None:
+    if "sqlite" not in context.get_context().dialect.name:
+        op.execute("UPDATE submission SET state = 'VALIDATION_EXPIRED' WHERE state = 'SUBMISSION_SUPERSEDED'")
+        op.execute("ALTER TYPE submissionstate RENAME TO submissionstate_old")
+        old_submission_state.create(op.get_bind(), checkfirst=True)
+        op.execute("ALTER TABLE submission ALTER COLUMN state TYPE submissionstate USING state::text::submissionstate")
+        op.execute("DROP TYPE submissionstate_old")
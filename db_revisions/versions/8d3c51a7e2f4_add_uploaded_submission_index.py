@@ -0,0 +1,33 @@
+"""add partial index on uploaded submissions
+
+Revision ID: 8d3c51a7e2f4
+Revises: 01e8b6709cff
+Create Date: 2026-10-19 16:41:08.226371
+
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = "8d3c51a7e2f4"
+down_revision: Union[str, None] = "01e8b6709cff"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_index(
+        "ix_submission_uploaded",
+        "submission",
+        ["submission_time"],
+        postgresql_where=sa.text("state = 'SUBMISSION_UPLOADED'"),
+        sqlite_where=sa.text("state = 'SUBMISSION_UPLOADED'"),
+    )
+
+
+def downgrade() -> None:
+    op.drop_index("ix_submission_uploaded", table_name="submission")
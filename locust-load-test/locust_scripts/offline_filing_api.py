@@ -0,0 +1,40 @@
+import os
+import random
+import logging
+import ujson
+
+import weighted_filing_api
+
+from locust import events
+from report import write_summary
+
+logger = logging.getLogger(__name__)
+
+LEIS = []
+
+
+@events.test_start.add_listener
+def load_leis(environment, **kwargs):
+    global LEIS
+    with open(os.getenv("OFFLINE_LEI_FILE", "./locust-load-test/reports/offline_leis.json")) as f:
+        LEIS = ujson.load(f)
+
+
+@events.test_stop.add_listener
+def report(environment, **kwargs):
+    write_summary(environment, os.getenv("OFFLINE_REPORT", "./locust-load-test/reports/offline_summary.json"))
+
+
+class OfflineFilingApiUser(weighted_filing_api.FilingApiUser):
+    """
+    Runs the weighted scenarios against the stub app in locust-load-test/offline, where the bearer
+    token is simply the LEI the user is associated with, so no Keycloak users need to be created.
+    """
+
+    def on_start(self):
+        self.user_id = ""
+        self.lei = random.choice(LEIS)
+        self.token = self.lei
+
+    def on_stop(self):
+        pass
@@ -0,0 +1,34 @@
+import logging
+import os
+import ujson
+
+logger = logging.getLogger(__name__)
+
+PERCENTILES = [0.5, 0.95, 0.99]
+
+
+def stats_summary(entry) -> dict:
+    return {
+        "requests": entry.num_requests,
+        "failures": entry.num_failures,
+        "rps": round(entry.total_rps, 2),
+        "avg_ms": round(entry.avg_response_time, 2),
+        "max_ms": round(entry.max_response_time or 0, 2),
+        **{f"p{int(p * 100)}_ms": entry.get_response_time_percentile(p) for p in PERCENTILES},
+    }
+
+
+def write_summary(environment, path: str) -> dict:
+    """
+    Writes a latency and throughput summary for the run, per endpoint and in aggregate, as json
+    """
+    stats = environment.stats
+    summary = {
+        "total": stats_summary(stats.total),
+        "endpoints": {f"{e.method} {e.name}": stats_summary(e) for e in stats.entries.values()},
+    }
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    with open(path, "w") as f:
+        ujson.dump(summary, f, indent=2)
+    logger.info("Load test summary written to %s: %s", path, summary["total"])
+    return summary
@@ -0,0 +1,153 @@
+"""
+Bulk seeds a filing period and ready-to-sign filings for the offline load test.
+
+The generated LEIs are written out as a json list so the locust users can pick from them.
+
+Run with `poetry run python locust-load-test/offline/seed.py --count 500`
+"""
+
+import argparse
+import asyncio
+import logging
+import os
+import ujson
+
+from datetime import datetime, timedelta
+
+from sqlalchemy import delete, insert, select, union
+
+from sbl_filing_api.entities.engine.engine import engine
+from sbl_filing_api.entities.models.dao import (
+    ContactInfoDAO,
+    FilingDAO,
+    FilingPeriodDAO,
+    FilingSignatureDAO,
+    FilingTaskProgressDAO,
+    SubmissionDAO,
+    UserActionDAO,
+    ValidationSummaryDAO,
+)
+from sbl_filing_api.entities.models.model_enums import FilingType, UserActionType
+
+log = logging.getLogger(__name__)
+
+LEI_PREFIX = "LOCUSTTESTBANK"
+
+
+def generate_leis(count: int) -> list[str]:
+    return [f"{LEI_PREFIX}{i:06d}" for i in range(count)]
+
+
+async def clear(period: str, leis: list[str]):
+    async with engine.begin() as conn:
+        filing_ids = select(FilingDAO.id).filter(FilingDAO.filing_period == period, FilingDAO.lei.in_(leis))
+        submission_ids = select(SubmissionDAO.id).filter(SubmissionDAO.filing.in_(filing_ids))
+        # the seeded creators, and the submitters, accepters and signers added by the load test, are gathered before
+        # the rows pointing at them go, otherwise they're left behind on every rerun
+        user_action_ids = (
+            await conn.scalars(
+                union(
+                    select(FilingDAO.creator_id).filter(FilingDAO.id.in_(filing_ids)),
+                    select(SubmissionDAO.submitter_id).filter(SubmissionDAO.filing.in_(filing_ids)),
+                    select(SubmissionDAO.accepter_id).filter(
+                        SubmissionDAO.filing.in_(filing_ids), SubmissionDAO.accepter_id.is_not(None)
+                    ),
+                    select(FilingSignatureDAO.user_action).filter(FilingSignatureDAO.filing.in_(filing_ids)),
+                )
+            )
+        ).all()
+        await conn.execute(delete(FilingSignatureDAO).filter(FilingSignatureDAO.filing.in_(filing_ids)))
+        await conn.execute(delete(FilingTaskProgressDAO).filter(FilingTaskProgressDAO.filing.in_(filing_ids)))
+        await conn.execute(delete(ValidationSummaryDAO).filter(ValidationSummaryDAO.submission.in_(submission_ids)))
+        await conn.execute(delete(SubmissionDAO).filter(SubmissionDAO.filing.in_(filing_ids)))
+        await conn.execute(delete(ContactInfoDAO).filter(ContactInfoDAO.filing.in_(filing_ids)))
+        await conn.execute(delete(FilingDAO).filter(FilingDAO.id.in_(filing_ids)))
+        await conn.execute(delete(UserActionDAO).filter(UserActionDAO.id.in_(user_action_ids)))
+
+
+async def seed(period: str, leis: list[str]):
+    now = datetime.now()
+    async with engine.begin() as conn:
+        if not await conn.scalar(select(FilingPeriodDAO.code).filter(FilingPeriodDAO.code == period)):
+            await conn.execute(
+                insert(FilingPeriodDAO).values(
+                    code=period,
+                    description=f"Locust Filing Period {period}",
+                    start_period=now - timedelta(days=30),
+                    end_period=now + timedelta(days=365),
+                    due=now + timedelta(days=365),
+                    filing_type=FilingType.ANNUAL,
+                )
+            )
+
+        creator_ids = (
+            await conn.scalars(
+                insert(UserActionDAO).returning(UserActionDAO.id),
+                [
+                    {
+                        "user_id": f"locust-{lei}",
+                        "user_name": f"locust {lei}",
+                        "user_email": f"locust_{lei}@local.host",
+                        "action_type": UserActionType.CREATE,
+                    }
+                    for lei in leis
+                ],
+            )
+        ).all()
+
+        filing_ids = (
+            await conn.scalars(
+                insert(FilingDAO).returning(FilingDAO.id),
+                [
+                    {"filing_period": period, "lei": lei, "creator_id": creator_id, "is_voluntary": False}
+                    for lei, creator_id in zip(leis, creator_ids)
+                ],
+            )
+        ).all()
+
+        await conn.execute(
+            insert(ContactInfoDAO),
+            [
+                {
+                    "filing": filing_id,
+                    "first_name": "locust_first_name",
+                    "last_name": "locust_last_name",
+                    "hq_address_street_1": "address street 1",
+                    "hq_address_city": "Test City",
+                    "hq_address_state": "TS",
+                    "hq_address_zip": "12345",
+                    "phone_number": "112-345-6789",
+                    "email": "locust@local.host",
+                }
+                for filing_id in filing_ids
+            ],
+        )
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Seed filings for the offline locust load test.")
+    parser.add_argument("--count", type=int, default=int(os.getenv("OFFLINE_LEI_COUNT", "100")))
+    parser.add_argument("--period", default=os.getenv("OFFLINE_PERIOD", "2024"))
+    parser.add_argument(
+        "--lei-file", default=os.getenv("OFFLINE_LEI_FILE", "./locust-load-test/reports/offline_leis.json")
+    )
+    args = parser.parse_args()
+
+    leis = generate_leis(args.count)
+
+    async def _run():
+        await clear(args.period, leis)
+        await seed(args.period, leis)
+        await engine.dispose()
+
+    asyncio.run(_run())
+
+    os.makedirs(os.path.dirname(args.lei_file), exist_ok=True)
+    with open(args.lei_file, "w") as f:
+        ujson.dump(leis, f)
+    log.info("Seeded %d filings for period %s, LEIs written to %s", len(leis), args.period, args.lei_file)
+
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO)
+    main()
@@ -0,0 +1,97 @@
+"""
+Times rendering a get_filings style response of ORM objects, through FastAPI's response_model handling and through
+DTOResponse, to compare the serialization cost each read endpoint pays per request without a database or a server.
+
+Each filing has a creator, contact info and two signatures.  The best of `--repeat` runs is reported for each path.
+
+Run from the root of the repo: `poetry run python locust-load-test/offline/serialization_benchmark.py --count 1000`
+"""
+
+import argparse
+import asyncio
+import json
+import timeit
+
+from datetime import datetime
+from typing import List
+
+from fastapi.responses import JSONResponse
+from fastapi.routing import serialize_response
+from fastapi.utils import create_model_field
+
+from sbl_filing_api.entities.models.dao import ContactInfoDAO, FilingDAO, UserActionDAO
+from sbl_filing_api.entities.models.dto import FilingDTO
+from sbl_filing_api.entities.models.model_enums import UserActionType
+from sbl_filing_api.routers.responses import DTOResponse
+
+
+def build_user_action(id: int, action_type: UserActionType) -> UserActionDAO:
+    return UserActionDAO(
+        id=id,
+        user_id=f"{id:08d}-7890-ABCDEF-GHIJ",
+        user_name=f"Test User {id}",
+        user_email=f"user_{id}@email.test",
+        action_type=action_type,
+        timestamp=datetime.now(),
+    )
+
+
+def build_filings(count: int) -> List[FilingDAO]:
+    return [
+        FilingDAO(
+            id=i,
+            filing_period="2024",
+            lei=f"LOCUSTTESTBANK{i:06d}",
+            institution_snapshot_id="v1",
+            confirmation_id=None,
+            is_voluntary=False,
+            creator_id=i * 3,
+            creator=build_user_action(i * 3, UserActionType.CREATE),
+            contact_info=ContactInfoDAO(
+                id=i,
+                filing=i,
+                first_name=f"First {i}",
+                last_name=f"Last {i}",
+                hq_address_street_1=f"{i} Test Street",
+                hq_address_city="Test City",
+                hq_address_state="TS",
+                hq_address_zip="12345",
+                email=f"contact_{i}@email.test",
+                phone_number="112-345-6789",
+                phone_ext="x54321",
+            ),
+            signatures=[build_user_action(i * 3 + j, UserActionType.SIGN) for j in (1, 2)],
+        )
+        for i in range(count)
+    ]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--count", type=int, default=1000, help="Number of filings in the response")
+    parser.add_argument("--repeat", type=int, default=20, help="Number of timed runs of each path")
+    args = parser.parse_args()
+
+    filings = build_filings(args.count)
+    # the same response field FastAPI builds for a route with response_model=List[FilingDTO]
+    field = create_model_field("Response_get_filings", List[FilingDTO], mode="serialization")
+    loop = asyncio.new_event_loop()
+
+    def response_model_path() -> bytes:
+        return JSONResponse(loop.run_until_complete(serialize_response(field=field, response_content=filings))).body
+
+    def dto_response_path() -> bytes:
+        return DTOResponse(filings, List[FilingDTO]).body
+
+    # also builds DTOResponse's cached TypeAdapter before anything is timed
+    assert json.loads(response_model_path()) == json.loads(dto_response_path())
+
+    print(f"List[FilingDTO] of {args.count} filings, best of {args.repeat} runs")
+    for name, path in [("FastAPI response_model", response_model_path), ("DTOResponse", dto_response_path)]:
+        best = min(timeit.repeat(path, number=1, repeat=args.repeat))
+        print(f"- {name}: {best * 1000:.1f}ms")
+    loop.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,59 @@
+"""
+Offline variant of the filing-api app for load testing without Keycloak or the user_fi service.
+
+Authentication is replaced with a stub backend that trusts the bearer token as the LEI the caller
+is associated with, and a stand-in institution endpoint is mounted on the same app so the
+sign and submit validators have an institution to validate against.
+
+Run with `poetry run uvicorn stub_app:app --app-dir locust-load-test/offline --port 8888`
+"""
+
+import os
+
+# must be set before sbl_filing_api.config is imported so the request validators call back into this app
+os.environ.setdefault("USER_FI_API_URL", f"http://localhost:{os.getenv('OFFLINE_PORT', '8888')}/stub/institutions/")
+os.environ.setdefault("MAIL_API_URL", f"http://localhost:{os.getenv('OFFLINE_PORT', '8888')}/stub/mail")
+
+from fastapi import Request  # noqa: E402
+from starlette.authentication import AuthCredentials, AuthenticationError, UnauthenticatedUser  # noqa: E402
+
+from regtech_api_commons.models.auth import AuthenticatedUser  # noqa: E402
+from regtech_api_commons.oauth2.oauth2_backend import BearerTokenAuthBackend  # noqa: E402
+
+
+async def stub_authenticate(self, conn):
+    auth = conn.headers.get("authorization")
+    if not auth:
+        return AuthCredentials("unauthenticated"), UnauthenticatedUser()
+    scheme, _, token = auth.partition(" ")
+    if scheme.lower() != "bearer" or not token:
+        raise AuthenticationError("Invalid auth header")
+    claims = {
+        "name": f"locust {token}",
+        "preferred_username": f"locust_{token}",
+        "email": f"locust_{token}@local.host",
+        "institutions": [token],
+        "sub": f"locust-{token}"[:36],
+    }
+    return AuthCredentials(["authenticated"]), AuthenticatedUser.from_claim(claims)
+
+
+BearerTokenAuthBackend.authenticate = stub_authenticate
+
+from sbl_filing_api.main import app  # noqa: E402
+
+
+@app.get("/stub/institutions/{lei}")
+async def stub_institution(lei: str):
+    return {
+        "lei": lei,
+        "name": f"Locust Test Bank {lei}",
+        "tax_id": "12-3456789",
+        "lei_status_code": "ISSUED",
+        "lei_status": {"code": "ISSUED", "name": "Issued", "can_file": True},
+    }
+
+
+@app.post("/stub/mail")
+async def stub_mail(request: Request):
+    return {"status": "sent"}
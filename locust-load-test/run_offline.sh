@@ -0,0 +1,31 @@
+#!/bin/sh
+# Runs the weighted locust scenarios against a locally started, auth-stubbed filing-api backed by local Postgres.
+# Run from the root of the repo: `sh locust-load-test/run_offline.sh`
+set -e
+
+export ENV=${ENV:-LOCAL}
+export OFFLINE_PORT=${OFFLINE_PORT:-8888}
+export OFFLINE_LEI_FILE=${OFFLINE_LEI_FILE:-./locust-load-test/reports/offline_leis.json}
+export OFFLINE_REPORT=${OFFLINE_REPORT:-./locust-load-test/reports/offline_summary.json}
+export SBLAR_LOCATION=${SBLAR_LOCATION:-./locust-load-test/sblars}
+
+poetry run alembic upgrade head
+poetry run python locust-load-test/offline/seed.py --count "${OFFLINE_LEI_COUNT:-100}"
+
+cd src
+poetry run uvicorn stub_app:app --app-dir ../locust-load-test/offline --port "$OFFLINE_PORT" --workers "${OFFLINE_WORKERS:-4}" --log-level warning &
+APP_PID=$!
+cd ..
+trap 'kill $APP_PID' EXIT
+
+until curl -s -o /dev/null "http://localhost:$OFFLINE_PORT/docs"; do sleep 1; done
+
+poetry run locust \
+    --locustfile locust-load-test/locust_scripts/offline_filing_api.py \
+    --host "http://localhost:$OFFLINE_PORT" \
+    --users "${OFFLINE_USERS:-20}" \
+    --spawn-rate "${OFFLINE_SPAWN_RATE:-10}" \
+    --run-time "${OFFLINE_RUN_TIME:-2m}" \
+    --csv locust-load-test/reports/offline \
+    --html locust-load-test/reports/offline_report.html \
+    --headless
@@ -1,5 +1,6 @@
 from enum import StrEnum
 import os
+import tempfile
 from urllib import parse
 from typing import Any, Set
 
@@ -46,6 +47,10 @@ class Settings(BaseSettings):
     db_host: str
     db_scheme: str = "postgresql+asyncpg"
     db_logging: bool = False
+    """
+    Migrations normally run once per deployment with python -m sbl_filing_api.migrate, instead of in each worker
+    """
+    db_migrate_on_startup: bool = False
     conn: PostgresDsn | None = None
 
     fs_upload_config: FsUploadConfig
@@ -55,6 +60,21 @@ class Settings(BaseSettings):
     submission_file_type: str = "text/csv"
     submission_file_extension: str = "csv"
     submission_file_size: int = 2 * (1024**3)
+    submission_read_chunk_size: int = 1024**2
+    """
+    Rows at the start of an upload checked for a well formed header and field counts before it's accepted; 0 disables
+    the check
+    """
+    submission_preflight_rows: int = 100
+    """
+    Keeps a Parquet copy of a submission next to its csv, which validation reads instead of the csv, for submissions
+    validated in shards or validated again
+    """
+    submission_parquet_cache: bool = True
+    """
+    Default, and largest, number of submissions a page of a filing's submissions holds
+    """
+    submissions_page_size: int = 100
 
     expired_submission_check_secs: int = 120
 
@@ -65,6 +85,58 @@ class Settings(BaseSettings):
     max_json_records: int = 10000
     max_json_group_size: int = 200
 
+    validation_batch_size: int = 50000
+    """
+    Submissions with more than this many records are validated in shards across processes; 0 disables sharding
+    """
+    sharded_validation_min_records: int = 0
+    sharded_validation_workers: int = 4
+
+    """
+    Host wide limit on concurrent validations across all uvicorn workers, further uploads wait in each worker's queue
+    and are turned away with a 503 once it holds validation_max_queue submissions
+    """
+    validation_concurrency: int = 2
+    """
+    Number of uvicorn worker processes, read from the WEB_CONCURRENCY uvicorn itself uses; each worker's validation
+    pool is sized to its share of validation_concurrency
+    """
+    web_concurrency: int = 1
+    validation_max_queue: int = 100
+    validation_max_per_lei: int = 1
+    validation_aging_records_per_sec: int = 1000
+    validation_records_per_sec: int = 10000
+    validation_dispatch_retry_secs: float = 1.0
+    """
+    Uploads waiting longer than this for validation are taken to be stuck, and left out of queue estimates
+    """
+    validation_queue_max_age_secs: int = 3600
+    validation_polars_threads: int = 4
+    validation_retry_after_secs: int = 30
+    validation_slot_dir: str = os.path.join(tempfile.gettempdir(), "sbl_filing_validation_slots")
+    validation_max_tasks_per_child: int = 10
+    """
+    Resident memory ceiling in bytes for a validation worker, a submission going over it is set to VALIDATION_ERROR
+    """
+    validation_max_rss: int = 4 * (1024**3)
+    validation_rss_check_secs: float = 0.5
+    validation_warm_workers: bool = True
+    """
+    How long startup waits for the validation pool's workers to spawn and warm up before serving without them
+    """
+    validation_warm_timeout_secs: float = 120
+    """
+    Cancels validations of a filing's earlier submissions still queued or running when a newer one is uploaded
+    """
+    supersede_validations: bool = False
+
+    export_batch_size: int = 500
+    """
+    Responses of at least this many bytes are gzip compressed for clients that accept it; 0 disables compression
+    """
+    response_compression_min_size: int = 1000
+    response_compression_level: int = 6
+
     def __init__(self, **data):
         super().__init__(**data)
 
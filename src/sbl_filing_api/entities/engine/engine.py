@@ -1,3 +1,7 @@
+import ujson
+
+from typing import Any
+
 from sqlalchemy.ext.asyncio import (
     create_async_engine,
     async_sessionmaker,
@@ -7,8 +11,19 @@ from sqlalchemy.pool import NullPool
 from asyncio import current_task
 from sbl_filing_api.config import settings
 
+
+def json_serializer(value: Any) -> str:
+    # ujson escapes "/" as "\/" by default, which json doesn't, and the stored text is passed through to responses
+    return ujson.dumps(value, escape_forward_slashes=False)
+
+
+# validation_results can hold thousands of findings, ujson (de)serializes them several times faster than json
 engine = create_async_engine(
-    settings.conn.unicode_string(), echo=settings.db_logging, poolclass=NullPool
+    settings.conn.unicode_string(),
+    echo=settings.db_logging,
+    poolclass=NullPool,
+    json_serializer=json_serializer,
+    json_deserializer=ujson.loads,
 ).execution_options(schema_translate_map={None: settings.db_schema})
 SessionLocal = async_scoped_session(async_sessionmaker(engine, expire_on_commit=False), current_task)
 
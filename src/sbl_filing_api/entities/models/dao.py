@@ -2,7 +2,7 @@ from sbl_filing_api.entities.models.model_enums import FilingType, FilingTaskSta
 from datetime import datetime
 from typing import Any, List
 from sqlalchemy import Enum as SAEnum, String, desc
-from sqlalchemy import ForeignKey, func, UniqueConstraint
+from sqlalchemy import ForeignKey, Index, func, text, UniqueConstraint
 from sqlalchemy.orm import Mapped, mapped_column, DeclarativeBase, relationship
 from sqlalchemy.ext.asyncio import AsyncAttrs
 from sqlalchemy.types import JSON
@@ -38,12 +38,35 @@ class SubmissionDAO(Base):
     filename: Mapped[str]
     total_records: Mapped[int] = mapped_column(nullable=True)
 
-    __table_args__ = (UniqueConstraint("filing", "counter", name="unique_filing_counter"),)
+    __table_args__ = (
+        UniqueConstraint("filing", "counter", name="unique_filing_counter"),
+        Index(
+            "ix_submission_uploaded",
+            "submission_time",
+            postgresql_where=text("state = 'SUBMISSION_UPLOADED'"),
+            sqlite_where=text("state = 'SUBMISSION_UPLOADED'"),
+        ),
+    )
 
     def __str__(self):
         return f"Submission ID: {self.id}, Counter: {self.counter}, State: {self.state}, Ruleset: {self.validation_ruleset_version}, Filing Period: {self.filing}, Submission: {self.submission_time}"
 
 
+class ValidationSummaryDAO(Base):
+    __tablename__ = "validation_summary"
+    id: Mapped[int] = mapped_column(primary_key=True, autoincrement=True)
+    submission: Mapped[int] = mapped_column(ForeignKey("submission.id"), index=True)
+    validation_id: Mapped[str]
+    severity: Mapped[str]
+    scope: Mapped[str] = mapped_column(nullable=True)
+    field_name: Mapped[str] = mapped_column(nullable=True)
+    finding_count: Mapped[int]
+    record_count: Mapped[int]
+
+    def __str__(self):
+        return f"Submission ID: {self.submission}, Validation: {self.validation_id}, Severity: {self.severity}, Field: {self.field_name}, Findings: {self.finding_count}, Records: {self.record_count}"
+
+
 class FilingPeriodDAO(Base):
     __tablename__ = "filing_period"
     code: Mapped[str] = mapped_column(primary_key=True)
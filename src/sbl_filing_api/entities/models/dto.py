@@ -32,6 +32,19 @@ class SubmissionDTO(SubmissionBaseDTO):
     model_config = ConfigDict(from_attributes=True)
 
     validation_results: Dict[str, Any] | None = None
+    queue_position: int | None = None
+    validation_eta: datetime | None = None
+
+
+class ValidationSummaryDTO(BaseModel):
+    model_config = ConfigDict(from_attributes=True)
+
+    validation_id: str
+    severity: str
+    scope: str | None = None
+    field_name: str | None = None
+    finding_count: int
+    record_count: int
 
 
 class FilingTaskDTO(BaseModel):
@@ -96,6 +109,42 @@ class FilingDTO(BaseModel):
     is_voluntary: bool | None = None
 
 
+class SubmissionSummaryDTO(BaseModel):
+    model_config = ConfigDict(from_attributes=True)
+
+    id: int
+    counter: int
+    state: SubmissionState
+    submission_time: datetime | None = None
+    total_records: int | None = None
+    syntax_error_count: int | None = None
+    logic_error_count: int | None = None
+    logic_warning_count: int | None = None
+
+
+class FilingStatusDTO(BaseModel):
+    model_config = ConfigDict(from_attributes=True)
+
+    filing: FilingDTO
+    latest_submission: SubmissionSummaryDTO | None = None
+
+
+class FilingExportDTO(BaseModel):
+    model_config = ConfigDict(from_attributes=True)
+
+    id: int
+    lei: str
+    filing_period: str
+    institution_snapshot_id: str | None = None
+    is_voluntary: bool | None = None
+    confirmation_id: str | None = None
+    contact_info: ContactInfoDTO | None = None
+    signatures: List[UserActionDTO] = []
+    latest_submission_counter: int | None = None
+    latest_submission_state: SubmissionState | None = None
+    latest_submission_time: datetime | None = None
+
+
 class FilingPeriodDTO(BaseModel):
     model_config = ConfigDict(from_attributes=True)
 
@@ -13,6 +13,7 @@ class SubmissionState(str, Enum):
     SUBMISSION_STARTED = "SUBMISSION_STARTED"
     SUBMISSION_UPLOAD_MALFORMED = "SUBMISSION_UPLOAD_MALFORMED"
     SUBMISSION_UPLOADED = "SUBMISSION_UPLOADED"
+    SUBMISSION_SUPERSEDED = "SUBMISSION_SUPERSEDED"
     UPLOAD_FAILED = "UPLOAD_FAILED"
     VALIDATION_ERROR = "VALIDATION_ERROR"
     VALIDATION_EXPIRED = "VALIDATION_EXPIRED"
@@ -30,3 +31,8 @@ class FilingTaskState(str, Enum):
 
 class FilingType(str, Enum):
     ANNUAL = "ANNUAL"
+
+
+class ExportFormat(str, Enum):
+    NDJSON = "ndjson"
+    CSV = "csv"
@@ -1,9 +1,14 @@
 import logging
 
-from sqlalchemy import select, desc
-from sqlalchemy.orm import defer, QueryableAttribute
+from datetime import datetime
+from sqlalchemy import Text, and_, cast, delete, inspect, null, select, desc, func, update, Select, Subquery
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlalchemy.engine import Row
+from sqlalchemy.orm import defer, noload, selectinload, QueryableAttribute
+from sqlalchemy.orm.interfaces import ORMOption
+from sqlalchemy.types import JSON
 from sqlalchemy.ext.asyncio import AsyncSession
-from typing import Any, List, TypeVar
+from typing import Any, AsyncGenerator, Collection, List, TypeVar
 from sbl_filing_api.entities.engine.engine import SessionLocal
 
 from regtech_api_commons.models.auth import AuthenticatedUser
@@ -19,6 +24,7 @@ from sbl_filing_api.entities.models.dao import (
     FilingTaskState,
     ContactInfoDAO,
     UserActionDAO,
+    ValidationSummaryDAO,
 )
 from sbl_filing_api.entities.models.dto import FilingPeriodDTO, FilingDTO, ContactInfoDTO, UserActionDTO
 from sbl_filing_api.entities.models.model_enums import SubmissionState
@@ -32,12 +38,67 @@ class NoFilingPeriodException(Exception):
     pass
 
 
-async def get_submissions(session: AsyncSession, lei: str = None, filing_period: str = None) -> List[SubmissionDAO]:
+def dialect_insert(session: AsyncSession):
+    """
+    The INSERT construct of the session's database, which unlike the generic one supports ON CONFLICT
+    """
+    return postgresql.insert if session.get_bind().dialect.name == "postgresql" else sqlite.insert
+
+
+def sparse_load_options(table_obj: T, fields: Collection[str] | None) -> List[ORMOption]:
+    """
+    Load options that leave out the table's relationships and JSON columns not among the requested fields, so what a
+    sparse response won't include is never queried.  No fields loads everything as usual.
+    """
+    if not fields:
+        return []
+    mapper = inspect(table_obj)
+    options = [noload(rel.class_attribute) for rel in mapper.relationships if rel.key not in fields]
+    options += [
+        defer(col.class_attribute)
+        for col in mapper.column_attrs
+        if col.key not in fields and isinstance(col.expression.type, JSON)
+    ]
+    return options
+
+
+async def get_submissions(
+    session: AsyncSession,
+    lei: str = None,
+    filing_period: str = None,
+    fields: Collection[str] | None = None,
+    before: int | None = None,
+    limit: int | None = None,
+) -> List[SubmissionDAO]:
+    """
+    Gets submissions newest counter first.  A filing's submissions are paged through by counter, `before` being the
+    last counter of the previous page and `limit` the page size, so each page is a range scan of the filing's
+    counter index however many submissions it has.
+    """
     filing_id = None
     if lei and filing_period:
         filing = await get_filing(session, lei=lei, filing_period=filing_period)
         filing_id = filing.id
-    return await query_helper(session, SubmissionDAO, defers=[SubmissionDAO.validation_results], filing=filing_id)
+    stmt = (
+        select(SubmissionDAO)
+        .options(defer(SubmissionDAO.validation_results), *sparse_load_options(SubmissionDAO, fields))
+        .order_by(desc(SubmissionDAO.counter), desc(SubmissionDAO.id))
+        .limit(limit)
+    )
+    if filing_id is not None:
+        stmt = stmt.filter_by(filing=filing_id)
+    if before is not None:
+        stmt = stmt.where(SubmissionDAO.counter < before)
+    return (await session.scalars(stmt)).all()
+
+
+async def count_submissions(session: AsyncSession, lei: str, filing_period: str) -> int:
+    stmt = (
+        select(func.count(SubmissionDAO.id))
+        .join(FilingDAO, SubmissionDAO.filing == FilingDAO.id)
+        .where(FilingDAO.lei == lei, FilingDAO.filing_period == filing_period)
+    )
+    return await session.scalar(stmt)
 
 
 async def get_latest_submission(session: AsyncSession, lei: str, filing_period: str) -> SubmissionDAO | None:
@@ -46,6 +107,37 @@ async def get_latest_submission(session: AsyncSession, lei: str, filing_period:
     return await session.scalar(stmt)
 
 
+async def get_submission_with_raw_results(
+    session: AsyncSession,
+    lei: str,
+    filing_period: str,
+    counter: int | None = None,
+    fields: Collection[str] | None = None,
+) -> Row | None:
+    """
+    Gets a filing's submission by counter, or its latest submission when no counter is given, alongside its
+    validation_results as the JSON text stored in the database so they can be passed through to a response
+    without being parsed.  Returns None if there's no such filing, and a row with no submission if the filing
+    has no such submission, so callers can tell the two apart without querying the filing first.
+    """
+    raw_results = (
+        cast(SubmissionDAO.validation_results, Text) if not fields or "validation_results" in fields else null()
+    )
+    on_filing = SubmissionDAO.filing == FilingDAO.id
+    if counter is not None:
+        on_filing = and_(on_filing, SubmissionDAO.counter == counter)
+    stmt = (
+        select(SubmissionDAO, raw_results)
+        .select_from(FilingDAO)
+        .outerjoin(SubmissionDAO, on_filing)
+        .options(defer(SubmissionDAO.validation_results), *sparse_load_options(SubmissionDAO, fields))
+        .where(FilingDAO.lei == lei, FilingDAO.filing_period == filing_period)
+    )
+    if counter is None:
+        stmt = stmt.order_by(desc(SubmissionDAO.submission_time)).limit(1)
+    return (await session.execute(stmt)).first()
+
+
 async def get_filing_periods(session: AsyncSession) -> List[FilingPeriodDAO]:
     return await query_helper(session, FilingPeriodDAO)
 
@@ -61,13 +153,23 @@ async def get_submission_by_counter(session: AsyncSession, lei: str, filing_peri
     return result[0] if result else None
 
 
-async def get_filing(session: AsyncSession, lei: str, filing_period: str) -> FilingDAO:
-    result = await query_helper(session, FilingDAO, lei=lei, filing_period=filing_period)
+async def get_filing(
+    session: AsyncSession, lei: str, filing_period: str, fields: Collection[str] | None = None
+) -> FilingDAO:
+    result = await query_helper(
+        session, FilingDAO, options=sparse_load_options(FilingDAO, fields), lei=lei, filing_period=filing_period
+    )
     return result[0] if result else None
 
 
-async def get_filings(session: AsyncSession, leis: list[str], filing_period: str) -> list[FilingDAO]:
-    stmt = select(FilingDAO).filter(FilingDAO.lei.in_(leis), FilingDAO.filing_period == filing_period)
+async def get_filings(
+    session: AsyncSession, leis: list[str], filing_period: str, fields: Collection[str] | None = None
+) -> list[FilingDAO]:
+    stmt = (
+        select(FilingDAO)
+        .options(*sparse_load_options(FilingDAO, fields))
+        .filter(FilingDAO.lei.in_(leis), FilingDAO.filing_period == filing_period)
+    )
     result = (await session.scalars(stmt)).all()
     return result if result else []
 
@@ -77,6 +179,83 @@ async def get_period_filings(session: AsyncSession, filing_period: str) -> List[
     return filings
 
 
+def latest_submission_subquery(filing_ids: Select) -> Subquery:
+    """
+    The latest submission, by submission time, of each of the filings selected by `filing_ids`.  Only those filings'
+    submissions are ranked, and the error counts are only read out of the latest submissions' validation results.
+    """
+    ranked = (
+        select(
+            SubmissionDAO.id,
+            func.row_number()
+            .over(partition_by=SubmissionDAO.filing, order_by=desc(SubmissionDAO.submission_time))
+            .label("rank"),
+        )
+        .where(SubmissionDAO.filing.in_(filing_ids))
+        .subquery("ranked_submission")
+    )
+    return (
+        select(
+            SubmissionDAO.id,
+            SubmissionDAO.filing,
+            SubmissionDAO.counter,
+            SubmissionDAO.state,
+            SubmissionDAO.submission_time,
+            SubmissionDAO.total_records,
+            SubmissionDAO.validation_results[("syntax_errors", "total_count")].as_integer().label("syntax_error_count"),
+            SubmissionDAO.validation_results[("logic_errors", "total_count")].as_integer().label("logic_error_count"),
+            SubmissionDAO.validation_results[("logic_warnings", "total_count")]
+            .as_integer()
+            .label("logic_warning_count"),
+        )
+        .join(ranked, ranked.c.id == SubmissionDAO.id)
+        .where(ranked.c.rank == 1)
+        .subquery("latest_submission")
+    )
+
+
+async def get_filings_status(session: AsyncSession, leis: list[str], filing_period: str) -> list[Row]:
+    """
+    Retrieves the filings for the LEIs along with a summary of each filing's latest submission in a single query
+    """
+    filters = (FilingDAO.lei.in_(leis), FilingDAO.filing_period == filing_period)
+    latest = latest_submission_subquery(select(FilingDAO.id).where(*filters))
+    stmt = (
+        select(FilingDAO, latest)
+        .outerjoin(latest, latest.c.filing == FilingDAO.id)
+        .filter(*filters)
+        .options(noload(FilingDAO.tasks))
+        .order_by(FilingDAO.lei)
+    )
+    return (await session.execute(stmt)).all()
+
+
+async def stream_period_filings(filing_period: str, batch_size: int = 500) -> AsyncGenerator[Row, None]:
+    """
+    Streams every filing in the period, along with its latest submission's counter, state and time, using a server side
+    cursor so only `batch_size` filings are held in memory at a time.  This manages its own session since the rows are
+    consumed while the response is being streamed.
+    """
+    latest = latest_submission_subquery(select(FilingDAO.id).where(FilingDAO.filing_period == filing_period))
+    stmt = (
+        select(
+            FilingDAO,
+            latest.c.counter.label("latest_submission_counter"),
+            latest.c.state.label("latest_submission_state"),
+            latest.c.submission_time.label("latest_submission_time"),
+        )
+        .outerjoin(latest, latest.c.filing == FilingDAO.id)
+        .filter(FilingDAO.filing_period == filing_period)
+        .options(noload(FilingDAO.tasks), noload(FilingDAO.creator))
+        .order_by(FilingDAO.id)
+        .execution_options(yield_per=batch_size)
+    )
+    async with SessionLocal() as session:
+        result = await session.stream(stmt)
+        async for row in result:
+            yield row
+
+
 async def get_filing_period(session: AsyncSession, filing_period: str) -> FilingPeriodDAO:
     result = await query_helper(session, FilingPeriodDAO, code=filing_period)
     return result[0] if result else None
@@ -97,18 +276,31 @@ async def get_user_actions(session: AsyncSession) -> List[UserActionDAO]:
 
 
 async def add_submission(session: AsyncSession, filing_id: int, filename: str, submitter_id: int) -> SubmissionDAO:
-    stmt = select(SubmissionDAO).filter_by(filing=filing_id).order_by(desc(SubmissionDAO.counter)).limit(1)
-    last_sub = await session.scalar(stmt)
-    current_count = last_sub.counter if last_sub else 0
-    new_sub = SubmissionDAO(
-        filing=filing_id,
-        state=SubmissionState.SUBMISSION_STARTED,
-        filename=filename,
-        submitter_id=submitter_id,
-        counter=(current_count + 1),
-    )
-    # this returns the attached object, most importantly with the new submission id
-    new_sub = await session.merge(new_sub)
+    """
+    Adds the filing's next submission, its counter allocated in the same INSERT.  If a concurrent upload to the filing
+    claims that counter first nothing is inserted rather than failing on unique_filing_counter, and the following
+    counter is tried; every miss means another submission was added, so this can't go round indefinitely.
+    """
+    insert = dialect_insert(session)
+    next_counter = (
+        select(func.coalesce(func.max(SubmissionDAO.counter), 0) + 1)
+        .where(SubmissionDAO.filing == filing_id)
+        .scalar_subquery()
+    )
+    stmt = (
+        insert(SubmissionDAO)
+        .values(
+            filing=filing_id,
+            state=SubmissionState.SUBMISSION_STARTED,
+            filename=filename,
+            submitter_id=submitter_id,
+            counter=next_counter,
+        )
+        .on_conflict_do_nothing(index_elements=[SubmissionDAO.filing, SubmissionDAO.counter])
+        .returning(SubmissionDAO)
+    )
+    while (new_sub := await session.scalar(stmt)) is None:
+        logger.info(f"Submission counter for filing {filing_id} was taken by a concurrent upload, retrying.")
     await session.commit()
     return new_sub
 
@@ -117,18 +309,91 @@ async def update_submission(session: AsyncSession, submission: SubmissionDAO) ->
     return await upsert_helper(session, submission, SubmissionDAO)
 
 
+async def set_submission_state(session: AsyncSession, submission_id: int, state: SubmissionState, **values) -> bool:
+    """
+    Sets a submission's state, and any other given columns, with a single UPDATE without loading the submission.
+    A superseded submission is left alone, so a validation finishing late can't overwrite SUBMISSION_SUPERSEDED;
+    returns whether the submission was updated.
+    """
+    stmt = (
+        update(SubmissionDAO)
+        .where(SubmissionDAO.id == submission_id, SubmissionDAO.state != SubmissionState.SUBMISSION_SUPERSEDED)
+        .values(state=state, **values)
+    )
+    updated = (await session.execute(stmt)).rowcount
+    await session.commit()
+    return updated > 0
+
+
 async def expire_submission(submission_id: int):
     async with SessionLocal() as session:
-        submission = await get_submission(session, submission_id)
-        submission.state = SubmissionState.VALIDATION_EXPIRED
-        await upsert_helper(session, submission, SubmissionDAO)
+        await set_submission_state(session, submission_id, SubmissionState.VALIDATION_EXPIRED)
 
 
 async def error_out_submission(submission_id: int):
     async with SessionLocal() as session:
-        submission = await get_submission(session, submission_id)
-        submission.state = SubmissionState.VALIDATION_ERROR
-        await upsert_helper(session, submission, SubmissionDAO)
+        await set_submission_state(session, submission_id, SubmissionState.VALIDATION_ERROR)
+
+
+async def supersede_submissions(session: AsyncSession, filing_id: int, counter: int) -> List[int]:
+    """
+    Marks the filing's earlier submissions still waiting for or in validation as superseded, returning their ids
+    """
+    stmt = (
+        update(SubmissionDAO)
+        .where(
+            SubmissionDAO.filing == filing_id,
+            SubmissionDAO.counter < counter,
+            SubmissionDAO.state.in_([SubmissionState.SUBMISSION_UPLOADED, SubmissionState.VALIDATION_IN_PROGRESS]),
+        )
+        .values(state=SubmissionState.SUBMISSION_SUPERSEDED)
+        .returning(SubmissionDAO.id)
+    )
+    superseded = (await session.execute(stmt)).scalars().all()
+    await session.commit()
+    return list(superseded)
+
+
+async def add_validation_summary(session: AsyncSession, submission_id: int, summary: List[dict[str, Any]]) -> None:
+    # a submission is only validated once, but clear out anything left by an earlier attempt that died part way
+    await session.execute(delete(ValidationSummaryDAO).where(ValidationSummaryDAO.submission == submission_id))
+    session.add_all([ValidationSummaryDAO(submission=submission_id, **row) for row in summary])
+    await session.commit()
+
+
+async def get_validation_summary(
+    session: AsyncSession, lei: str, filing_period: str, counter: int
+) -> List[ValidationSummaryDAO] | None:
+    """
+    Gets a submission's per validation summary without loading the submission itself, and its validation results.
+    Returns None if there's no such submission.
+    """
+    submission_id = await session.scalar(
+        select(SubmissionDAO.id)
+        .join(FilingDAO, SubmissionDAO.filing == FilingDAO.id)
+        .where(FilingDAO.lei == lei, FilingDAO.filing_period == filing_period, SubmissionDAO.counter == counter)
+    )
+    if submission_id is None:
+        return None
+    stmt = (
+        select(ValidationSummaryDAO)
+        .where(ValidationSummaryDAO.submission == submission_id)
+        .order_by(ValidationSummaryDAO.severity, ValidationSummaryDAO.validation_id, ValidationSummaryDAO.field_name)
+    )
+    return (await session.scalars(stmt)).all()
+
+
+async def get_queued_submissions(session: AsyncSession, since: datetime) -> List[Row]:
+    stmt = select(SubmissionDAO.id, SubmissionDAO.total_records, SubmissionDAO.submission_time).where(
+        SubmissionDAO.state == SubmissionState.SUBMISSION_UPLOADED, SubmissionDAO.submission_time >= since
+    )
+    return (await session.execute(stmt)).all()
+
+
+async def get_submission_state(submission_id: int) -> SubmissionState | None:
+    # a fresh session rather than the task's scoped one, whose identity map would hide another session's write
+    async with SessionLocal.session_factory() as session:
+        return await session.scalar(select(SubmissionDAO.state).where(SubmissionDAO.id == submission_id))
 
 
 async def upsert_filing_period(session: AsyncSession, filing_period: FilingPeriodDTO) -> FilingPeriodDAO:
@@ -179,24 +444,63 @@ async def add_user_action(
 
 
 async def upsert_helper(session: AsyncSession, original_data: Any, table_obj: T) -> T:
-    copy_data = original_data.__dict__.copy()
-    # this is only for if a DAO is passed in
-    # Should be DTOs, but hey, it's python
-    if "_sa_instance_state" in copy_data:
-        del copy_data["_sa_instance_state"]
-    new_dao = table_obj(**copy_data)
-    new_dao = await session.merge(new_dao)
+    """
+    Writes a DTO or DAO to the table_obj's table and returns the DAO, with its relationships loaded, without the
+    SELECT of a merge or the reload of a refresh:
+    - a DAO already in the session only has its changes flushed by the commit, relationship changes included
+    - anything else is written with a single INSERT ... ON CONFLICT (primary key) DO UPDATE ... RETURNING, or a
+      plain INSERT ... RETURNING if it has no primary key yet.  Only the table's columns are written.
+    """
+    state = inspect(original_data, raiseerr=False)
+    if state is not None and state.persistent and original_data in session:
+        await session.commit()
+        return original_data
+
+    mapper = inspect(table_obj)
+    # only a DAO's loaded attributes are in its __dict__, so nothing expired or deferred gets overwritten
+    values = {
+        key: value
+        for key, value in original_data.__dict__.items()
+        if key in mapper.column_attrs
+        # leave the database to fill in generated keys and server defaults
+        and not (
+            value is None
+            and (mapper.column_attrs[key].columns[0].primary_key or mapper.column_attrs[key].columns[0].server_default)
+        )
+    }
+    insert = dialect_insert(session)
+    stmt = insert(table_obj).values(**values)
+    primary_key = [col.key for col in mapper.primary_key]
+    if all(key in values for key in primary_key):
+        stmt = stmt.on_conflict_do_update(
+            index_elements=primary_key,
+            set_={key: stmt.excluded[key] for key in values if key not in primary_key},
+        )
+    stmt = (
+        stmt.returning(table_obj)
+        # joined eager loads aren't applied to RETURNING rows, so load those relationships separately
+        .options(
+            *[selectinload(rel.class_attribute) for rel in mapper.relationships if rel.lazy == "joined"]
+        ).execution_options(populate_existing=True)
+    )
+    new_dao = await session.scalar(stmt)
     await session.commit()
-    await session.refresh(new_dao)
     return new_dao
 
 
 async def query_helper(
-    session: AsyncSession, table_obj: T, *, defers: List[QueryableAttribute] | None = None, **filter_args
+    session: AsyncSession,
+    table_obj: T,
+    *,
+    defers: List[QueryableAttribute] | None = None,
+    options: List[ORMOption] | None = None,
+    **filter_args,
 ) -> List[T]:
     stmt = select(table_obj)
     if defers:
         stmt = stmt.options(defer(*defers))
+    if options:
+        stmt = stmt.options(*options)
     # remove empty args
     filter_args = {k: v for k, v in filter_args.items() if v is not None}
     if filter_args:
@@ -1,11 +1,11 @@
 import logging
-import os
 
 from contextlib import asynccontextmanager
 
-from fastapi import FastAPI
+from fastapi import FastAPI, Request
 from fastapi.security import OAuth2AuthorizationCodeBearer
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.middleware.gzip import GZipMiddleware
 from fastapi.exceptions import RequestValidationError
 from starlette.middleware.authentication import AuthenticationMiddleware
 from starlette.exceptions import HTTPException
@@ -20,12 +20,11 @@ from regtech_api_commons.api.exception_handlers import (
     general_exception_handler,
 )
 
-from sbl_filing_api.routers.filing import router as filing_router
+from sbl_filing_api.routers.filing import router as filing_router, validation_pool
 
-from alembic.config import Config
-from alembic import command
-
-from sbl_filing_api.config import kc_settings
+from sbl_filing_api.config import kc_settings, settings
+from sbl_filing_api.entities.engine.engine import engine
+from sbl_filing_api.migrate import run_migrations, verify_db_revision
 
 log = logging.getLogger()
 
@@ -33,25 +32,30 @@ log = logging.getLogger()
 @asynccontextmanager
 async def lifespan(app_: FastAPI):
     log.info("Starting up filing-api server.")
-    log.info("Running alembic migrations...")
-    run_migrations()
-    log.info("Migrations complete, API is ready to start serving requests.")
+    if settings.db_migrate_on_startup:
+        log.info("Running alembic migrations...")
+        run_migrations()
+        log.info("Migrations complete.")
+    await verify_db_revision(engine)
+    if settings.validation_warm_workers:
+        await validation_pool.warm()
+    log.info("API is ready to start serving requests.")
     yield
     log.info("Shutting down filing-api server...")
 
 
-def run_migrations():
-    file_dir = os.path.dirname(os.path.realpath(__file__))
-    alembic_cfg = Config(f"{file_dir}/../../alembic.ini")
-    alembic_cfg.set_main_option("script_location", f"{file_dir}/../../db_revisions")
-    alembic_cfg.set_main_option("prepend_sys_path", f"{file_dir}/../../")
-    command.upgrade(alembic_cfg, "head")
+app = FastAPI(lifespan=lifespan)
 
 
-app = FastAPI(lifespan=lifespan)
+async def regtech_http_exception_with_headers_handler(request: Request, exception: RegTechHttpException):
+    # carry over headers like Retry-After which the common handler doesn't include in its response
+    response = await regtech_http_exception_handler(request, exception)
+    if exception.headers:
+        response.headers.update(exception.headers)
+    return response
 
 
-app.add_exception_handler(RegTechHttpException, regtech_http_exception_handler)  # type: ignore[type-arg]  # noqa: E501
+app.add_exception_handler(RegTechHttpException, regtech_http_exception_with_headers_handler)  # type: ignore[type-arg]  # noqa: E501
 app.add_exception_handler(RequestValidationError, request_validation_error_handler)  # type: ignore[type-arg]  # noqa: E501
 app.add_exception_handler(HTTPException, http_exception_handler)  # type: ignore[type-arg]  # noqa: E501
 app.add_exception_handler(Exception, general_exception_handler)  # type: ignore[type-arg]  # noqa: E501
@@ -67,7 +71,14 @@ app.add_middleware(
     allow_origins=["*"],
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=["X-Total-Count"],
 )
+if settings.response_compression_min_size:
+    app.add_middleware(
+        GZipMiddleware,
+        minimum_size=settings.response_compression_min_size,
+        compresslevel=settings.response_compression_level,
+    )
 
 
 app.include_router(filing_router, prefix="/v1/filing")
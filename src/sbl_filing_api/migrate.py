@@ -0,0 +1,78 @@
+import logging
+import os
+
+from alembic import command
+from alembic.config import Config
+from alembic.script import ScriptDirectory
+from sqlalchemy import Column, MetaData, String, Table, create_engine, func, select
+from sqlalchemy.engine import make_url
+from sqlalchemy.ext.asyncio import AsyncEngine
+from sqlalchemy.pool import NullPool
+
+from sbl_filing_api.config import settings
+
+log = logging.getLogger(__name__)
+
+# arbitrary advisory lock key, shared by every process that runs the migrations
+MIGRATION_LOCK_ID = 58_310_914
+
+alembic_version = Table("alembic_version", MetaData(), Column("version_num", String(32)))
+
+
+def alembic_config() -> Config:
+    file_dir = os.path.dirname(os.path.realpath(__file__))
+    alembic_cfg = Config(f"{file_dir}/../../alembic.ini")
+    alembic_cfg.set_main_option("script_location", f"{file_dir}/../../db_revisions")
+    alembic_cfg.set_main_option("prepend_sys_path", f"{file_dir}/../../")
+    return alembic_cfg
+
+
+def run_migrations():
+    """
+    Upgrades the database to head while holding a Postgres advisory lock, so pods starting together take turns
+    instead of racing each other, with the ones after the first finding nothing left to do.
+    """
+    engine = create_engine(
+        make_url(settings.conn.unicode_string()).set(drivername="postgresql+psycopg2"), poolclass=NullPool
+    )
+    try:
+        with engine.connect() as conn:
+            conn = conn.execution_options(isolation_level="AUTOCOMMIT")
+            log.info("Waiting for the migration lock...")
+            conn.execute(select(func.pg_advisory_lock(MIGRATION_LOCK_ID)))
+            try:
+                command.upgrade(alembic_config(), "head")
+            finally:
+                conn.execute(select(func.pg_advisory_unlock(MIGRATION_LOCK_ID)))
+    finally:
+        engine.dispose()
+
+
+def head_revisions() -> set[str]:
+    return set(ScriptDirectory.from_config(alembic_config()).get_heads())
+
+
+async def db_revisions(engine: AsyncEngine) -> set[str]:
+    async with engine.connect() as conn:
+        return set((await conn.execute(select(alembic_version.c.version_num))).scalars())
+
+
+async def verify_db_revision(engine: AsyncEngine):
+    """
+    Fails startup unless the database has been migrated to the revision this code expects
+    """
+    heads = head_revisions()
+    try:
+        current = await db_revisions(engine)
+    except Exception as e:
+        raise RuntimeError("Unable to read the database's migration revision, has it been migrated?") from e
+    if current != heads:
+        raise RuntimeError(
+            f"Database is at revision {', '.join(sorted(current)) or 'none'}, expected {', '.join(sorted(heads))}. "
+            "Run the migrations with python -m sbl_filing_api.migrate."
+        )
+
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO)
+    run_migrations()
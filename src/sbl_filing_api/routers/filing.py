@@ -1,28 +1,28 @@
 import asyncio
 import logging
-import csv
-import io
 
-from concurrent.futures import ProcessPoolExecutor
-from fastapi import Depends, Request, UploadFile, status
+from datetime import datetime, timedelta, timezone
+from fastapi import Depends, Query, Request, UploadFile, status
 from fastapi.responses import Response, StreamingResponse
 from multiprocessing import Manager
+from pydantic import BaseModel
 from regtech_api_commons.api.router_wrapper import Router
 from regtech_api_commons.api.exceptions import RegTechHttpException
 from regtech_api_commons.models.auth import AuthenticatedUser
 
-from sbl_filing_api.entities.models.dao import FilingDAO
-from sbl_filing_api.entities.models.model_enums import UserActionType
-from sbl_filing_api.services import submission_processor
-from sbl_filing_api.services.multithread_handler import handle_submission
-from sbl_filing_api.config import request_action_validations
-from typing import Annotated, List
+from sbl_filing_api.entities.models.dao import FilingDAO, SubmissionDAO
+from sbl_filing_api.entities.models.model_enums import ExportFormat, UserActionType
+from sbl_filing_api.services import filing_exporter, submission_processor
+from sbl_filing_api.services.multithread_handler import ValidationPool, estimate_queue
+from sbl_filing_api.config import request_action_validations, settings
+from typing import Annotated, List, Set
 
 from sbl_filing_api.entities.engine.engine import get_session
 from sbl_filing_api.entities.models.dto import (
     FilingPeriodDTO,
     SubmissionDTO,
     FilingDTO,
+    FilingStatusDTO,
     SnapshotUpdateDTO,
     StateUpdateDTO,
     ContactInfoDTO,
@@ -30,9 +30,11 @@ from sbl_filing_api.entities.models.dto import (
     UserActionDTO,
     VoluntaryUpdateDTO,
     SubmissionBaseDTO,
+    ValidationSummaryDTO,
 )
 
 from sbl_filing_api.entities.repos import submission_repo as repo
+from sbl_filing_api.routers.responses import DTOResponse, SubmissionResponse, sparse_dto
 
 from sqlalchemy.ext.asyncio import AsyncSession
 
@@ -51,30 +53,94 @@ async def set_db(request: Request, session: Annotated[AsyncSession, Depends(get_
     request.state.db_session = session
 
 
-executor = ProcessPoolExecutor()
+validation_pool = ValidationPool()
 router = Router(dependencies=[Depends(set_db), Depends(verify_user_lei_relation)])
 
 
 @router.get("/periods", response_model=List[FilingPeriodDTO])
 @requires("authenticated")
 async def get_filing_periods(request: Request):
-    return await repo.get_filing_periods(request.state.db_session)
+    return DTOResponse(await repo.get_filing_periods(request.state.db_session), List[FilingPeriodDTO])
+
+
+def requested_fields(fields: str | None, dto_type: type[BaseModel]) -> Set[str] | None:
+    """
+    Parses a comma separated `fields` query parameter into the DTO fields a sparse response should include
+    """
+    requested = {field.strip() for field in (fields or "").split(",") if field.strip()}
+    unknown = requested - dto_type.model_fields.keys()
+    if unknown:
+        raise RegTechHttpException(
+            status_code=status.HTTP_422_UNPROCESSABLE_ENTITY,
+            name="Invalid Fields",
+            detail=f"Field(s) {sorted(unknown)} do not exist, fields must be any of {sorted(dto_type.model_fields)}.",
+        )
+    return requested or None
 
 
 @router.get("/institutions/{lei}/filings/{period_code}", response_model=FilingDTO | None)
 @requires("authenticated")
-async def get_filing(request: Request, response: Response, lei: str, period_code: str):
-    res = await repo.get_filing(request.state.db_session, lei, period_code)
+async def get_filing(request: Request, response: Response, lei: str, period_code: str, fields: str | None = None):
+    requested = requested_fields(fields, FilingDTO)
+    res = await repo.get_filing(request.state.db_session, lei, period_code, fields=requested)
     if res:
-        return res
+        return DTOResponse(res, sparse_dto(FilingDTO, requested))
     response.status_code = status.HTTP_204_NO_CONTENT
 
 
 @router.get("/periods/{period_code}/filings", response_model=List[FilingDTO])
 @requires("authenticated")
-async def get_filings(request: Request, period_code: str):
+async def get_filings(request: Request, period_code: str, fields: str | None = None):
     user: AuthenticatedUser = request.user
-    return await repo.get_filings(request.state.db_session, user.institutions, period_code)
+    requested = requested_fields(fields, FilingDTO)
+    return DTOResponse(
+        await repo.get_filings(request.state.db_session, user.institutions, period_code, fields=requested),
+        List[sparse_dto(FilingDTO, requested)],
+    )
+
+
+@router.get("/periods/{period_code}/filings/status", response_model=List[FilingStatusDTO])
+@requires("authenticated")
+async def get_filings_status(
+    request: Request, period_code: str, leis: Annotated[List[str] | None, Query(alias="lei")] = None
+):
+    user: AuthenticatedUser = request.user
+    if leis:
+        unassociated = set(leis) - set(user.institutions)
+        if unassociated:
+            raise RegTechHttpException(
+                status_code=status.HTTP_403_FORBIDDEN,
+                name="Request Forbidden",
+                detail=f"LEI(s) {sorted(unassociated)} are not associated with the user.",
+            )
+    else:
+        leis = user.institutions
+    rows = await repo.get_filings_status(request.state.db_session, leis, period_code)
+    return DTOResponse(
+        [{"filing": row[0], "latest_submission": row if row.id is not None else None} for row in rows],
+        List[FilingStatusDTO],
+    )
+
+
+@router.get(
+    "/periods/{period_code}/filings/export",
+    responses={200: {"content": {"application/x-ndjson": {}, "text/csv": {}}}},
+)
+@requires(["query-groups", "manage-users"])
+async def export_period_filings(
+    request: Request,
+    period_code: str,
+    export_format: Annotated[ExportFormat, Query(alias="format")] = ExportFormat.NDJSON,
+):
+    rows = repo.stream_period_filings(period_code, settings.export_batch_size)
+    return StreamingResponse(
+        content=filing_exporter.export_filings(rows, export_format),
+        media_type=filing_exporter.MEDIA_TYPES[export_format],
+        headers={
+            "Content-Disposition": f'attachment; filename="{period_code}_filings.{export_format.value}"',
+            "Cache-Control": "no-store",
+        },
+    )
 
 
 @router.post(
@@ -139,7 +205,8 @@ async def sign_filing(request: Request, lei: str, period_code: str):
     )
     sig_timestamp = int(sig.timestamp.timestamp())
     filing.confirmation_id = lei + "-" + period_code + "-" + str(latest_sub.counter) + "-" + str(sig_timestamp)
-    filing.signatures.append(sig)
+    # newest signature first, as the relationship is ordered when loaded
+    filing.signatures.insert(0, sig)
     send_confirmation_email(
         request.user.name, request.user.email, filing.contact_info.email, filing.confirmation_id, sig_timestamp
     )
@@ -149,8 +216,17 @@ async def sign_filing(request: Request, lei: str, period_code: str):
 @router.post("/institutions/{lei}/filings/{period_code}/submissions", response_model=SubmissionDTO)
 @requires("authenticated")
 async def upload_file(request: Request, lei: str, period_code: str, file: UploadFile):
+    # turned away before the upload is read and its records counted
+    if validation_pool.is_full():
+        raise RegTechHttpException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            name="Validation Capacity Reached",
+            detail="The maximum number of submissions are currently waiting to be validated, please try again later.",
+            headers={"Retry-After": str(settings.validation_retry_after_secs)},
+        )
     submission_processor.validate_file_processable(file)
-    content = await file.read()
+    expected_header = await validation_pool.get_header() if settings.submission_preflight_rows else None
+    content, total_records = await submission_processor.read_submission(file, expected_header)
 
     filing = await repo.get_filing(request.state.db_session, lei, period_code)
     if not filing:
@@ -159,6 +235,7 @@ async def upload_file(request: Request, lei: str, period_code: str, file: Upload
             name="Filing Not Found",
             detail=f"There is no Filing for LEI {lei} in period {period_code}, unable to submit file.",
         )
+
     submission = None
     try:
         submitter = await repo.add_user_action(
@@ -177,9 +254,7 @@ async def upload_file(request: Request, lei: str, period_code: str, file: Upload
             )
 
             submission.state = SubmissionState.SUBMISSION_UPLOADED
-            with io.BytesIO(content) as byte_stream:
-                reader = csv.reader(io.TextIOWrapper(byte_stream))
-                submission.total_records = sum(1 for row in reader) - 1
+            submission.total_records = total_records
             submission = await repo.update_submission(request.state.db_session, submission)
         except Exception as e:
             submission.state = SubmissionState.UPLOAD_FAILED
@@ -190,10 +265,14 @@ async def upload_file(request: Request, lei: str, period_code: str, file: Upload
                 detail=f"Error while trying to process Submission {submission.id}",
             ) from e
 
+        if settings.supersede_validations:
+            superseded = await repo.supersede_submissions(request.state.db_session, filing.id, submission.counter)
+            validation_pool.cancel(superseded)
+
         exec_check = Manager().dict()
         exec_check["continue"] = True
         loop = asyncio.get_event_loop()
-        loop.run_in_executor(executor, handle_submission, period_code, lei, submission, content, exec_check)
+        validation_pool.enqueue(loop, period_code, lei, submission.id, exec_check, total_records)
 
         return submission
 
@@ -219,37 +298,101 @@ async def upload_file(request: Request, lei: str, period_code: str, file: Upload
         ) from e
 
 
+async def with_queue_estimate(
+    session: AsyncSession, submission: SubmissionDAO, fields: Set[str] | None = None
+) -> BaseModel:
+    # validation_results is deferred on these submissions, and served from its raw JSON by SubmissionResponse
+    dto_type = sparse_dto(SubmissionDTO, set(fields or SubmissionDTO.model_fields) - {"validation_results"})
+    dto = dto_type.model_validate(submission, from_attributes=True)
+    estimates = {"queue_position", "validation_eta"} & dto_type.model_fields.keys()
+    if estimates and submission.state == SubmissionState.SUBMISSION_UPLOADED:
+        # submission_time is stored as naive UTC
+        since = datetime.now(timezone.utc).replace(tzinfo=None) - timedelta(
+            seconds=settings.validation_queue_max_age_secs
+        )
+        queued = await repo.get_queued_submissions(session, since)
+        queue_position, validation_eta = estimate_queue(submission.id, queued)
+        estimated = {"queue_position": queue_position, "validation_eta": validation_eta}
+        dto = dto.model_copy(update={estimate: estimated[estimate] for estimate in estimates})
+    return dto
+
+
 @router.get("/institutions/{lei}/filings/{period_code}/submissions", response_model=List[SubmissionBaseDTO])
 @requires("authenticated")
-async def get_submissions(request: Request, lei: str, period_code: str):
-    return await repo.get_submissions(request.state.db_session, lei, period_code)
+async def get_submissions(
+    request: Request,
+    lei: str,
+    period_code: str,
+    fields: str | None = None,
+    before: int | None = None,
+    limit: Annotated[int, Query(gt=0, le=settings.submissions_page_size)] = settings.submissions_page_size,
+):
+    requested = requested_fields(fields, SubmissionBaseDTO)
+    submissions = await repo.get_submissions(
+        request.state.db_session, lei, period_code, fields=requested, before=before, limit=limit
+    )
+    total = await repo.count_submissions(request.state.db_session, lei, period_code)
+    return DTOResponse(
+        submissions, List[sparse_dto(SubmissionBaseDTO, requested)], headers={"X-Total-Count": str(total)}
+    )
 
 
 @router.get("/institutions/{lei}/filings/{period_code}/submissions/latest", response_model=SubmissionDTO)
 @requires("authenticated")
-async def get_submission_latest(request: Request, lei: str, period_code: str):
-    filing = await repo.get_filing(request.state.db_session, lei, period_code)
-    if not filing:
+async def get_submission_latest(request: Request, lei: str, period_code: str, fields: str | None = None):
+    requested = requested_fields(fields, SubmissionDTO)
+    result = await repo.get_submission_with_raw_results(request.state.db_session, lei, period_code, fields=requested)
+    if not result:
         raise RegTechHttpException(
             status_code=status.HTTP_404_NOT_FOUND,
             name="Filing Not Found",
             detail=f"There is no Filing for LEI {lei} in period {period_code}, unable to get latest submission for it.",
         )
-    result = await repo.get_latest_submission(request.state.db_session, lei, period_code)
-    if result:
-        return result
+    submission, validation_results = result
+    if submission:
+        return SubmissionResponse(
+            await with_queue_estimate(request.state.db_session, submission, requested),
+            validation_results,
+            include_results=not requested or "validation_results" in requested,
+        )
     return Response(status_code=status.HTTP_204_NO_CONTENT)
 
 
 @router.get("/institutions/{lei}/filings/{period_code}/submissions/{counter}", response_model=SubmissionDTO | None)
 @requires("authenticated")
-async def get_submission(request: Request, response: Response, counter: int, lei: str, period_code: str):
-    result = await repo.get_submission_by_counter(request.state.db_session, lei, period_code, counter)
-    if result:
-        return result
+async def get_submission(
+    request: Request, response: Response, counter: int, lei: str, period_code: str, fields: str | None = None
+):
+    requested = requested_fields(fields, SubmissionDTO)
+    result = await repo.get_submission_with_raw_results(
+        request.state.db_session, lei, period_code, counter, fields=requested
+    )
+    if result and result[0]:
+        submission, validation_results = result
+        return SubmissionResponse(
+            await with_queue_estimate(request.state.db_session, submission, requested),
+            validation_results,
+            include_results=not requested or "validation_results" in requested,
+        )
     response.status_code = status.HTTP_404_NOT_FOUND
 
 
+@router.get(
+    "/institutions/{lei}/filings/{period_code}/submissions/{counter}/summary",
+    response_model=List[ValidationSummaryDTO],
+)
+@requires("authenticated")
+async def get_submission_summary(request: Request, counter: int, lei: str, period_code: str):
+    result = await repo.get_validation_summary(request.state.db_session, lei, period_code, counter)
+    if result is None:
+        raise RegTechHttpException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            name="Submission Not Found",
+            detail=f"Submission {counter} for LEI {lei} in filing period {period_code} does not exist.",
+        )
+    return DTOResponse(result, List[ValidationSummaryDTO])
+
+
 @router.put("/institutions/{lei}/filings/{period_code}/submissions/{counter}/accept", response_model=SubmissionDTO)
 @requires("authenticated")
 async def accept_submission(request: Request, counter: int, lei: str, period_code: str):
@@ -281,6 +424,7 @@ async def accept_submission(request: Request, counter: int, lei: str, period_cod
     )
 
     submission.accepter_id = accepter.id
+    submission.accepter = accepter
     submission.state = SubmissionState.SUBMISSION_ACCEPTED
     submission = await repo.update_submission(request.state.db_session, submission)
     return submission
@@ -311,7 +455,7 @@ async def update_task_state(request: Request, lei: str, period_code: str, task_n
 async def get_contact_info(request: Request, response: Response, lei: str, period_code: str):
     filing = await repo.get_filing(request.state.db_session, lei, period_code)
     if filing and filing.contact_info:
-        return filing.contact_info
+        return DTOResponse(filing.contact_info, ContactInfoDTO)
     response.status_code = status.HTTP_404_NOT_FOUND
 
 
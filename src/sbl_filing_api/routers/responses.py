@@ -0,0 +1,77 @@
+from functools import lru_cache
+from typing import Any, Collection
+
+from fastapi.responses import Response
+from pydantic import BaseModel, TypeAdapter, create_model
+
+from sbl_filing_api.entities.models.dto import SubmissionDTO
+
+
+@lru_cache(maxsize=256)
+def dto_adapter(dto_type: Any) -> TypeAdapter:
+    """
+    Builds the TypeAdapter for a DTO type, e.g. FilingDTO or List[FilingDTO], once and reuses it for every response
+    """
+    return TypeAdapter(dto_type)
+
+
+def sparse_dto(dto_type: type[BaseModel], fields: Collection[str] | None) -> type[BaseModel]:
+    """
+    Narrows a DTO down to the requested fields, so only those are read off the ORM objects and rendered.
+    None returns the DTO as is, while an empty collection gives a model with no fields.
+    """
+    if fields is None:
+        return dto_type
+    return _sparse_dto(dto_type, frozenset(fields))
+
+
+@lru_cache(maxsize=128)
+def _sparse_dto(dto_type: type[BaseModel], fields: frozenset[str]) -> type[BaseModel]:
+    return create_model(
+        dto_type.__name__,
+        __config__=dto_type.model_config,
+        **{name: (info.annotation, info) for name, info in dto_type.model_fields.items() if name in fields},
+    )
+
+
+class DTOResponse(Response):
+    """
+    Validates an endpoint's result, usually ORM objects, into its DTO type and dumps it straight to JSON bytes.
+    Returning one skips FastAPI's response_model handling, which validates the result, converts it back to
+    python primitives and then encodes those with json.dumps.  The route's response_model is still what the
+    OpenAPI docs are generated from, so the two should be kept the same.
+    """
+
+    media_type = "application/json"
+
+    def __init__(self, content: Any, dto_type: Any, **kwargs: Any):
+        self.dto_type = dto_type
+        super().__init__(content=content, **kwargs)
+
+    def render(self, content: Any) -> bytes:
+        adapter = dto_adapter(self.dto_type)
+        return adapter.dump_json(adapter.validate_python(content, from_attributes=True))
+
+
+class SubmissionResponse(Response):
+    """
+    Renders a SubmissionDTO with its validation_results spliced in as the raw JSON text read from the database,
+    instead of parsing the results into a dict only for them to be validated and encoded back into the same JSON.
+    """
+
+    media_type = "application/json"
+
+    def __init__(
+        self, submission: SubmissionDTO, validation_results: str | None, include_results: bool = True, **kwargs: Any
+    ):
+        self.include_results = include_results
+        super().__init__(content=(submission, validation_results), **kwargs)
+
+    def render(self, content: tuple[SubmissionDTO, str | None]) -> bytes:
+        submission, validation_results = content
+        body = submission.model_dump_json(exclude={"validation_results"})
+        if not self.include_results:
+            return body.encode("utf-8")
+        # a sparse submission can be down to just the results, leaving nothing to separate them from
+        head = f"{body[:-1]}," if body != "{}" else "{"
+        return f'{head}"validation_results":{validation_results or "null"}}}'.encode("utf-8")
@@ -1,13 +1,15 @@
 import logging
+import shutil
 from typing import Generator
 import boto3
+from botocore.exceptions import ClientError
 from pathlib import Path
 from sbl_filing_api.config import FsProtocol, settings
 
 log = logging.getLogger(__name__)
 
 
-def upload(path: str, content: bytes) -> None:
+def upload(path: str, content: bytes | bytearray) -> None:
     if settings.fs_upload_config.protocol == FsProtocol.FILE:
         file = Path(f"{settings.fs_upload_config.root}/{path}")
         file.parent.mkdir(parents=True, exist_ok=True)
@@ -26,6 +28,32 @@ def upload(path: str, content: bytes) -> None:
         )
 
 
+def upload_file(path: str, local_file: str) -> None:
+    """
+    Moves a local file into storage; S3 uploads are streamed from disk in parts, so the file is never held in memory
+    """
+    if settings.fs_upload_config.protocol == FsProtocol.FILE:
+        file = Path(f"{settings.fs_upload_config.root}/{path}")
+        file.parent.mkdir(parents=True, exist_ok=True)
+        shutil.move(local_file, file)
+    else:
+        s3 = boto3.client("s3")
+        s3.upload_file(local_file, settings.fs_upload_config.root, path)
+
+
+def exists(path: str) -> bool:
+    if settings.fs_upload_config.protocol == FsProtocol.FILE:
+        return Path(f"{settings.fs_upload_config.root}/{path}").is_file()
+    s3 = boto3.client("s3")
+    try:
+        s3.head_object(Bucket=settings.fs_upload_config.root, Key=path)
+        return True
+    except ClientError as e:
+        if e.response["Error"]["Code"] in ["404", "NoSuchKey"]:
+            return False
+        raise
+
+
 def download(path: str) -> Generator:
     if settings.fs_upload_config.protocol == FsProtocol.FILE:
         with open(f"{settings.fs_upload_config.root}/{path}") as f:
@@ -0,0 +1,104 @@
+import csv
+import io
+import logging
+
+from typing import AsyncGenerator, AsyncIterator
+
+from sqlalchemy.engine import Row
+
+from sbl_filing_api.entities.models.dao import FilingDAO
+from sbl_filing_api.entities.models.dto import FilingExportDTO
+from sbl_filing_api.entities.models.model_enums import ExportFormat
+
+log = logging.getLogger(__name__)
+
+CONTACT_INFO_FIELDS = [
+    "first_name",
+    "last_name",
+    "hq_address_street_1",
+    "hq_address_street_2",
+    "hq_address_street_3",
+    "hq_address_street_4",
+    "hq_address_city",
+    "hq_address_state",
+    "hq_address_zip",
+    "email",
+    "phone_number",
+    "phone_ext",
+]
+
+CSV_HEADER = [
+    "id",
+    "lei",
+    "filing_period",
+    "institution_snapshot_id",
+    "is_voluntary",
+    "confirmation_id",
+    "latest_submission_counter",
+    "latest_submission_state",
+    "latest_submission_time",
+    "signature_count",
+    "latest_signer_name",
+    "latest_signer_email",
+    "latest_signature_time",
+] + [f"contact_info_{field}" for field in CONTACT_INFO_FIELDS]
+
+MEDIA_TYPES = {
+    ExportFormat.NDJSON: "application/x-ndjson",
+    ExportFormat.CSV: "text/csv",
+}
+
+
+def to_export_dto(row: Row) -> FilingExportDTO:
+    filing: FilingDAO = row[0]
+    return FilingExportDTO(
+        id=filing.id,
+        lei=filing.lei,
+        filing_period=filing.filing_period,
+        institution_snapshot_id=filing.institution_snapshot_id,
+        is_voluntary=filing.is_voluntary,
+        confirmation_id=filing.confirmation_id,
+        contact_info=filing.contact_info.__dict__ if filing.contact_info else None,
+        signatures=[sig.__dict__ for sig in filing.signatures],
+        latest_submission_counter=row.latest_submission_counter,
+        latest_submission_state=row.latest_submission_state,
+        latest_submission_time=row.latest_submission_time,
+    )
+
+
+def to_csv_row(filing: FilingExportDTO) -> list:
+    latest_sig = filing.signatures[0] if filing.signatures else None
+    return [
+        filing.id,
+        filing.lei,
+        filing.filing_period,
+        filing.institution_snapshot_id,
+        filing.is_voluntary,
+        filing.confirmation_id,
+        filing.latest_submission_counter,
+        filing.latest_submission_state.value if filing.latest_submission_state else None,
+        filing.latest_submission_time.isoformat() if filing.latest_submission_time else None,
+        len(filing.signatures),
+        latest_sig.user_name if latest_sig else None,
+        latest_sig.user_email if latest_sig else None,
+        latest_sig.timestamp.isoformat() if latest_sig and latest_sig.timestamp else None,
+    ] + [getattr(filing.contact_info, field) if filing.contact_info else None for field in CONTACT_INFO_FIELDS]
+
+
+async def export_filings(rows: AsyncIterator[Row], export_format: ExportFormat) -> AsyncGenerator[str, None]:
+    """
+    Formats streamed filing rows one at a time, so the export is never fully materialized in memory.
+    """
+    if export_format == ExportFormat.CSV:
+        buffer = io.StringIO()
+        writer = csv.writer(buffer)
+        writer.writerow(CSV_HEADER)
+        async for row in rows:
+            writer.writerow(to_csv_row(to_export_dto(row)))
+            yield buffer.getvalue()
+            buffer.seek(0)
+            buffer.truncate()
+        yield buffer.getvalue()
+    else:
+        async for row in rows:
+            yield to_export_dto(row).model_dump_json() + "\n"
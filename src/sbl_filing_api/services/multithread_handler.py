@@ -1,22 +1,279 @@
 import asyncio
 import logging
+import math
+import multiprocessing
+import time
+
+from collections import Counter
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from dataclasses import dataclass
+from datetime import datetime, timedelta, timezone
+from functools import partial
+from typing import Any, Callable, Dict, List, Tuple
 
 from sbl_filing_api.config import settings
-from sbl_filing_api.entities.models.dao import SubmissionDAO
+from sbl_filing_api.entities.models.dao import SubmissionState
 from sbl_filing_api.entities.repos import submission_repo as repo
-from sbl_filing_api.services.submission_processor import validate_and_update_submission
+from sbl_filing_api.services.validation_governor import ValidationGovernor, ValidationSlot
 
 
 logger = logging.getLogger(__name__)
 
 
-def handle_submission(period_code: str, lei: str, submission: SubmissionDAO, content: bytes, exec_check):
-    loop = asyncio.get_event_loop()
-    try:
-        coro = validate_and_update_submission(period_code, lei, submission, content, exec_check)
-        loop.run_until_complete(coro)
-    except Exception as e:
-        logger.error(e, exc_info=True, stack_info=True)
+def init_validation_worker():
+    # the validation stack is only imported here, in the worker processes, never by the API's own processes
+    from sbl_filing_api.services import validation_worker
+
+    validation_worker.init_worker()
+
+
+def handle_submission(period_code: str, lei: str, submission_id: int, exec_check):
+    from sbl_filing_api.services import validation_worker
+
+    validation_worker.handle_submission(period_code, lei, submission_id, exec_check)
+
+
+def wait_for_pool(barrier) -> None:
+    # holds its worker until all of the pool's workers have started, so each one is spawned and warmed once instead of
+    # the first worker up taking every warm up task
+    barrier.wait()
+
+
+def expected_header() -> List[str]:
+    from sbl_filing_api.services import validation_worker
+
+    return validation_worker.expected_header()
+
+
+def pool_size() -> int:
+    """
+    This uvicorn worker's share of the host wide validation_concurrency, so the host's workers don't keep more
+    validation processes between them than can run at once
+    """
+    return max(1, math.ceil(settings.validation_concurrency / settings.web_concurrency))
+
+
+def queue_key(total_records: int | None, queued_at: float) -> float:
+    """
+    Shortest job first with aging: the expected cost in records, less validation_aging_records_per_sec for every
+    second spent waiting so large files still get their turn.  The credit grows at the same rate for every waiting
+    submission, so ordering by cost plus the aging rate times the time it was queued gives the same order.
+    """
+    return (total_records or 0) + settings.validation_aging_records_per_sec * queued_at
+
+
+def estimate_queue(submission_id: int, queued: List[Any]) -> Tuple[int | None, datetime | None]:
+    """
+    Position and estimated completion time of a submission waiting for validation, from the submissions
+    still waiting on the host, each with id, total_records, and submission_time
+    """
+    keys = {s.id: queue_key(s.total_records, s.submission_time.timestamp()) for s in queued}
+    if submission_id not in keys:
+        return None, None
+    ahead = [s for s in queued if keys[s.id] <= keys[submission_id]]
+    records = sum(s.total_records or 0 for s in ahead)
+    seconds = records / (settings.validation_records_per_sec * settings.validation_concurrency)
+    return len(ahead), datetime.now(timezone.utc) + timedelta(seconds=seconds)
+
+
+@dataclass
+class ValidationJob:
+    key: float
+    period_code: str
+    lei: str
+    submission_id: int
+    exec_check: Any
+
+
+class ValidationPool:
+    """
+    Owns the validation worker processes.  Workers are recycled after validation_max_tasks_per_child submissions
+    to give back memory polars and the validator hold on to, and the pool is replaced if a worker dies.
+
+    Submissions wait in a queue until one of the host wide validation slots is free, and are picked shortest job
+    first, skipping LEIs already at validation_max_per_lei running validations.
+    """
+
+    def __init__(self, governor: ValidationGovernor | None = None):
+        self.executor = self.new_executor()
+        self.governor = governor or ValidationGovernor(settings.validation_slot_dir, settings.validation_concurrency)
+        self.pending: List[ValidationJob] = []
+        self.running: Counter[str] = Counter()
+        self.active: Dict[int, ValidationJob] = {}
+        self.retry: asyncio.TimerHandle | None = None
+        self.header: List[str] | None = None
+        self.header_requested = False
+
+    def is_full(self) -> bool:
+        return len(self.pending) >= settings.validation_max_queue
+
+    def enqueue(
+        self,
+        loop: asyncio.AbstractEventLoop,
+        period_code: str,
+        lei: str,
+        submission_id: int,
+        exec_check,
+        total_records: int | None,
+    ):
+        self.pending.append(
+            ValidationJob(queue_key(total_records, time.time()), period_code, lei, submission_id, exec_check)
+        )
+        self.dispatch(loop)
+
+    def dispatch(self, loop: asyncio.AbstractEventLoop):
+        while eligible := [job for job in self.pending if self.running[job.lei] < settings.validation_max_per_lei]:
+            slot = self.governor.try_acquire()
+            if not slot:
+                # slots freed by the host's other workers aren't signalled here, so check back in a bit
+                if not self.retry:
+                    self.retry = loop.call_later(settings.validation_dispatch_retry_secs, self.retry_dispatch, loop)
+                return
+            job = min(eligible, key=lambda j: j.key)
+            self.pending.remove(job)
+            self.running[job.lei] += 1
+            self.active[job.submission_id] = job
+            self.submit(
+                loop,
+                job.period_code,
+                job.lei,
+                job.submission_id,
+                job.exec_check,
+                on_done=partial(self.finish, loop, job, slot),
+            )
+
+    def retry_dispatch(self, loop: asyncio.AbstractEventLoop):
+        self.retry = None
+        self.dispatch(loop)
+
+    def finish(self, loop: asyncio.AbstractEventLoop, job: ValidationJob, slot: ValidationSlot):
+        slot.release()
+        self.running[job.lei] -= 1
+        self.active.pop(job.submission_id, None)
+        self.dispatch(loop)
+
+    def cancel(self, submission_ids: List[int]):
+        """
+        Drops superseded submissions still in the queue, and tells running ones to stop after their current batch
+        """
+        self.pending = [job for job in self.pending if job.submission_id not in submission_ids]
+        for submission_id in submission_ids:
+            if job := self.active.get(submission_id):
+                job.exec_check["superseded"] = True
+
+    @staticmethod
+    def new_executor() -> ProcessPoolExecutor:
+        # polars isn't fork safe, so validation workers are spawned fresh rather than forked from the server process.
+        # Each warms up in its initializer.  The pool's first workers also run warm's wait_for_pool task, which the
+        # extra task per child makes up for; a worker recycled after max_tasks_per_child is replaced, and the
+        # replacement warmed, by the executor as soon as it exits rather than when the next submission comes in.
+        max_tasks = settings.validation_max_tasks_per_child
+        return ProcessPoolExecutor(
+            max_workers=pool_size(),
+            mp_context=multiprocessing.get_context("spawn"),
+            initializer=init_validation_worker,
+            max_tasks_per_child=max_tasks + 1 if max_tasks else None,
+        )
+
+    async def warm(self):
+        """
+        Spawns all of the pool's workers and waits for them to warm up, so the first submissions don't pay for the
+        validator's imports and schema builds
+        """
+        size = pool_size()
+        with multiprocessing.Manager() as manager:
+            barrier = manager.Barrier(size, timeout=settings.validation_warm_timeout_secs)
+            try:
+                await asyncio.gather(
+                    *[asyncio.wrap_future(self.executor.submit(wait_for_pool, barrier)) for _ in range(size)]
+                )
+                logger.info("Warmed up %d validation workers.", size)
+            except Exception:
+                logger.warning("Unable to warm up the validation workers.", exc_info=True)
+
+    async def get_header(self) -> List[str] | None:
+        """
+        The columns the validator expects, loaded on the first upload rather than at startup so the API's processes
+        don't each spawn one importing the validator before it's needed.  Uploads coming in while it loads, or after
+        it failed to, aren't checked against it.
+        """
+        if not self.header_requested:
+            self.header_requested = True
+            await self.load_header()
+        return self.header
+
+    async def load_header(self):
+        """
+        Gets the columns the validator expects from a short lived process, for the upload pre-flight check, since the
+        API's own processes don't import the validator.  Without them uploads' header names aren't checked.
+        """
+        executor = ProcessPoolExecutor(max_workers=1, mp_context=multiprocessing.get_context("spawn"))
+        try:
+            self.header = await asyncio.wrap_future(executor.submit(expected_header))
+        except Exception:
+            logger.warning("Unable to load the validator's columns, upload headers won't be checked.", exc_info=True)
+        finally:
+            executor.shutdown(wait=False)
+
+    def replace(self, broken: ProcessPoolExecutor):
+        # every submission in a broken pool fails at once, only the first one to notice replaces it
+        if self.executor is broken:
+            self.executor = self.new_executor()
+            broken.shutdown(wait=False)
+
+    def submit(
+        self,
+        loop: asyncio.AbstractEventLoop,
+        period_code: str,
+        lei: str,
+        submission_id: int,
+        exec_check,
+        on_done: Callable[[], None] | None = None,
+        retry: bool = True,
+    ) -> asyncio.Future:
+        executor = self.executor
+        future = loop.run_in_executor(executor, handle_submission, period_code, lei, submission_id, exec_check)
+
+        def done(f: asyncio.Future):
+            if not f.cancelled() and isinstance(f.exception(), BrokenProcessPool):
+                self.replace(executor)
+                loop.create_task(self.recover(loop, period_code, lei, submission_id, exec_check, on_done, retry))
+            elif on_done:
+                on_done()
+
+        future.add_done_callback(done)
+        return future
+
+    async def recover(
+        self,
+        loop: asyncio.AbstractEventLoop,
+        period_code: str,
+        lei: str,
+        submission_id: int,
+        exec_check,
+        on_done: Callable[[], None] | None,
+        retry: bool,
+    ):
+        """
+        A dead worker fails every submission in its pool.  The one that went over the memory ceiling has already been
+        errored out by its worker, the rest were collateral and get one more try in the replacement pool.
+        """
+        try:
+            state = await repo.get_submission_state(submission_id)
+            if state in [SubmissionState.SUBMISSION_UPLOADED, SubmissionState.VALIDATION_IN_PROGRESS]:
+                if retry:
+                    logger.warning("Validation worker died during submission %d, retrying it.", submission_id)
+                    self.submit(loop, period_code, lei, submission_id, exec_check, on_done, retry=False)
+                    return
+                logger.error(
+                    "Validation worker died again during submission %d, setting VALIDATION_ERROR.", submission_id
+                )
+                await repo.error_out_submission(submission_id)
+        except Exception:
+            logger.exception("Unable to recover submission %d after its validation worker died.", submission_id)
+        if on_done:
+            on_done()
 
 
 async def check_future(future, submission_id, exec_check):
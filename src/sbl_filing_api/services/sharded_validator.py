@@ -0,0 +1,295 @@
+import logging
+import math
+import multiprocessing
+
+import polars as pl
+
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from typing import Any, Callable, List, Tuple
+
+from regtech_data_validator.checks import Severity
+from regtech_data_validator.validation_results import Counts, ValidationPhase, ValidationResults
+from regtech_data_validator.validator import validate_data
+
+from sbl_filing_api.config import settings
+from sbl_filing_api.services.validation_governor import ValidationGovernor
+
+log = logging.getLogger(__name__)
+
+REGISTER_SCOPE = "register"
+
+
+def scan_submission(file_path: str) -> pl.LazyFrame:
+    if file_path.endswith(".parquet"):
+        return pl.scan_parquet(file_path)
+    return pl.scan_csv(file_path, infer_schema=False, missing_utf8_is_empty_string=True)
+
+
+def shard_ranges(total_records: int, shard_count: int) -> List[Tuple[int, int | None]]:
+    """
+    Splits the records into contiguous (offset, length) row ranges, one per shard.  The last range has no length,
+    reading to the end of the file, so no rows are left out if total_records, counted at upload, falls short.
+    """
+    shard_rows = math.ceil(total_records / shard_count)
+    offsets = list(range(0, total_records, shard_rows))
+    return [(offset, shard_rows) for offset in offsets[:-1]] + [(offsets[-1], None)]
+
+
+def offset_findings(findings: pl.DataFrame, record_offset: int, finding_offset: int) -> pl.DataFrame:
+    """
+    Shifts a shard's record and finding numbers so they're numbered relative to the whole file
+    """
+    if "record_no" in findings.columns:
+        findings = findings.with_columns(pl.col("record_no") + record_offset)
+    if "finding_no" in findings.columns:
+        findings = findings.with_columns(pl.col("finding_no") + finding_offset)
+    return findings
+
+
+def validate_shard(
+    file_path: str, lei: str, offset: int, length: int | None, exec_check: dict | None = None
+) -> List[ValidationResults] | None:
+    """
+    Validates a range of the file's rows, or the rest of the file from offset if there's no length.
+    Returns None if the submission was superseded part way through.
+    """
+    lf = scan_submission(file_path).slice(offset, length)
+    results = []
+    for validation_results in validate_data(
+        lf,
+        context={"lei": lei},
+        batch_size=settings.validation_batch_size,
+        batch_count=1,
+        max_errors=settings.max_validation_errors,
+    ):
+        if exec_check and exec_check.get("superseded"):
+            return None
+        results.append(validation_results)
+    return results
+
+
+def validate_register(
+    file_path: str, lei: str, shard_rows: int, shard_count: int
+) -> Tuple[List[str], ValidationResults | None]:
+    """
+    Reduction step for the register level checks, which need the whole dataset.  Only rows whose uid shows up
+    in more than one shard can have findings the shards didn't see on their own, so just those rows are validated,
+    and only the register scoped findings are kept, renumbered to the rows' position in the whole file.
+
+    Returns:
+        the uids that span shards, and the register findings for them
+    """
+    spanning = (
+        scan_submission(file_path)
+        .select("uid")
+        .with_row_index("row_index")
+        # rows past total_records are read by the last shard
+        .filter((pl.col("row_index") // shard_rows).clip(upper_bound=shard_count - 1).n_unique().over("uid") > 1)
+        .collect()
+    )
+    if spanning.is_empty():
+        return [], None
+
+    lf = (
+        scan_submission(file_path)
+        .with_row_index("row_index")
+        .filter(pl.col("row_index").is_in(spanning["row_index"].implode()))
+        .drop("row_index")
+    )
+    results = list(
+        validate_data(
+            lf,
+            context={"lei": lei},
+            batch_size=settings.validation_batch_size,
+            batch_count=1,
+            max_errors=settings.max_validation_errors,
+        )
+    )
+    logical = next((r for r in results if r.phase == ValidationPhase.LOGICAL), None)
+    if not logical:
+        return spanning["uid"].unique().to_list(), None
+
+    findings = logical.findings
+    if not findings.is_empty():
+        # record numbers are 1 based, map the position within the subset back to the position within the file
+        record_map = pl.DataFrame(
+            {"record_no": range(1, spanning.height + 1), "file_record_no": spanning["row_index"] + 1}
+        ).with_columns(pl.col("record_no").cast(findings.schema["record_no"]))
+        findings = (
+            findings.filter(pl.col("scope") == REGISTER_SCOPE)
+            .join(record_map, on="record_no", how="left")
+            .with_columns(pl.col("file_record_no").cast(findings.schema["record_no"]).alias("record_no"))
+            .drop("file_record_no")
+        )
+
+    return spanning["uid"].unique().to_list(), ValidationResults(
+        error_counts=Counts(
+            register_count=logical.error_counts.register_count, total_count=logical.error_counts.register_count
+        ),
+        warning_counts=Counts(
+            register_count=logical.warning_counts.register_count, total_count=logical.warning_counts.register_count
+        ),
+        is_valid=findings.is_empty(),
+        findings=findings,
+        phase=ValidationPhase.LOGICAL,
+    )
+
+
+def drop_register_findings(results: ValidationResults, uids: List[str]) -> ValidationResults:
+    """
+    Removes a shard's register findings for uids that span shards; those are reported by the reduction step instead
+    """
+    findings = results.findings
+    if findings.is_empty() or not {"scope", "uid"}.issubset(findings.columns):
+        return results
+    dropped = (pl.col("scope") == REGISTER_SCOPE) & pl.col("uid").is_in(uids)
+    dropped_errors = findings.filter(dropped & (pl.col("validation_type") == Severity.ERROR)).height
+    dropped_warnings = findings.filter(dropped & (pl.col("validation_type") == Severity.WARNING)).height
+    if not (dropped_errors or dropped_warnings):
+        return results
+
+    def adjust(counts: Counts, dropped_count: int) -> Counts:
+        return Counts(
+            single_field_count=counts.single_field_count,
+            multi_field_count=counts.multi_field_count,
+            register_count=counts.register_count - dropped_count,
+            total_count=counts.total_count - dropped_count,
+        )
+
+    return ValidationResults(
+        error_counts=adjust(results.error_counts, dropped_errors),
+        warning_counts=adjust(results.warning_counts, dropped_warnings),
+        is_valid=results.is_valid,
+        findings=findings.filter(~dropped),
+        phase=results.phase,
+    )
+
+
+def merge_results(
+    shard_results: List[List[ValidationResults]],
+    offsets: List[int],
+    spanning_uids: List[str],
+    register_results: ValidationResults | None,
+) -> List[ValidationResults]:
+    """
+    Merges the shards' results into what a single pass over the file would have produced.  Like the single pass,
+    if any shard has syntax errors only the syntactical results are kept.
+    """
+    syntax_failed = any(r.phase == ValidationPhase.SYNTACTICAL and not r.is_valid for s in shard_results for r in s)
+    merged = []
+    finding_offset = 0
+    for results, offset in zip(shard_results, offsets):
+        for r in results:
+            if syntax_failed and r.phase != ValidationPhase.SYNTACTICAL:
+                continue
+            if r.phase == ValidationPhase.LOGICAL:
+                r = drop_register_findings(r, spanning_uids)
+            findings = offset_findings(r.findings, offset, finding_offset)
+            if "finding_no" in findings.columns and not findings.is_empty():
+                finding_offset = findings["finding_no"].max()
+            merged.append(
+                ValidationResults(
+                    error_counts=r.error_counts,
+                    warning_counts=r.warning_counts,
+                    is_valid=r.is_valid,
+                    findings=findings,
+                    phase=r.phase,
+                )
+            )
+    if not syntax_failed and register_results:
+        merged.append(
+            ValidationResults(
+                error_counts=register_results.error_counts,
+                warning_counts=register_results.warning_counts,
+                is_valid=register_results.is_valid,
+                findings=offset_findings(register_results.findings, 0, finding_offset),
+                phase=register_results.phase,
+            )
+        )
+    return merged
+
+
+def cap_findings(results: List[ValidationResults], max_findings: int) -> List[ValidationResults]:
+    """
+    Keeps the first max_findings findings of merged results.  Each shard stops at max_validation_errors on its own,
+    so together they can report more than a single pass would.
+    """
+    capped = []
+    remaining = max_findings
+    for r in results:
+        findings = r.findings
+        if "finding_no" in findings.columns:
+            # findings on several fields have a row per field, finding_no keeps them together
+            findings = findings.filter(pl.col("finding_no") <= max_findings)
+        else:
+            findings = findings.head(max(remaining, 0))
+            remaining -= findings.height
+        if findings.height == r.findings.height:
+            capped.append(r)
+            continue
+        capped.append(
+            ValidationResults(
+                error_counts=r.error_counts,
+                warning_counts=r.warning_counts,
+                is_valid=r.is_valid,
+                findings=findings,
+                phase=r.phase,
+            )
+        )
+    return capped
+
+
+def validate_sharded(
+    file_path: str,
+    lei: str,
+    total_records: int,
+    exec_check: dict,
+    initializer: Callable[..., None] | None = None,
+    initargs: Tuple[Any, ...] = (),
+) -> List[ValidationResults] | None:
+    """
+    Validates a large file by splitting it into row ranges validated in parallel across processes, with
+    the register level checks done as a reduction over the rows that span shards, in this process.
+
+    Every shard process takes one of the host wide validation slots, up to sharded_validation_workers of them, so
+    sharding never runs more validations than validation_concurrency allows.  Without at least two free slots the
+    file is validated in a single pass in this process instead.  The shard processes are spawned, as this process
+    already has polars' and the memory watchdog's threads running, and set up with initializer, e.g. to watch
+    their own memory use.
+
+    Returns:
+        the merged results, or None if the submission was superseded part way through
+    """
+    governor = ValidationGovernor(settings.validation_slot_dir, settings.validation_concurrency)
+    slots = []
+    while len(slots) < settings.sharded_validation_workers and (slot := governor.try_acquire()):
+        slots.append(slot)
+    try:
+        if len(slots) < 2:
+            log.info("Not enough free validation slots to shard %s, validating it in a single pass.", file_path)
+            return validate_shard(file_path, lei, 0, None, exec_check)
+
+        ranges = shard_ranges(total_records, len(slots))
+        shard_rows = ranges[0][1]
+        log.info("Validating %s in %d shards of %d records.", file_path, len(ranges), shard_rows)
+        with ProcessPoolExecutor(
+            max_workers=len(ranges),
+            mp_context=multiprocessing.get_context("spawn"),
+            initializer=initializer,
+            initargs=initargs,
+        ) as pool:
+            shard_futures = [
+                pool.submit(validate_shard, file_path, lei, offset, length, exec_check) for offset, length in ranges
+            ]
+            spanning_uids, register_results = validate_register(file_path, lei, shard_rows, len(ranges))
+            for future in as_completed(shard_futures):
+                if future.result() is None or exec_check.get("superseded"):
+                    # the other shards stop at their next batch as well
+                    pool.shutdown(wait=False, cancel_futures=True)
+                    return None
+            shard_results = [f.result() for f in shard_futures]
+    finally:
+        for slot in slots:
+            slot.release()
+    merged = merge_results(shard_results, [offset for offset, _ in ranges], spanning_uids, register_results)
+    return cap_findings(merged, settings.max_validation_errors)
@@ -1,16 +1,11 @@
-from typing import Generator
-import polars as pl
-import importlib.metadata as imeta
+from typing import Generator, List
+import asyncio
+import csv
+import io
+import itertools
 import logging
 
 from fastapi import UploadFile
-from regtech_data_validator.validator import validate_data
-from regtech_data_validator.data_formatters import df_to_dicts, df_to_download
-from regtech_data_validator.checks import Severity
-from regtech_data_validator.validation_results import ValidationPhase, ValidationResults
-from sbl_filing_api.entities.engine.engine import SessionLocal
-from sbl_filing_api.entities.models.dao import SubmissionDAO, SubmissionState
-from sbl_filing_api.entities.repos.submission_repo import update_submission
 from http import HTTPStatus
 from sbl_filing_api.config import FsProtocol, settings
 from sbl_filing_api.services import file_handler
@@ -40,7 +35,106 @@ def validate_file_processable(file: UploadFile) -> None:
         )
 
 
-def upload_to_storage(period_code: str, lei: str, file_identifier: str, content: bytes, extension: str = "csv") -> None:
+class RecordCounter:
+    """
+    Counts the records of a csv as it's streamed in chunks, without parsing it; line breaks within
+    quoted fields are not counted as new records.  The header row is not counted.
+    """
+
+    def __init__(self):
+        self.rows = 0
+        self.in_quotes = False
+        self.ends_with_newline = True
+
+    def update(self, chunk: bytes) -> None:
+        if not chunk:
+            return
+        # walk the quotes with find rather than splitting the chunk on them, which copies it piece by piece
+        start = 0
+        while start < len(chunk):
+            quote = chunk.find(b'"', start)
+            end = quote if quote != -1 else len(chunk)
+            if not self.in_quotes:
+                self.rows += chunk.count(b"\n", start, end)
+            if quote == -1:
+                break
+            self.in_quotes = not self.in_quotes
+            start = quote + 1
+        self.ends_with_newline = chunk.endswith(b"\n")
+
+    @property
+    def total_records(self) -> int:
+        rows = self.rows if self.ends_with_newline else self.rows + 1
+        return max(rows - 1, 0)
+
+
+def malformed_submission(detail: str) -> RegTechHttpException:
+    return RegTechHttpException(status_code=HTTPStatus.UNPROCESSABLE_ENTITY, name="Malformed Submission", detail=detail)
+
+
+def check_structure(head: bytes | bytearray, expected_header: List[str] | None = None) -> None:
+    """
+    Cheap pre-flight check of the start of an upload, so files that could never be validated are turned away before
+    they're stored and queued.  The file has to be UTF-8 and comma delimited, its header has to match the validator's
+    columns when they're known, and its first submission_preflight_rows rows need as many fields as the header.
+
+    Args:
+        head: the complete lines at the start of the file
+        expected_header: the validator's column names, in order
+    """
+    try:
+        text = head.decode("utf-8-sig")
+    except UnicodeDecodeError as e:
+        raise malformed_submission(f"The file is not UTF-8 encoded, found an invalid byte at position {e.start}.")
+
+    rows = itertools.islice(csv.reader(io.StringIO(text, newline="")), settings.submission_preflight_rows + 1)
+    try:
+        header = next(rows, None)
+        if not header:
+            raise malformed_submission("The file is empty, it needs a header row.")
+        if len(header) == 1 and any(delimiter in header[0] for delimiter in ";\t|"):
+            raise malformed_submission("The file has to be comma delimited.")
+        if expected_header and header != expected_header:
+            for index, (column, expected) in enumerate(zip(header, expected_header), start=1):
+                if column != expected:
+                    raise malformed_submission(f'Header column {index} is "{column}", expected "{expected}".')
+            raise malformed_submission(f"The header has {len(header)} columns, expected {len(expected_header)}.")
+        for line, row in enumerate(rows, start=2):
+            if row and len(row) != len(header):
+                raise malformed_submission(
+                    f"Row {line} has {len(row)} fields, expected {len(header)} to match the header."
+                )
+    except csv.Error as e:
+        raise malformed_submission(f"The file is not a readable CSV: {e}.") from e
+
+
+async def read_submission(file: UploadFile, expected_header: List[str] | None = None) -> tuple[bytearray, int]:
+    """
+    Reads the uploaded file in chunks, counting the records as it goes so the content doesn't need to be parsed
+    a second time just to get the record count.  The structure is checked as soon as enough rows have arrived,
+    so a malformed file is rejected without reading the rest of it.  The chunks are appended to a single buffer,
+    so only one copy of the file is held, and they're counted in a worker thread to keep the event loop free.
+
+    Returns:
+        the file content and its total record count
+    """
+    counter = RecordCounter()
+    content = bytearray()
+    checked = not settings.submission_preflight_rows
+    while chunk := await file.read(settings.submission_read_chunk_size):
+        await asyncio.to_thread(counter.update, chunk)
+        content += chunk
+        if not checked and counter.rows > settings.submission_preflight_rows:
+            check_structure(content[: content.rfind(b"\n") + 1], expected_header)
+            checked = True
+    if not checked:
+        check_structure(content, expected_header)
+    return content, counter.total_records
+
+
+def upload_to_storage(
+    period_code: str, lei: str, file_identifier: str, content: bytes | bytearray, extension: str = "csv"
+) -> None:
     try:
         file_handler.upload(path=f"upload/{period_code}/{lei}/{file_identifier}.{extension}", content=content)
     except Exception as e:
@@ -49,6 +143,23 @@ def upload_to_storage(period_code: str, lei: str, file_identifier: str, content:
         ) from e
 
 
+def upload_file_to_storage(
+    period_code: str, lei: str, file_identifier: str, local_file: str, extension: str = "csv"
+) -> None:
+    try:
+        file_handler.upload_file(
+            path=f"upload/{period_code}/{lei}/{file_identifier}.{extension}", local_file=local_file
+        )
+    except Exception as e:
+        raise RegTechHttpException(
+            status_code=HTTPStatus.INTERNAL_SERVER_ERROR, name="Upload Failure", detail="Failed to upload file"
+        ) from e
+
+
+def exists_in_storage(period_code: str, lei: str, file_identifier: str, extension: str = "csv") -> bool:
+    return file_handler.exists(f"upload/{period_code}/{lei}/{file_identifier}.{extension}")
+
+
 def get_from_storage(period_code: str, lei: str, file_identifier: str, extension: str = "csv") -> Generator:
     try:
         return file_handler.download(f"upload/{period_code}/{lei}/{file_identifier}.{extension}")
@@ -63,114 +174,3 @@ def generate_file_path(period_code: str, lei: str, file_identifier: str, extensi
     if settings.fs_upload_config.protocol == FsProtocol.S3.value:
         file_path = "s3://" + file_path
     return file_path
-
-
-async def validate_and_update_submission(
-    period_code: str, lei: str, submission: SubmissionDAO, content: bytes, exec_check: dict
-):
-    async with SessionLocal() as session:
-        try:
-            validator_version = imeta.version("regtech-data-validator")
-            submission.validation_ruleset_version = validator_version
-            submission.state = SubmissionState.VALIDATION_IN_PROGRESS
-            submission = await update_submission(session, submission)
-
-            file_path = generate_file_path(period_code, lei, submission.counter)
-
-            final_phase = ValidationPhase.LOGICAL
-            all_findings = []
-            final_df = pl.DataFrame()
-
-            lf = pl.scan_csv(file_path, infer_schema=False, missing_utf8_is_empty_string=True)
-
-            for validation_results in validate_data(
-                lf,
-                context={"lei": lei},
-                batch_size=50000,
-                batch_count=1,
-                max_errors=settings.max_validation_errors,
-            ):
-                final_phase = validation_results.phase
-                all_findings.append(validation_results)
-
-            if all_findings:
-                final_df = pl.concat([v.findings for v in all_findings], how="diagonal")
-
-            submission.validation_results = build_validation_results(final_df, all_findings, final_phase)
-
-            if final_df.is_empty():
-                submission.state = SubmissionState.VALIDATION_SUCCESSFUL
-            elif (
-                final_phase == ValidationPhase.SYNTACTICAL
-                or submission.validation_results["logic_errors"]["total_count"] > 0
-            ):
-                submission.state = SubmissionState.VALIDATION_WITH_ERRORS
-            else:
-                submission.state = SubmissionState.VALIDATION_WITH_WARNINGS
-
-            submission_report = df_to_download(
-                final_df,
-                warning_count=sum([r.warning_counts.total_count for r in all_findings]),
-                error_count=sum([r.error_counts.total_count for r in all_findings]),
-                max_errors=settings.max_validation_errors,
-            )
-            upload_to_storage(period_code, lei, str(submission.counter) + REPORT_QUALIFIER, submission_report)
-
-            if not exec_check["continue"]:
-                log.warning(f"Submission {submission.id} is expired, will not be updating final state with results.")
-                return
-
-            await update_submission(session, submission)
-
-        except RuntimeError:
-            log.exception("The file is malformed.")
-            submission.state = SubmissionState.SUBMISSION_UPLOAD_MALFORMED
-            await update_submission(session, submission)
-
-        except Exception:
-            log.exception("Validation for submission %d did not complete due to an unexpected error.", submission.id)
-            submission.state = SubmissionState.VALIDATION_ERROR
-            await update_submission(session, submission)
-
-
-def build_validation_results(final_df: pl.DataFrame, results: list[ValidationResults], final_phase: ValidationPhase):
-    val_json = df_to_dicts(final_df, settings.max_json_records, settings.max_json_group_size)
-    if final_phase == ValidationPhase.SYNTACTICAL:
-        syntax_error_counts = sum([r.error_counts.single_field_count for r in results])
-        val_res = {
-            "syntax_errors": {
-                "single_field_count": syntax_error_counts,
-                "multi_field_count": 0,  # this will always be zero for syntax errors
-                "register_count": 0,  # this will always be zero for syntax errors
-                "total_count": syntax_error_counts,
-                "details": val_json,
-            }
-        }
-    else:
-        errors_list = [e for e in val_json if e["validation"]["severity"] == Severity.ERROR]
-        warnings_list = [w for w in val_json if w["validation"]["severity"] == Severity.WARNING]
-        val_res = {
-            "syntax_errors": {
-                "single_field_count": 0,
-                "multi_field_count": 0,
-                "register_count": 0,
-                "total_count": 0,
-                "details": [],
-            },
-            "logic_errors": {
-                "single_field_count": sum([r.error_counts.single_field_count for r in results]),
-                "multi_field_count": sum([r.error_counts.multi_field_count for r in results]),
-                "register_count": sum([r.error_counts.register_count for r in results]),
-                "total_count": sum([r.error_counts.total_count for r in results]),
-                "details": errors_list,
-            },
-            "logic_warnings": {
-                "single_field_count": sum([r.warning_counts.single_field_count for r in results]),
-                "multi_field_count": sum([r.warning_counts.multi_field_count for r in results]),
-                "register_count": sum([r.warning_counts.register_count for r in results]),
-                "total_count": sum([r.warning_counts.total_count for r in results]),
-                "details": warnings_list,
-            },
-        }
-
-    return val_res
@@ -0,0 +1,56 @@
+import fcntl
+import logging
+import os
+
+from typing import Set
+
+log = logging.getLogger(__name__)
+
+
+class ValidationSlot:
+    def __init__(self, governor: "ValidationGovernor", index: int, fd: int):
+        self.governor = governor
+        self.index = index
+        self.fd = fd
+
+    def release(self, *_) -> None:
+        """
+        Frees the slot; takes and ignores extra args so it can be used directly as a future's done callback
+        """
+        if self.fd is None:
+            return
+        fcntl.lockf(self.fd, fcntl.LOCK_UN)
+        os.close(self.fd)
+        self.fd = None
+        self.governor.held.discard(self.index)
+
+
+class ValidationGovernor:
+    """
+    Host wide limit on concurrently running validations, shared by all the uvicorn worker processes.
+
+    Each slot is a lock file in slot_dir.  POSIX record locks belong to the process that took them, so they aren't
+    inherited by the validation pool's processes, and are dropped by the OS if a worker dies, so slots can't leak.
+    Since a process can re-lock a file it already holds, slots held by this process are also tracked locally.
+    """
+
+    def __init__(self, slot_dir: str, slots: int):
+        self.slot_dir = slot_dir
+        self.slots = slots
+        self.held: Set[int] = set()
+
+    def try_acquire(self) -> ValidationSlot | None:
+        os.makedirs(self.slot_dir, exist_ok=True)
+        for index in range(self.slots):
+            if index in self.held:
+                continue
+            fd = os.open(os.path.join(self.slot_dir, f"slot_{index}.lock"), os.O_RDWR | os.O_CREAT, 0o600)
+            try:
+                fcntl.lockf(fd, fcntl.LOCK_EX | fcntl.LOCK_NB)
+            except OSError:
+                os.close(fd)
+                continue
+            self.held.add(index)
+            return ValidationSlot(self, index, fd)
+        log.debug("All %d validation slots are in use.", self.slots)
+        return None
@@ -0,0 +1,382 @@
+"""
+Everything that runs inside the validation worker processes.  This is the only module importing polars and the
+validator, and it's only loaded by the workers, keeping the validation stack out of the API's own processes.
+"""
+
+import asyncio
+import importlib.metadata as imeta
+import logging
+import os
+import tempfile
+import threading
+import time
+
+import polars as pl
+
+from regtech_data_validator.validator import validate_data
+from regtech_data_validator.schema_template import get_template
+from regtech_data_validator.data_formatters import df_to_dicts, df_to_download
+from regtech_data_validator.checks import Severity
+from regtech_data_validator.validation_results import ValidationPhase, ValidationResults
+from sqlalchemy import text
+
+from sbl_filing_api.config import settings
+from sbl_filing_api.entities.engine.engine import SessionLocal, engine
+from sbl_filing_api.entities.models.dao import SubmissionState
+from sbl_filing_api.entities.repos import submission_repo as repo
+from sbl_filing_api.entities.repos.submission_repo import get_submission, set_submission_state
+from sbl_filing_api.services import sharded_validator
+from sbl_filing_api.services.submission_processor import (
+    REPORT_QUALIFIER,
+    exists_in_storage,
+    generate_file_path,
+    upload_file_to_storage,
+    upload_to_storage,
+)
+
+log = logging.getLogger(__name__)
+
+PARQUET_EXTENSION = "parquet"
+
+# the submission this worker process is validating, looked at by the memory watchdog
+current_submission_id: int | None = None
+
+
+def init_worker():
+    limit_resources()
+    if settings.validation_warm_workers:
+        warm_worker()
+
+
+def init_shard_worker(submission_id: int):
+    """
+    Sets up the processes validating the shards of a sharded validation like the worker itself, so they're held to
+    the same thread count and memory ceiling, going over it erroring out the submission being validated
+    """
+    global current_submission_id
+    current_submission_id = submission_id
+    limit_resources()
+
+
+def limit_resources():
+    # polars sizes its thread pool on first use, so this has to be set before the worker validates anything
+    os.environ["POLARS_MAX_THREADS"] = str(settings.validation_polars_threads)
+    if settings.validation_max_rss:
+        threading.Thread(target=watch_memory, name="validation-memory-watchdog", daemon=True).start()
+
+
+async def ping_db():
+    async with engine.connect() as conn:
+        await conn.execute(text("SELECT 1"))
+
+
+def warm_worker():
+    """
+    Gets the slow first time work done before the worker picks up a submission: running the validator once
+    so it's imported and has built its schemas, and connecting to the database so the engine has set up its dialect.
+    """
+    start = time.monotonic()
+    try:
+        for _ in validate_data(pl.LazyFrame({"uid": [""]}), context={"lei": ""}):
+            pass
+    except Exception:
+        log.warning("Unable to warm up the validator.", exc_info=True)
+    try:
+        asyncio.get_event_loop().run_until_complete(ping_db())
+    except Exception:
+        log.warning("Unable to warm up the database connection.", exc_info=True)
+    log.info("Validation worker %d warmed up in %.2f seconds.", os.getpid(), time.monotonic() - start)
+
+
+def expected_header() -> list[str]:
+    return list(get_template())
+
+
+def get_rss() -> int:
+    with open("/proc/self/statm") as statm:
+        return int(statm.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+
+
+def check_memory():
+    """
+    Errors out the submission being validated and exits the worker if it has gone over the memory ceiling,
+    so one oversized file fails on its own instead of getting the whole container OOM killed.
+    """
+    submission_id = current_submission_id
+    if submission_id is None:
+        return
+    rss = get_rss()
+    if rss <= settings.validation_max_rss:
+        return
+    log.error(
+        "Validation for submission %d is using %d bytes of memory, over the %d limit, stopping its worker.",
+        submission_id,
+        rss,
+        settings.validation_max_rss,
+    )
+    try:
+        asyncio.run(repo.error_out_submission(submission_id))
+    except Exception:
+        log.exception("Unable to set submission %d to VALIDATION_ERROR.", submission_id)
+    os._exit(1)
+
+
+def watch_memory():
+    while True:
+        time.sleep(settings.validation_rss_check_secs)
+        check_memory()
+
+
+def cache_submission(period_code: str, lei: str, counter: int, convert: bool = True) -> str:
+    """
+    Returns the path to read the submission from, its Parquet copy if there is one.  With convert, a missing copy is
+    written next to the uploaded csv in storage first.  Columns stay strings, as the validator expects, but later
+    scans of the submission are columnar and can push predicates down instead of parsing the csv again.  Falls back
+    to the csv if the copy can't be written.
+    """
+    file_path = generate_file_path(period_code, lei, counter)
+    if not settings.submission_parquet_cache:
+        return file_path
+    try:
+        if not exists_in_storage(period_code, lei, counter, PARQUET_EXTENSION):
+            if not convert:
+                return file_path
+            with tempfile.TemporaryDirectory() as tmp_dir:
+                local_file = os.path.join(tmp_dir, f"{counter}.{PARQUET_EXTENSION}")
+                sharded_validator.scan_submission(file_path).sink_parquet(local_file)
+                upload_file_to_storage(period_code, lei, counter, local_file, PARQUET_EXTENSION)
+        return generate_file_path(period_code, lei, counter, PARQUET_EXTENSION)
+    except Exception:
+        log.warning("Unable to cache submission %s as Parquet, reading the csv instead.", file_path, exc_info=True)
+        return file_path
+
+
+def handle_submission(period_code: str, lei: str, submission_id: int, exec_check):
+    global current_submission_id
+    current_submission_id = submission_id
+    loop = asyncio.get_event_loop()
+    try:
+        coro = validate_and_update_submission(period_code, lei, submission_id, exec_check)
+        loop.run_until_complete(coro)
+    except Exception as e:
+        log.error(e, exc_info=True, stack_info=True)
+    finally:
+        current_submission_id = None
+
+
+async def validate_and_update_submission(period_code: str, lei: str, submission_id: int, exec_check: dict):
+    """
+    Only identifiers are handed to the validation worker; the submission is loaded here and the uploaded file is read
+    straight from storage, local files being memory mapped by polars' scan, so nothing large is pickled across the
+    process boundary.
+    """
+    async with SessionLocal() as session:
+        submission = await get_submission(session, submission_id)
+    # closing the session detaches the submission, so the changes made to it below are never flushed and are only
+    # written through set_submission_state, which leaves a submission superseded in the meantime alone
+    if not submission:
+        log.error("Submission %d not found, unable to validate.", submission_id)
+        return
+    if submission.state == SubmissionState.SUBMISSION_SUPERSEDED:
+        log.info("Submission %d was superseded before its validation started.", submission_id)
+        return
+    # anything but a fresh upload has been picked up before, e.g. retried after its worker died
+    revalidation = submission.state != SubmissionState.SUBMISSION_UPLOADED
+    async with SessionLocal() as session:
+        try:
+            validator_version = imeta.version("regtech-data-validator")
+            submission.validation_ruleset_version = validator_version
+            submission.state = SubmissionState.VALIDATION_IN_PROGRESS
+            if not await set_submission_state(
+                session, submission.id, submission.state, validation_ruleset_version=validator_version
+            ):
+                log.info("Submission %d was superseded before its validation started.", submission.id)
+                return
+
+            sharded = bool(
+                settings.sharded_validation_min_records
+                and submission.total_records
+                and submission.total_records > settings.sharded_validation_min_records
+            )
+            # a single pass over the csv reads it once, converting it first would add a read and a write for nothing,
+            # so the Parquet copy is only made when the submission is scanned by each shard or read again
+            file_path = cache_submission(period_code, lei, submission.counter, convert=sharded or revalidation)
+
+            final_phase = ValidationPhase.LOGICAL
+            all_findings = []
+            final_df = pl.DataFrame()
+
+            if sharded:
+                all_findings = sharded_validator.validate_sharded(
+                    file_path,
+                    lei,
+                    submission.total_records,
+                    exec_check,
+                    initializer=init_shard_worker,
+                    initargs=(submission.id,),
+                )
+                if all_findings is None:
+                    log.info("Submission %d was superseded, stopping its validation.", submission.id)
+                    return
+                if all_findings:
+                    final_phase = all_findings[-1].phase
+            else:
+                lf = sharded_validator.scan_submission(file_path)
+
+                for validation_results in validate_data(
+                    lf,
+                    context={"lei": lei},
+                    batch_size=settings.validation_batch_size,
+                    batch_count=1,
+                    max_errors=settings.max_validation_errors,
+                ):
+                    if exec_check.get("superseded"):
+                        log.info("Submission %d was superseded, stopping its validation.", submission.id)
+                        return
+                    final_phase = validation_results.phase
+                    all_findings.append(validation_results)
+
+            if all_findings:
+                final_df = pl.concat([v.findings for v in all_findings], how="diagonal")
+
+            upload_report(period_code, lei, submission.counter, final_df, all_findings)
+            summary = summarize_findings(final_df)
+
+            submission.validation_results = build_validation_results(final_df, all_findings, final_phase)
+
+            if final_df.is_empty():
+                submission.state = SubmissionState.VALIDATION_SUCCESSFUL
+            elif (
+                final_phase == ValidationPhase.SYNTACTICAL
+                or submission.validation_results["logic_errors"]["total_count"] > 0
+            ):
+                submission.state = SubmissionState.VALIDATION_WITH_ERRORS
+            else:
+                submission.state = SubmissionState.VALIDATION_WITH_WARNINGS
+
+            if not exec_check["continue"]:
+                log.warning(f"Submission {submission.id} is expired, will not be updating final state with results.")
+                return
+
+            if (
+                settings.supersede_validations
+                and await repo.get_submission_state(submission.id) == SubmissionState.SUBMISSION_SUPERSEDED
+            ):
+                log.info(f"Submission {submission.id} was superseded, will not be updating final state with results.")
+                return
+
+            await repo.add_validation_summary(session, submission.id, summary)
+            if not await set_submission_state(
+                session, submission.id, submission.state, validation_results=submission.validation_results
+            ):
+                log.info(f"Submission {submission.id} was superseded, will not be updating final state with results.")
+
+        except RuntimeError:
+            log.exception("The file is malformed.")
+            submission.state = SubmissionState.SUBMISSION_UPLOAD_MALFORMED
+            await set_submission_state(session, submission.id, submission.state)
+
+        except Exception:
+            log.exception("Validation for submission %d did not complete due to an unexpected error.", submission.id)
+            submission.state = SubmissionState.VALIDATION_ERROR
+            await set_submission_state(session, submission.id, submission.state)
+
+
+def upload_report(
+    period_code: str, lei: str, counter: int, final_df: pl.DataFrame, results: list[ValidationResults]
+) -> None:
+    """
+    Formats the validation report and uploads it, before the JSON results are built, so the two aren't held at once
+    """
+    submission_report = df_to_download(
+        final_df,
+        warning_count=sum([r.warning_counts.total_count for r in results]),
+        error_count=sum([r.error_counts.total_count for r in results]),
+        max_errors=settings.max_validation_errors,
+    )
+    upload_to_storage(period_code, lei, f"{counter}{REPORT_QUALIFIER}", submission_report)
+
+
+SUMMARY_KEYS = ["validation_id", "validation_type", "scope", "field_name"]
+
+
+def summarize_findings(final_df: pl.DataFrame) -> list[dict]:
+    """
+    Counts the findings, and the records they're in, for each validation, and each field for the validations
+    reporting them, for the submission's validation summary
+    """
+    if final_df.is_empty():
+        return []
+    keys = [key for key in SUMMARY_KEYS if key in final_df.columns]
+    # findings on several fields have a row per field, so count findings rather than rows
+    findings = pl.col("finding_no").n_unique() if "finding_no" in final_df.columns else pl.len()
+    records = pl.col("record_no").n_unique() if "record_no" in final_df.columns else findings
+    return (
+        final_df.group_by(keys)
+        .agg(finding_count=findings, record_count=records)
+        .rename({"validation_type": "severity"})
+        .with_columns(pl.col("severity").cast(pl.String))
+        .to_dicts()
+    )
+
+
+COUNT_FIELDS = ["single_field_count", "multi_field_count", "register_count", "total_count"]
+
+
+def sum_counts(results: list[ValidationResults]) -> tuple[dict[str, int], dict[str, int]]:
+    """
+    Totals the error and warning counts of every batch in one pass
+    """
+    errors, warnings = dict.fromkeys(COUNT_FIELDS, 0), dict.fromkeys(COUNT_FIELDS, 0)
+    for result in results:
+        for field in COUNT_FIELDS:
+            errors[field] += getattr(result.error_counts, field)
+            warnings[field] += getattr(result.warning_counts, field)
+    return errors, warnings
+
+
+def trim_findings(final_df: pl.DataFrame, group_size: int) -> pl.DataFrame:
+    """
+    Keeps the first group_size findings of each validation, and one more so df_to_dicts can still tell a group was
+    cut short, with every field row of those findings.  df_to_dicts goes over its frame a row at a time, so this
+    bounds that work by the size of the details rather than by every finding in the submission
+    """
+    if "finding_no" not in final_df.columns or "validation_id" not in final_df.columns:
+        return final_df
+    return final_df.filter(pl.col("finding_no").rank("dense").over("validation_id") <= group_size + 1)
+
+
+def build_validation_results(final_df: pl.DataFrame, results: list[ValidationResults], final_phase: ValidationPhase):
+    val_json = df_to_dicts(
+        trim_findings(final_df, settings.max_json_group_size), settings.max_json_records, settings.max_json_group_size
+    )
+    error_counts, warning_counts = sum_counts(results)
+    if final_phase == ValidationPhase.SYNTACTICAL:
+        syntax_error_counts = error_counts["single_field_count"]
+        val_res = {
+            "syntax_errors": {
+                "single_field_count": syntax_error_counts,
+                "multi_field_count": 0,  # this will always be zero for syntax errors
+                "register_count": 0,  # this will always be zero for syntax errors
+                "total_count": syntax_error_counts,
+                "details": val_json,
+            }
+        }
+    else:
+        # details are grouped by validation, so this splits the groups rather than going over every record
+        details = {Severity.ERROR: [], Severity.WARNING: []}
+        for group in val_json:
+            details.setdefault(group["validation"]["severity"], []).append(group)
+        val_res = {
+            "syntax_errors": {
+                "single_field_count": 0,
+                "multi_field_count": 0,
+                "register_count": 0,
+                "total_count": 0,
+                "details": [],
+            },
+            "logic_errors": {**error_counts, "details": details[Severity.ERROR]},
+            "logic_warnings": {**warning_counts, "details": details[Severity.WARNING]},
+        }
+
+    return val_res
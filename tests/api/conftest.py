@@ -1,5 +1,6 @@
 import pytest
 
+from collections import Counter
 from datetime import datetime
 from fastapi import FastAPI
 from pytest_mock import MockerFixture
@@ -230,3 +231,15 @@ def submission_csv(tmpdir_factory) -> str:
     filename = str(tmpdir_factory.mktemp("data").join("submission.csv"))
     df.to_csv(filename)
     return filename
+
+
+@pytest.fixture(autouse=True)
+def validation_slot_mock(mocker: MockerFixture) -> Mock:
+    from sbl_filing_api.routers.filing import validation_pool
+
+    mocker.patch.object(validation_pool, "pending", [])
+    mocker.patch.object(validation_pool, "running", Counter())
+    mocker.patch.object(validation_pool, "active", {})
+    # the validator's columns are loaded in their own process, which the tests don't start
+    mocker.patch.object(validation_pool, "get_header", return_value=None)
+    return mocker.patch.object(validation_pool.governor, "try_acquire")
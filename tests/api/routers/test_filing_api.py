@@ -1,5 +1,8 @@
 import asyncio
+import csv
 import datetime
+import io
+import json
 from http import HTTPStatus
 import pytest
 
@@ -11,6 +14,7 @@ from unittest.mock import ANY, Mock, AsyncMock
 from fastapi import FastAPI, HTTPException
 from fastapi.testclient import TestClient
 from pytest_mock import MockerFixture
+from starlette.authentication import AuthCredentials
 
 from sbl_filing_api.entities.models.dao import (
     SubmissionDAO,
@@ -19,6 +23,7 @@ from sbl_filing_api.entities.models.dao import (
     ContactInfoDAO,
     FilingDAO,
     UserActionDAO,
+    ValidationSummaryDAO,
 )
 from sbl_filing_api.entities.models.dto import ContactInfoDTO, UserActionDTO
 from sbl_filing_api.entities.models.model_enums import UserActionType
@@ -54,7 +59,7 @@ class TestFilingApi:
     def test_get_filing(self, app_fixture: FastAPI, get_filing_mock: Mock, authed_user_mock: Mock):
         client = TestClient(app_fixture)
         res = client.get("/v1/filing/institutions/1234567890ABCDEFGH00/filings/2024/")
-        get_filing_mock.assert_called_with(ANY, "1234567890ABCDEFGH00", "2024")
+        get_filing_mock.assert_called_with(ANY, "1234567890ABCDEFGH00", "2024", fields=None)
         assert res.status_code == 200
         assert res.json()["lei"] == "1234567890ABCDEFGH00"
         assert res.json()["filing_period"] == "2024"
@@ -63,6 +68,18 @@ class TestFilingApi:
         res = client.get("/v1/filing/institutions/1234567890ABCDEFGH00/filings/2024/")
         assert res.status_code == 204
 
+    def test_get_filing_sparse_fields(self, app_fixture: FastAPI, get_filing_mock: Mock, authed_user_mock: Mock):
+        client = TestClient(app_fixture)
+        res = client.get("/v1/filing/institutions/1234567890ABCDEFGH00/filings/2024/?fields=lei, filing_period")
+        get_filing_mock.assert_called_with(ANY, "1234567890ABCDEFGH00", "2024", fields={"lei", "filing_period"})
+        assert res.status_code == 200
+        assert res.json() == {"lei": "1234567890ABCDEFGH00", "filing_period": "2024"}
+
+        res = client.get("/v1/filing/institutions/1234567890ABCDEFGH00/filings/2024/?fields=lei,submissions")
+        assert res.status_code == 422
+        assert res.json()["error_name"] == "Invalid Fields"
+        assert "['submissions']" in res.json()["error_detail"]
+
     def test_unauthed_get_filings(self, app_fixture: FastAPI, get_filing_mock: Mock):
         client = TestClient(app_fixture)
         res = client.get("/v1/filing/periods/2024/filings")
@@ -72,7 +89,7 @@ class TestFilingApi:
         client = TestClient(app_fixture)
         res = client.get("/v1/filing/periods/2024/filings")
         leis = ["1234567890ABCDEFGH00", "1234567890ABCDEFGH01", "1234567890ZXWVUTSR00"]
-        get_filings_mock.assert_called_with(ANY, leis, "2024")
+        get_filings_mock.assert_called_with(ANY, leis, "2024", fields=None)
         assert res.status_code == 200
         for i in range(len(res.json())):
             assert res.json()[i]["lei"] == leis[i]
@@ -81,6 +98,113 @@ class TestFilingApi:
         res = client.get("/v1/filing/periods/2024/filings")
         assert res.json() == []
 
+    def test_get_filings_compressed(self, app_fixture: FastAPI, get_filings_mock: Mock, authed_user_mock: Mock):
+        client = TestClient(app_fixture)
+        res = client.get("/v1/filing/periods/2024/filings", headers={"Accept-Encoding": "gzip"})
+        assert res.status_code == 200
+        assert res.headers["content-encoding"] == "gzip"
+        assert len(res.json()) == len(get_filings_mock.return_value)
+
+        res = client.get("/v1/filing/periods/2024/filings", headers={"Accept-Encoding": "identity"})
+        assert "content-encoding" not in res.headers
+
+        # small responses aren't worth compressing
+        get_filings_mock.return_value = []
+        res = client.get("/v1/filing/periods/2024/filings", headers={"Accept-Encoding": "gzip"})
+        assert "content-encoding" not in res.headers
+
+    def test_get_filings_status(
+        self, mocker: MockerFixture, app_fixture: FastAPI, get_filings_mock: Mock, authed_user_mock: Mock
+    ):
+        class StatusRow(tuple):
+            id = 2
+            counter = 3
+            state = SubmissionState.VALIDATION_WITH_ERRORS
+            submission_time = dt.now()
+            total_records = 100
+            syntax_error_count = 0
+            logic_error_count = 5
+            logic_warning_count = 1
+
+        class NoSubmissionRow(tuple):
+            id = None
+
+        filings = get_filings_mock.return_value
+        status_mock = mocker.patch("sbl_filing_api.entities.repos.submission_repo.get_filings_status")
+        status_mock.return_value = [StatusRow((filings[0],)), NoSubmissionRow((filings[1],))]
+
+        client = TestClient(app_fixture)
+        res = client.get("/v1/filing/periods/2024/filings/status")
+        status_mock.assert_called_with(
+            ANY, ["1234567890ABCDEFGH00", "1234567890ABCDEFGH01", "1234567890ZXWVUTSR00"], "2024"
+        )
+        assert res.status_code == 200
+        results = res.json()
+        assert results[0]["filing"]["lei"] == "1234567890ABCDEFGH00"
+        assert results[0]["latest_submission"]["counter"] == 3
+        assert results[0]["latest_submission"]["state"] == SubmissionState.VALIDATION_WITH_ERRORS
+        assert results[0]["latest_submission"]["logic_error_count"] == 5
+        assert results[1]["filing"]["lei"] == "1234567890ABCDEFGH01"
+        assert results[1]["latest_submission"] is None
+
+        res = client.get("/v1/filing/periods/2024/filings/status?lei=1234567890ABCDEFGH01")
+        status_mock.assert_called_with(ANY, ["1234567890ABCDEFGH01"], "2024")
+        assert res.status_code == 200
+
+        res = client.get("/v1/filing/periods/2024/filings/status?lei=1234567890ABCDEFGH01&lei=NOTMYLEI")
+        assert res.status_code == 403
+        assert res.json()["error_detail"] == "LEI(s) ['NOTMYLEI'] are not associated with the user."
+
+    def test_export_period_filings(
+        self, mocker: MockerFixture, app_fixture: FastAPI, get_filings_mock: Mock, authed_user_mock: Mock
+    ):
+        class ExportRow(tuple):
+            latest_submission_counter = 2
+            latest_submission_state = SubmissionState.VALIDATION_SUCCESSFUL
+            latest_submission_time = dt.now()
+
+        async def rows(*args):
+            for filing in get_filings_mock.return_value:
+                yield ExportRow((filing,))
+
+        stream_mock = mocker.patch(
+            "sbl_filing_api.entities.repos.submission_repo.stream_period_filings", side_effect=rows
+        )
+        client = TestClient(app_fixture)
+
+        # needs admin roles
+        res = client.get("/v1/filing/periods/2024/filings/export")
+        assert res.status_code == 403
+
+        authed_user_mock.return_value = (
+            AuthCredentials(["authenticated", "query-groups", "manage-users"]),
+            authed_user_mock.return_value[1],
+        )
+        res = client.get("/v1/filing/periods/2024/filings/export")
+        stream_mock.assert_called_with("2024", 500)
+        assert res.status_code == 200
+        assert res.headers["content-type"] == "application/x-ndjson"
+        lines = [json.loads(line) for line in res.text.splitlines()]
+        assert [line["lei"] for line in lines] == [
+            "1234567890ABCDEFGH00",
+            "1234567890ABCDEFGH01",
+            "1234567890ZXWVUTSR00",
+        ]
+        assert lines[0]["latest_submission_counter"] == 2
+        assert lines[0]["latest_submission_state"] == SubmissionState.VALIDATION_SUCCESSFUL
+        assert lines[0]["contact_info"]["email"] == "test1@cfpb.gov"
+
+        res = client.get("/v1/filing/periods/2024/filings/export?format=csv")
+        assert res.status_code == 200
+        assert res.headers["content-type"].startswith("text/csv")
+        assert res.headers["content-disposition"] == 'attachment; filename="2024_filings.csv"'
+        csv_rows = list(csv.DictReader(io.StringIO(res.text)))
+        assert len(csv_rows) == 3
+        assert csv_rows[1]["lei"] == "1234567890ABCDEFGH01"
+        assert csv_rows[1]["latest_submission_state"] == SubmissionState.VALIDATION_SUCCESSFUL
+        assert csv_rows[1]["signature_count"] == "0"
+        assert csv_rows[1]["contact_info_hq_address_city"] == "Test City"
+
     def test_unauthed_post_filing(self, app_fixture: FastAPI):
         client = TestClient(app_fixture)
         res = client.post("/v1/filing/institutions/ZXWVUTSRQP/filings/2024/")
@@ -183,23 +307,38 @@ class TestFilingApi:
             )
         ]
 
+        count_mock = mocker.patch("sbl_filing_api.entities.repos.submission_repo.count_submissions")
+        count_mock.return_value = 1
+
         client = TestClient(app_fixture)
         res = client.get("/v1/filing/institutions/1234567890ZXWVUTSR00/filings/2024/submissions")
         results = res.json()
-        mock.assert_called_with(ANY, "1234567890ZXWVUTSR00", "2024")
+        mock.assert_called_with(ANY, "1234567890ZXWVUTSR00", "2024", fields=None, before=None, limit=100)
+        count_mock.assert_called_with(ANY, "1234567890ZXWVUTSR00", "2024")
         assert res.status_code == 200
+        assert res.headers["X-Total-Count"] == "1"
         assert len(results) == 1
         assert results[0]["state"] == SubmissionState.SUBMISSION_UPLOADED
 
         # verify an empty submission list returns ok
         mock.return_value = []
+        count_mock.return_value = 0
         client = TestClient(app_fixture)
         res = client.get("/v1/filing/institutions/1234567890ZXWVUTSR00/filings/2024/submissions")
         results = res.json()
-        mock.assert_called_with(ANY, "1234567890ZXWVUTSR00", "2024")
+        mock.assert_called_with(ANY, "1234567890ZXWVUTSR00", "2024", fields=None, before=None, limit=100)
         assert res.status_code == 200
+        assert res.headers["X-Total-Count"] == "0"
         assert len(results) == 0
 
+        # verify paging through submissions
+        res = client.get("/v1/filing/institutions/1234567890ZXWVUTSR00/filings/2024/submissions?before=21&limit=10")
+        mock.assert_called_with(ANY, "1234567890ZXWVUTSR00", "2024", fields=None, before=21, limit=10)
+        assert res.status_code == 200
+
+        res = client.get("/v1/filing/institutions/1234567890ZXWVUTSR00/filings/2024/submissions?limit=101")
+        assert res.status_code == 422
+
     def test_unauthed_get_latest_submissions(
         self, mocker: MockerFixture, app_fixture: FastAPI, get_filing_period_mock: Mock
     ):
@@ -219,37 +358,44 @@ class TestFilingApi:
             timestamp=datetime.datetime.now(),
         )
 
-        mock = mocker.patch("sbl_filing_api.entities.repos.submission_repo.get_latest_submission")
-        mock.return_value = SubmissionDAO(
-            filing=1,
-            counter=1,
-            state=SubmissionState.VALIDATION_IN_PROGRESS,
-            validation_ruleset_version="v1",
-            submission_time=datetime.datetime.now(),
-            filename="file1.csv",
-            submitter_id=2,
-            submitter=user_action_submit,
+        mock = mocker.patch("sbl_filing_api.entities.repos.submission_repo.get_submission_with_raw_results")
+        mock.return_value = (
+            SubmissionDAO(
+                filing=1,
+                counter=1,
+                state=SubmissionState.VALIDATION_IN_PROGRESS,
+                validation_ruleset_version="v1",
+                submission_time=datetime.datetime.now(),
+                filename="file1.csv",
+                submitter_id=2,
+                submitter=user_action_submit,
+            ),
+            None,
         )
 
         client = TestClient(app_fixture)
         res = client.get("/v1/filing/institutions/1234567890ZXWVUTSR00/filings/2024/submissions/latest")
         result = res.json()
-        mock.assert_called_with(ANY, "1234567890ZXWVUTSR00", "2024")
+        mock.assert_called_with(ANY, "1234567890ZXWVUTSR00", "2024", fields=None)
         assert res.status_code == 200
         assert result["state"] == SubmissionState.VALIDATION_IN_PROGRESS
+        assert result["validation_results"] is None
 
         # verify an empty submission result is ok
-        mock.return_value = []
+        mock.return_value = (None, None)
         client = TestClient(app_fixture)
         res = client.get("/v1/filing/institutions/1234567890ZXWVUTSR00/filings/2024/submissions/latest")
-        mock.assert_called_with(ANY, "1234567890ZXWVUTSR00", "2024")
+        mock.assert_called_with(ANY, "1234567890ZXWVUTSR00", "2024", fields=None)
         assert res.status_code == 204
 
         # verify Filing Not Found RegTechHttpException returned when filing does not exist
-        get_filing_mock.return_value = None
+        mock.return_value = None
         client = TestClient(app_fixture)
         res = client.get("/v1/filing/institutions/1234567890ZXWVUTSR00/filings/2024/submissions/latest")
         assert res.status_code == 404
+        assert res.json()["error_name"] == "Filing Not Found"
+        # the filing is checked by the submission query itself
+        assert not get_filing_mock.called
 
     def test_unauthed_get_submission_by_id(self, mocker: MockerFixture, app_fixture: FastAPI):
         client = TestClient(app_fixture)
@@ -265,30 +411,163 @@ class TestFilingApi:
             action_type=UserActionType.SUBMIT,
             timestamp=datetime.datetime.now(),
         )
-        mock = mocker.patch("sbl_filing_api.entities.repos.submission_repo.get_submission_by_counter")
-        mock.return_value = SubmissionDAO(
-            id=1,
-            filing=1,
-            counter=2,
-            state=SubmissionState.VALIDATION_WITH_ERRORS,
-            validation_ruleset_version="v1",
-            submission_time=datetime.datetime.now(),
-            filename="file1.csv",
-            submitter_id=2,
-            submitter=user_action_submit,
+        mock = mocker.patch("sbl_filing_api.entities.repos.submission_repo.get_submission_with_raw_results")
+        mock.return_value = (
+            SubmissionDAO(
+                id=1,
+                filing=1,
+                counter=2,
+                state=SubmissionState.VALIDATION_WITH_ERRORS,
+                validation_ruleset_version="v1",
+                submission_time=datetime.datetime.now(),
+                filename="file1.csv",
+                submitter_id=2,
+                submitter=user_action_submit,
+            ),
+            '{"syntax_errors": {"count": 1, "details": [{"validation": {"id": "E0001"}}]}}',
         )
 
         client = TestClient(app_fixture)
 
         res = client.get("/v1/filing/institutions/1234567890ZXWVUTSR00/filings/2024/submissions/2")
-        mock.assert_called_with(ANY, "1234567890ZXWVUTSR00", "2024", 2)
+        mock.assert_called_with(ANY, "1234567890ZXWVUTSR00", "2024", 2, fields=None)
         assert res.status_code == 200
+        assert res.headers["content-type"] == "application/json"
+        assert res.json()["counter"] == 2
+        assert res.json()["submitter"]["user_name"] == "test submitter"
+        assert res.json()["validation_results"] == {
+            "syntax_errors": {"count": 1, "details": [{"validation": {"id": "E0001"}}]}
+        }
+
+        mock.return_value = (None, None)
+        res = client.get("/v1/filing/institutions/1234567890ZXWVUTSR00/filings/2024/submissions/1")
+        mock.assert_called_with(ANY, "1234567890ZXWVUTSR00", "2024", 1, fields=None)
+        assert res.status_code == 404
 
         mock.return_value = None
         res = client.get("/v1/filing/institutions/1234567890ZXWVUTSR00/filings/2024/submissions/1")
-        mock.assert_called_with(ANY, "1234567890ZXWVUTSR00", "2024", 1)
         assert res.status_code == 404
 
+    async def test_get_submission_sparse_fields(
+        self, mocker: MockerFixture, app_fixture: FastAPI, authed_user_mock: Mock
+    ):
+        mock = mocker.patch("sbl_filing_api.entities.repos.submission_repo.get_submission_with_raw_results")
+        mock.return_value = (
+            SubmissionDAO(
+                id=1,
+                filing=1,
+                counter=2,
+                state=SubmissionState.VALIDATION_WITH_ERRORS,
+                submission_time=datetime.datetime.now(),
+                filename="file1.csv",
+            ),
+            None,
+        )
+        queued_mock = mocker.patch("sbl_filing_api.entities.repos.submission_repo.get_queued_submissions")
+
+        client = TestClient(app_fixture)
+        res = client.get("/v1/filing/institutions/1234567890ZXWVUTSR00/filings/2024/submissions/2?fields=counter,state")
+        mock.assert_called_with(ANY, "1234567890ZXWVUTSR00", "2024", 2, fields={"counter", "state"})
+        assert res.status_code == 200
+        assert res.json() == {"counter": 2, "state": SubmissionState.VALIDATION_WITH_ERRORS}
+
+        mock.return_value = (mock.return_value[0], '{"syntax_errors": {"count": 1}}')
+        res = client.get(
+            "/v1/filing/institutions/1234567890ZXWVUTSR00/filings/2024/submissions/2?fields=validation_results"
+        )
+        assert res.json() == {"validation_results": {"syntax_errors": {"count": 1}}}
+
+        mock.return_value[0].state = SubmissionState.SUBMISSION_UPLOADED
+        mock.return_value[0].total_records = 100
+        queued_mock.return_value = [SubmissionDAO(id=1, total_records=100, submission_time=datetime.datetime.now())]
+        res = client.get(
+            "/v1/filing/institutions/1234567890ZXWVUTSR00/filings/2024/submissions/2?fields=queue_position"
+        )
+        assert res.json() == {"queue_position": 1}
+
+    async def test_get_queued_submission(self, mocker: MockerFixture, app_fixture: FastAPI, authed_user_mock: Mock):
+        user_action_submit = UserActionDAO(
+            id=2,
+            user_id="123456-7890-ABCDEF-GHIJ",
+            user_name="test submitter",
+            user_email="test@local.host",
+            action_type=UserActionType.SUBMIT,
+            timestamp=datetime.datetime.now(),
+        )
+        now = datetime.datetime.now()
+        mock = mocker.patch("sbl_filing_api.entities.repos.submission_repo.get_submission_with_raw_results")
+        mock.return_value = (
+            SubmissionDAO(
+                id=2,
+                filing=1,
+                counter=2,
+                state=SubmissionState.SUBMISSION_UPLOADED,
+                submission_time=now,
+                filename="file1.csv",
+                total_records=10000,
+                submitter_id=2,
+                submitter=user_action_submit,
+            ),
+            None,
+        )
+        queued_mock = mocker.patch("sbl_filing_api.entities.repos.submission_repo.get_queued_submissions")
+        queued_mock.return_value = [
+            SubmissionDAO(id=1, total_records=1000000, submission_time=now),
+            SubmissionDAO(id=2, total_records=10000, submission_time=now),
+            SubmissionDAO(id=3, total_records=100, submission_time=now),
+        ]
+
+        client = TestClient(app_fixture)
+        res = client.get("/v1/filing/institutions/1234567890ZXWVUTSR00/filings/2024/submissions/2")
+        assert res.status_code == 200
+        assert res.json()["queue_position"] == 2
+        assert res.json()["validation_eta"] is not None
+        since = queued_mock.call_args.args[1]
+        utc_now = datetime.datetime.now(datetime.timezone.utc).replace(tzinfo=None)
+        assert since.tzinfo is None
+        assert datetime.timedelta(minutes=59) < utc_now - since <= datetime.timedelta(hours=1, seconds=1)
+
+        mock.return_value[0].state = SubmissionState.VALIDATION_IN_PROGRESS
+        queued_mock.reset_mock()
+        res = client.get("/v1/filing/institutions/1234567890ZXWVUTSR00/filings/2024/submissions/2")
+        assert res.json()["queue_position"] is None
+        assert not queued_mock.called
+
+    async def test_get_submission_summary(self, mocker: MockerFixture, app_fixture: FastAPI, authed_user_mock: Mock):
+        mock = mocker.patch("sbl_filing_api.entities.repos.submission_repo.get_validation_summary")
+        mock.return_value = [
+            ValidationSummaryDAO(
+                id=1,
+                submission=3,
+                validation_id="E0001",
+                severity="Error",
+                scope="single-field",
+                field_name="uid",
+                finding_count=2,
+                record_count=2,
+            )
+        ]
+
+        client = TestClient(app_fixture)
+        res = client.get("/v1/filing/institutions/1234567890ZXWVUTSR00/filings/2024/submissions/2/summary")
+        mock.assert_called_with(ANY, "1234567890ZXWVUTSR00", "2024", 2)
+        assert res.status_code == 200
+        assert res.json() == [
+            {
+                "validation_id": "E0001",
+                "severity": "Error",
+                "scope": "single-field",
+                "field_name": "uid",
+                "finding_count": 2,
+                "record_count": 2,
+            }
+        ]
+
+        mock.return_value = None
+        res = client.get("/v1/filing/institutions/1234567890ZXWVUTSR00/filings/2024/submissions/3/summary")
+        assert res.status_code == 404
+        assert res.json()["error_name"] == "Submission Not Found"
+
     def test_authed_upload_file(
         self,
         mocker: MockerFixture,
@@ -343,10 +622,11 @@ class TestFilingApi:
         res = client.post("/v1/filing/institutions/1234567890ZXWVUTSR00/filings/2024/submissions", files=files)
         mock_add_submission.assert_called_with(ANY, 1, "submission.csv", user_action_submit.id)
         mock_event_loop.run_in_executor.assert_called_with(
-            ANY, handle_submission, "2024", "1234567890ZXWVUTSR00", return_sub, open(submission_csv, "rb").read(), ANY
+            ANY, handle_submission, "2024", "1234567890ZXWVUTSR00", return_sub.id, ANY
         )
-        assert mock_event_loop.run_in_executor.call_args.args[6]["continue"]
+        assert mock_event_loop.run_in_executor.call_args.args[5]["continue"]
         assert mock_update_submission.call_args.args[1].state == SubmissionState.SUBMISSION_UPLOADED
+        assert mock_update_submission.call_args.args[1].total_records == 1
         assert res.status_code == 200
         assert res.json()["id"] == 1
         assert res.json()["state"] == SubmissionState.SUBMISSION_UPLOADED
@@ -397,6 +677,7 @@ class TestFilingApi:
         authed_user_mock: Mock,
         submission_csv: str,
         get_filing_mock: Mock,
+        validation_slot_mock: Mock,
     ):
         return_sub = SubmissionDAO(
             id=1,
@@ -428,6 +709,7 @@ class TestFilingApi:
         res = client.post("/v1/filing/institutions/1234567890ZXWVUTSR00/filings/2024/submissions", files=file)
         assert res.status_code == 500
         assert res.json()["error_detail"] == "Error while trying to process SUBMIT User Action"
+        assert not validation_slot_mock.called
 
         mock_add_submitter.side_effect = None
         mock_add_submitter.return_value = UserActionDAO(
@@ -447,6 +729,105 @@ class TestFilingApi:
         assert res.status_code == 500
         assert res.json()["error_detail"] == "Error while trying to process SUBMIT User Action"
 
+    def test_upload_file_validation_capacity_reached(
+        self,
+        mocker: MockerFixture,
+        app_fixture: FastAPI,
+        authed_user_mock: Mock,
+        submission_csv: str,
+        get_filing_mock: Mock,
+    ):
+        mocker.patch("sbl_filing_api.services.submission_processor.validate_file_processable")
+        read_mock = mocker.patch("sbl_filing_api.services.submission_processor.read_submission")
+        mock_add_submission = mocker.patch("sbl_filing_api.entities.repos.submission_repo.add_submission")
+        mocker.patch("sbl_filing_api.routers.filing.validation_pool.is_full", return_value=True)
+
+        client = TestClient(app_fixture)
+        files = {"file": ("submission.csv", open(submission_csv, "rb"))}
+        res = client.post("/v1/filing/institutions/1234567890ZXWVUTSR00/filings/2024/submissions", files=files)
+
+        assert res.status_code == HTTPStatus.SERVICE_UNAVAILABLE
+        assert res.headers["Retry-After"] == "30"
+        assert res.json()["error_name"] == "Validation Capacity Reached"
+        assert not read_mock.called
+        assert not get_filing_mock.called
+        assert not mock_add_submission.called
+
+    def test_upload_file_malformed(
+        self,
+        mocker: MockerFixture,
+        app_fixture: FastAPI,
+        authed_user_mock: Mock,
+        get_filing_mock: Mock,
+        tmp_path,
+    ):
+        mocker.patch("sbl_filing_api.services.submission_processor.validate_file_processable")
+        mock_add_submission = mocker.patch("sbl_filing_api.entities.repos.submission_repo.add_submission")
+        mock_upload = mocker.patch("sbl_filing_api.services.submission_processor.upload_to_storage")
+        mocker.patch("sbl_filing_api.routers.filing.validation_pool.get_header", return_value=["uid", "app_date"])
+        submission = tmp_path / "submission.csv"
+        submission.write_text("uid,app_method\n1,2\n")
+
+        client = TestClient(app_fixture)
+        files = {"file": ("submission.csv", open(submission, "rb"))}
+        res = client.post("/v1/filing/institutions/1234567890ZXWVUTSR00/filings/2024/submissions", files=files)
+
+        assert res.status_code == HTTPStatus.UNPROCESSABLE_ENTITY
+        assert res.json()["error_name"] == "Malformed Submission"
+        assert res.json()["error_detail"] == 'Header column 2 is "app_method", expected "app_date".'
+        assert not mock_add_submission.called
+        assert not mock_upload.called
+
+    def test_upload_file_supersedes_earlier_submissions(
+        self,
+        mocker: MockerFixture,
+        app_fixture: FastAPI,
+        authed_user_mock: Mock,
+        submission_csv: str,
+        get_filing_mock: Mock,
+    ):
+        user_action_submit = UserActionDAO(
+            id=1,
+            user_id="123456-7890-ABCDEF-GHIJ",
+            user_name="test submitter",
+            user_email="test@local.host",
+            action_type=UserActionType.SUBMIT,
+            timestamp=datetime.datetime.now(),
+        )
+        return_sub = SubmissionDAO(
+            id=3,
+            filing=1,
+            counter=3,
+            state=SubmissionState.SUBMISSION_UPLOADED,
+            filename="submission.csv",
+            submitter_id=1,
+            submitter=user_action_submit,
+        )
+        mocker.patch("sbl_filing_api.services.submission_processor.validate_file_processable")
+        mocker.patch("sbl_filing_api.services.submission_processor.upload_to_storage")
+        mocker.patch("sbl_filing_api.entities.repos.submission_repo.add_user_action", return_value=user_action_submit)
+        mocker.patch("sbl_filing_api.entities.repos.submission_repo.add_submission", return_value=return_sub)
+        mocker.patch("sbl_filing_api.entities.repos.submission_repo.update_submission", return_value=return_sub)
+        supersede_mock = mocker.patch("sbl_filing_api.entities.repos.submission_repo.supersede_submissions")
+        supersede_mock.return_value = [1, 2]
+        cancel_mock = mocker.patch("sbl_filing_api.routers.filing.validation_pool.cancel")
+        enqueue_mock = mocker.patch("sbl_filing_api.routers.filing.validation_pool.enqueue")
+
+        client = TestClient(app_fixture)
+        files = {"file": ("submission.csv", open(submission_csv, "rb"))}
+        res = client.post("/v1/filing/institutions/1234567890ZXWVUTSR00/filings/2024/submissions", files=files)
+        assert res.status_code == 200
+        assert not supersede_mock.called
+        assert not cancel_mock.called
+
+        mocker.patch("sbl_filing_api.routers.filing.settings.supersede_validations", True)
+        files = {"file": ("submission.csv", open(submission_csv, "rb"))}
+        res = client.post("/v1/filing/institutions/1234567890ZXWVUTSR00/filings/2024/submissions", files=files)
+        assert res.status_code == 200
+        supersede_mock.assert_called_once_with(ANY, get_filing_mock.return_value.id, 3)
+        cancel_mock.assert_called_once_with([1, 2])
+        assert enqueue_mock.call_count == 2
+
     def test_submission_second_update_fail(
         self,
         mocker: MockerFixture,
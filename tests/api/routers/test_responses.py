@@ -0,0 +1,78 @@
+import datetime
+import json
+from typing import List
+
+from fastapi.encoders import jsonable_encoder
+
+from sbl_filing_api.entities.models.dao import FilingDAO, SubmissionDAO, SubmissionState, UserActionDAO
+from sbl_filing_api.entities.models.dto import FilingDTO, SubmissionDTO
+from sbl_filing_api.entities.models.model_enums import UserActionType
+from sbl_filing_api.routers.responses import DTOResponse, SubmissionResponse, dto_adapter, sparse_dto
+
+
+def get_user_action():
+    return UserActionDAO(
+        id=1,
+        user_id="123456-7890-ABCDEF-GHIJ",
+        user_name="test creator",
+        user_email="test@local.host",
+        action_type=UserActionType.CREATE,
+        timestamp=datetime.datetime.now(),
+    )
+
+
+def test_dto_response():
+    filings = [
+        FilingDAO(
+            id=i,
+            lei=f"123456789012345678{i:02}",
+            filing_period="2024",
+            institution_snapshot_id="v1",
+            creator_id=1,
+            creator=get_user_action(),
+            signatures=[],
+            contact_info=None,
+        )
+        for i in range(3)
+    ]
+
+    res = DTOResponse(filings, List[FilingDTO])
+    assert res.media_type == "application/json"
+    # same JSON FastAPI produces from the route's response_model
+    expected = jsonable_encoder([FilingDTO.model_validate(f, from_attributes=True) for f in filings])
+    assert json.loads(res.body) == expected
+    assert dto_adapter(List[FilingDTO]) is dto_adapter(List[FilingDTO])
+
+
+def test_submission_response():
+    submission = SubmissionDTO.model_validate(
+        SubmissionDAO(
+            id=1,
+            filing=1,
+            counter=2,
+            state=SubmissionState.VALIDATION_WITH_ERRORS,
+            submission_time=datetime.datetime.now(),
+            filename="file1.csv",
+            submitter=get_user_action(),
+        ),
+        from_attributes=True,
+    )
+
+    res = SubmissionResponse(submission, '{"syntax_errors": {"count": 1}}')
+    body = json.loads(res.body)
+    assert body["counter"] == 2
+    assert body["validation_results"] == {"syntax_errors": {"count": 1}}
+
+    res = SubmissionResponse(submission, None)
+    assert json.loads(res.body)["validation_results"] is None
+
+
+def test_sparse_dto():
+    assert sparse_dto(SubmissionDTO, None) is SubmissionDTO
+    assert set(sparse_dto(SubmissionDTO, {"counter", "state"}).model_fields) == {"counter", "state"}
+
+    # every requested field can be served some other way, e.g. validation_results from its raw JSON
+    empty = sparse_dto(SubmissionDTO, set())
+    assert empty is not SubmissionDTO
+    assert empty.model_fields == {}
+    assert empty.model_validate(SubmissionDAO(id=1), from_attributes=True).model_dump_json() == "{}"
@@ -32,3 +32,28 @@ def test_default_server_configs():
 def test_url_configs():
     settings = Settings()
     assert settings.mail_api_url == "http://mail-api:8765/internal/confirmation/send"
+
+
+def test_default_validation_configs():
+    settings = Settings()
+    assert settings.sharded_validation_min_records == 0
+    assert settings.validation_concurrency == 2
+    assert settings.web_concurrency == 1
+    assert settings.validation_polars_threads == 4
+    assert settings.validation_retry_after_secs == 30
+    assert settings.validation_max_queue == 100
+    assert settings.validation_queue_max_age_secs == 3600
+    assert settings.validation_max_per_lei == 1
+    assert settings.validation_max_tasks_per_child == 10
+    assert settings.validation_warm_timeout_secs == 120
+    assert settings.validation_max_rss == 4 * (1024**3)
+    assert not settings.supersede_validations
+    assert settings.submission_preflight_rows == 100
+    assert settings.submission_parquet_cache
+    assert settings.submissions_page_size == 100
+
+
+def test_default_response_compression_configs():
+    settings = Settings()
+    assert settings.response_compression_min_size == 1000
+    assert settings.response_compression_level == 6
@@ -0,0 +1,38 @@
+import os
+import subprocess
+import sys
+
+VALIDATION_MODULES = ["polars", "pandera", "regtech_data_validator", "sbl_filing_api.services.validation_worker"]
+IMPORT_BUDGET_US = 3_000_000
+
+
+def import_times(module: str) -> dict[str, int]:
+    """
+    Imports the module in a fresh interpreter with -X importtime, returning each imported module's cumulative time in us
+    """
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+        capture_output=True,
+        text=True,
+        check=True,
+        env={**os.environ, "PYTHONPATH": os.pathsep.join(sys.path)},
+    )
+    times = {}
+    for line in result.stderr.splitlines():
+        if not line.startswith("import time:"):
+            continue
+        _, cumulative, name = line.removeprefix("import time:").split("|")
+        if cumulative.strip().isdigit():
+            times[name.strip()] = int(cumulative)
+    return times
+
+
+def test_api_does_not_import_validation_stack():
+    times = import_times("sbl_filing_api.main")
+    assert "sbl_filing_api.main" in times
+    assert [m for m in VALIDATION_MODULES if m in times] == []
+
+
+def test_api_import_time_budget():
+    times = import_times("sbl_filing_api.main")
+    assert times["sbl_filing_api.main"] < IMPORT_BUDGET_US
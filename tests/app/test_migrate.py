@@ -0,0 +1,66 @@
+import pytest
+
+from pytest_mock import MockerFixture
+from sqlalchemy import insert
+from sqlalchemy.ext.asyncio import create_async_engine
+
+from sbl_filing_api import migrate
+
+
+@pytest.fixture
+async def version_engine():
+    engine = create_async_engine("sqlite+aiosqlite://")
+    async with engine.begin() as conn:
+        await conn.run_sync(migrate.alembic_version.metadata.create_all)
+    yield engine
+    await engine.dispose()
+
+
+def test_head_revisions():
+    assert len(migrate.head_revisions()) == 1
+
+
+async def test_verify_db_revision(mocker: MockerFixture, version_engine):
+    mocker.patch("sbl_filing_api.migrate.head_revisions", return_value={"abc123"})
+    with pytest.raises(RuntimeError) as e:
+        await migrate.verify_db_revision(version_engine)
+    assert str(e.value).startswith("Database is at revision none, expected abc123.")
+
+    async with version_engine.begin() as conn:
+        await conn.execute(insert(migrate.alembic_version).values(version_num="abc000"))
+    with pytest.raises(RuntimeError) as e:
+        await migrate.verify_db_revision(version_engine)
+    assert str(e.value).startswith("Database is at revision abc000, expected abc123.")
+
+    async with version_engine.begin() as conn:
+        await conn.execute(migrate.alembic_version.update().values(version_num="abc123"))
+    await migrate.verify_db_revision(version_engine)
+
+
+async def test_verify_db_revision_not_migrated():
+    engine = create_async_engine("sqlite+aiosqlite://")
+    with pytest.raises(RuntimeError) as e:
+        await migrate.verify_db_revision(engine)
+    assert str(e.value) == "Unable to read the database's migration revision, has it been migrated?"
+    await engine.dispose()
+
+
+def test_run_migrations(mocker: MockerFixture):
+    engine_mock = mocker.patch("sbl_filing_api.migrate.create_engine")
+    upgrade_mock = mocker.patch("sbl_filing_api.migrate.command.upgrade")
+    conn = engine_mock.return_value.connect.return_value.__enter__.return_value.execution_options.return_value
+
+    migrate.run_migrations()
+
+    assert engine_mock.call_args.args[0].drivername == "postgresql+psycopg2"
+    statements = [str(c.args[0]) for c in conn.execute.call_args_list]
+    assert "pg_advisory_lock" in statements[0]
+    assert "pg_advisory_unlock" in statements[1]
+    upgrade_mock.assert_called_once_with(mocker.ANY, "head")
+    engine_mock.return_value.dispose.assert_called_once()
+
+    conn.reset_mock()
+    upgrade_mock.side_effect = RuntimeError("Migration failed.")
+    with pytest.raises(RuntimeError):
+        migrate.run_migrations()
+    assert "pg_advisory_unlock" in str(conn.execute.call_args.args[0])
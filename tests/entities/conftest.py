@@ -1,7 +1,9 @@
 import asyncio
 import pytest
+import ujson
 
 from asyncio import current_task
+from sqlalchemy import event
 from sqlalchemy.ext.asyncio import (
     create_async_engine,
     AsyncEngine,
@@ -9,6 +11,7 @@ from sqlalchemy.ext.asyncio import (
     async_sessionmaker,
 )
 from unittest.mock import Mock
+from sbl_filing_api.entities.engine.engine import json_serializer
 from sbl_filing_api.entities.models.dao import Base
 from regtech_api_commons.models.auth import AuthenticatedUser
 
@@ -24,7 +27,8 @@ def event_loop():
 
 @pytest.fixture(scope="session")
 def engine():
-    return create_async_engine("sqlite+aiosqlite://")
+    # validation_results are (de)serialized as they are against the database
+    return create_async_engine("sqlite+aiosqlite://", json_serializer=json_serializer, json_deserializer=ujson.loads)
 
 
 @pytest.fixture(scope="function", autouse=True)
@@ -63,6 +67,21 @@ def session_generator(engine: AsyncEngine):
     return async_scoped_session(async_sessionmaker(engine, expire_on_commit=False), current_task)
 
 
+@pytest.fixture(scope="function")
+def statements(engine: AsyncEngine):
+    """
+    Records the kind of each SQL statement sent to the database, e.g. SELECT, to count a repo call's round trips
+    """
+    executed = []
+
+    def record(conn, cursor, statement, parameters, context, executemany):
+        executed.append(statement.split()[0])
+
+    event.listen(engine.sync_engine, "before_cursor_execute", record)
+    yield executed
+    event.remove(engine.sync_engine, "before_cursor_execute", record)
+
+
 @pytest.fixture
 def authed_user_mock() -> Mock:
     claims = {
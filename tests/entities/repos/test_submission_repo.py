@@ -3,6 +3,7 @@ from pydantic import ValidationError
 import pytest
 
 import datetime
+import json
 from datetime import datetime as dt
 
 from sqlalchemy import select
@@ -30,7 +31,9 @@ class TestSubmissionRepo:
     async def setup(
         self, transaction_session: AsyncSession, mocker: MockerFixture, session_generator: async_scoped_session
     ):
-        mocker.patch.object(repo, "SessionLocal", return_value=session_generator())
+        mocker.patch.object(
+            repo, "SessionLocal", return_value=session_generator(), session_factory=session_generator.session_factory
+        )
 
         user_action1 = UserActionDAO(
             id=1,
@@ -306,6 +309,18 @@ class TestSubmissionRepo:
         assert res2.filing_period == "2024"
         assert res2.lei == "ABCDEFGHIJ"
 
+    async def test_get_filing_sparse_fields(self, query_session: AsyncSession):
+        res = await repo.get_filing(query_session, lei="1234567890", filing_period="2024", fields={"lei", "signatures"})
+        assert res.lei == "1234567890"
+        assert len(res.signatures) == 2
+        # relationships that weren't requested are never loaded
+        assert res.contact_info is None
+        assert res.tasks == []
+
+        res = await repo.get_submissions(query_session, lei="ABCDEFGHIJ", filing_period="2024", fields={"counter"})
+        assert {s.counter for s in res} == {1, 2}
+        assert all(s.submitter is None for s in res)
+
     async def test_get_filings(self, query_session: AsyncSession, mocker: MockerFixture):
         res = await repo.get_filings(query_session, leis=["1234567890", "ABCDEFGHIJ"], filing_period="2024")
         assert res[0].id == 1
@@ -329,6 +344,57 @@ class TestSubmissionRepo:
         assert results[2].lei == "ZYXWVUTSRQP"
         assert results[2].filing_period == "2024"
 
+    async def test_get_filings_status(self, query_session: AsyncSession, transaction_session: AsyncSession):
+        submission = await repo.get_submission(transaction_session, 3)
+        submission.total_records = 10
+        submission.validation_results = {
+            "syntax_errors": {"total_count": 0},
+            "logic_errors": {"total_count": 4},
+            "logic_warnings": {"total_count": 7},
+        }
+        await repo.update_submission(transaction_session, submission)
+
+        res = await repo.get_filings_status(
+            query_session, leis=["1234567890", "ABCDEFGHIJ", "ZYXWVUTSRQP"], filing_period="2024"
+        )
+        assert [row[0].lei for row in res] == ["1234567890", "ABCDEFGHIJ", "ZYXWVUTSRQP"]
+
+        assert res[0].id == 1
+        assert res[0].counter == 1
+        assert res[0].logic_error_count is None
+
+        assert res[1].id == 3
+        assert res[1].counter == 2
+        assert res[1].state == SubmissionState.SUBMISSION_UPLOADED
+        assert res[1].total_records == 10
+        assert res[1].syntax_error_count == 0
+        assert res[1].logic_error_count == 4
+        assert res[1].logic_warning_count == 7
+
+        assert res[2][0].id == 3
+        assert res[2].id is None
+
+        res = await repo.get_filings_status(query_session, leis=["ABCDEFGHIJ"], filing_period="2025")
+        assert res == []
+
+    async def test_stream_period_filings(self, query_session: AsyncSession):
+        results = [row async for row in repo.stream_period_filings(filing_period="2024", batch_size=2)]
+        assert len(results) == 3
+        assert [row[0].lei for row in results] == ["1234567890", "ABCDEFGHIJ", "ZYXWVUTSRQP"]
+
+        assert results[0].latest_submission_counter == 1
+        assert results[0].latest_submission_state == SubmissionState.SUBMISSION_UPLOADED
+        assert len(results[0][0].signatures) == 2
+        assert results[0][0].contact_info.id == 1
+        # the export has no use for the creator
+        assert results[0][0].creator is None
+
+        assert results[1].latest_submission_counter == 2
+        assert results[2].latest_submission_counter is None
+        assert results[2].latest_submission_state is None
+
+        assert [row async for row in repo.stream_period_filings(filing_period="2025")] == []
+
     async def test_get_latest_submission(self, query_session: AsyncSession):
         res = await repo.get_latest_submission(query_session, lei="ABCDEFGHIJ", filing_period="2024")
         assert res.id == 3
@@ -351,6 +417,60 @@ class TestSubmissionRepo:
         assert res.validation_ruleset_version == "v1"
         assert res.filename == "file3.csv"
 
+    async def test_validation_results_round_trip(self, transaction_session: AsyncSession):
+        validation_results = {
+            "logic_errors": {
+                "total_count": 1,
+                "details": [
+                    {
+                        "validation": {
+                            "id": "E3000",
+                            "description": "* Any 'unique identifier' may **not** be used in more than one \nrecord.",
+                            "fig_link": "https://www.consumerfinance.gov/data-research/small-business-lending/#4.3.1",
+                        },
+                        "records": [
+                            {"record_no": 1, "uid": "ÉABC/123", "fields": [{"name": "uid", "value": "ÉABC/123"}]}
+                        ],
+                    }
+                ],
+            }
+        }
+        submission = await repo.get_submission(transaction_session, 3)
+        submission.validation_results = validation_results
+        await transaction_session.flush()
+
+        _, stored = await repo.get_submission_with_raw_results(transaction_session, "ABCDEFGHIJ", "2024")
+        # the text json stored before, less the whitespace between items, and with its slashes left alone
+        assert stored == json.dumps(validation_results, separators=(",", ":"))
+        await transaction_session.refresh(submission)
+        assert submission.validation_results == validation_results
+
+    async def test_get_submission_with_raw_results(self, transaction_session: AsyncSession):
+        submission = await repo.get_submission(transaction_session, 3)
+        submission.validation_results = {"syntax_errors": {"count": 1}}
+        await transaction_session.flush()
+
+        res, validation_results = await repo.get_submission_with_raw_results(transaction_session, "ABCDEFGHIJ", "2024")
+        assert res.id == 3
+        assert json.loads(validation_results) == {"syntax_errors": {"count": 1}}
+
+        res, validation_results = await repo.get_submission_with_raw_results(
+            transaction_session, "ABCDEFGHIJ", "2024", 1
+        )
+        assert res.id == 2
+        assert validation_results in (None, "null")
+
+        # the filing exists but not the submission, set apart from a missing filing in the same query
+        assert tuple(await repo.get_submission_with_raw_results(transaction_session, "ABCDEFGHIJ", "2024", 100)) == (
+            None,
+            None,
+        )
+        assert tuple(await repo.get_submission_with_raw_results(transaction_session, "ZYXWVUTSRQP", "2024")) == (
+            None,
+            None,
+        )
+        assert await repo.get_submission_with_raw_results(transaction_session, "0000000000", "2024") is None
+
     async def test_get_submissions(self, query_session: AsyncSession):
         res = await repo.get_submissions(query_session)
         assert len(res) == 4
@@ -368,6 +488,19 @@ class TestSubmissionRepo:
         res = await repo.get_submissions(query_session, lei="ZYXWVUTSRQP", filing_period="2024")
         assert len(res) == 0
 
+    async def test_get_submissions_paged(self, query_session: AsyncSession):
+        res = await repo.get_submissions(query_session, lei="ABCDEFGHIJ", filing_period="2024", limit=1)
+        assert [s.counter for s in res] == [2]
+
+        res = await repo.get_submissions(query_session, lei="ABCDEFGHIJ", filing_period="2024", before=2, limit=1)
+        assert [s.counter for s in res] == [1]
+
+        res = await repo.get_submissions(query_session, lei="ABCDEFGHIJ", filing_period="2024", before=1, limit=1)
+        assert res == []
+
+        assert await repo.count_submissions(query_session, "ABCDEFGHIJ", "2024") == 2
+        assert await repo.count_submissions(query_session, "ZYXWVUTSRQP", "2024") == 0
+
     async def test_add_submission(self, transaction_session: AsyncSession):
         user_action_submit = await repo.add_user_action(
             transaction_session,
@@ -392,12 +525,109 @@ class TestSubmissionRepo:
         assert res.submitter.user_email == user_action_submit.user_email
         assert res.submitter.action_type == UserActionType.SUBMIT
 
+    async def test_add_submission_counter_taken(self, transaction_session: AsyncSession, mocker: MockerFixture):
+        scalar = transaction_session.scalar
+        attempts = []
+
+        async def counter_taken_once(stmt):
+            # the first attempt finds its counter claimed by a concurrent upload, and inserts nothing
+            attempts.append(stmt)
+            return None if len(attempts) == 1 else await scalar(stmt)
+
+        scalar_mock = mocker.patch.object(transaction_session, "scalar", side_effect=counter_taken_once)
+        res = await repo.add_submission(transaction_session, filing_id=2, filename="file5.csv", submitter_id=2)
+        assert len(attempts) == 2
+        assert res.filing == 2
+        assert res.counter == 3
+
+        mocker.stop(scalar_mock)
+        res = await repo.add_submission(transaction_session, filing_id=2, filename="file6.csv", submitter_id=2)
+        assert res.counter == 4
+
     async def test_error_out_submission(self, transaction_session: AsyncSession):
         await repo.error_out_submission(4)
         expired_sub = await repo.get_submission(transaction_session, 4)
         assert expired_sub.id == 4
         assert expired_sub.state == SubmissionState.VALIDATION_ERROR
 
+    async def test_get_submission_state(
+        self, transaction_session: AsyncSession, session_generator: async_scoped_session
+    ):
+        submission = await repo.get_submission(transaction_session, 4)
+        assert await repo.get_submission_state(4) == submission.state
+        assert await repo.get_submission_state(100) is None
+
+        async with session_generator.session_factory() as session:
+            await repo.set_submission_state(session, 4, SubmissionState.SUBMISSION_SUPERSEDED)
+        assert submission.state == SubmissionState.SUBMISSION_UPLOADED
+        assert await repo.get_submission_state(4) == SubmissionState.SUBMISSION_SUPERSEDED
+
+    async def test_set_submission_state(self, transaction_session: AsyncSession):
+        assert await repo.set_submission_state(
+            transaction_session, 2, SubmissionState.VALIDATION_IN_PROGRESS, validation_ruleset_version="v1"
+        )
+        submission = await repo.get_submission(transaction_session, 2)
+        assert submission.state == SubmissionState.VALIDATION_IN_PROGRESS
+        assert submission.validation_ruleset_version == "v1"
+
+        await repo.supersede_submissions(transaction_session, 2, 3)
+        assert not await repo.set_submission_state(transaction_session, 2, SubmissionState.VALIDATION_SUCCESSFUL)
+        assert await repo.get_submission_state(2) == SubmissionState.SUBMISSION_SUPERSEDED
+
+    async def test_supersede_submissions(self, transaction_session: AsyncSession):
+        assert await repo.supersede_submissions(transaction_session, 2, 1) == []
+        assert set(await repo.supersede_submissions(transaction_session, 2, 3)) == {2, 3}
+
+        submission = await repo.get_submission(transaction_session, 2)
+        assert submission.state == SubmissionState.SUBMISSION_SUPERSEDED
+        submission = await repo.get_submission(transaction_session, 1)
+        assert submission.state == SubmissionState.SUBMISSION_UPLOADED
+
+    async def test_validation_summary(self, transaction_session: AsyncSession):
+        assert await repo.get_validation_summary(transaction_session, "ABCDEFGHIJ", "2024", 2) == []
+        assert await repo.get_validation_summary(transaction_session, "ABCDEFGHIJ", "2024", 100) is None
+
+        summary = [
+            {
+                "validation_id": "W2000",
+                "severity": "Warning",
+                "scope": "single-field",
+                "field_name": "app_date",
+                "finding_count": 2,
+                "record_count": 1,
+            },
+            {
+                "validation_id": "E0001",
+                "severity": "Error",
+                "scope": "single-field",
+                "field_name": "uid",
+                "finding_count": 2,
+                "record_count": 2,
+            },
+        ]
+        await repo.add_validation_summary(transaction_session, 3, summary)
+        res = await repo.get_validation_summary(transaction_session, "ABCDEFGHIJ", "2024", 2)
+        assert [(s.validation_id, s.finding_count, s.record_count) for s in res] == [("E0001", 2, 2), ("W2000", 2, 1)]
+
+        await repo.add_validation_summary(transaction_session, 3, summary[:1])
+        res = await repo.get_validation_summary(transaction_session, "ABCDEFGHIJ", "2024", 2)
+        assert len(res) == 1
+        assert res[0].field_name == "app_date"
+
+    async def test_get_queued_submissions(self, transaction_session: AsyncSession):
+        res = await repo.get_queued_submissions(transaction_session, dt.now() - datetime.timedelta(hours=1))
+        assert {s.id for s in res} == {1, 2, 3, 4}
+
+        res = await repo.get_queued_submissions(transaction_session, dt.now() - datetime.timedelta(seconds=300))
+        assert {s.id for s in res} == {1, 2, 3}
+
+        submission = await repo.get_submission(transaction_session, 4)
+        submission.state = SubmissionState.VALIDATION_IN_PROGRESS
+        await transaction_session.flush()
+        res = await repo.get_queued_submissions(transaction_session, dt.now() - datetime.timedelta(hours=1))
+        assert {s.id for s in res} == {1, 2, 3}
+        assert all(s.submission_time is not None for s in res)
+
     async def test_update_submission(self, session_generator: async_scoped_session):
         user_action_submit = UserActionDAO(
             id=2,
@@ -654,6 +884,98 @@ class TestSubmissionRepo:
         assert "String should have at most 36 characters" in str(ve.value)
         assert "String should have at most 255 characters" in str(ve.value)
 
+    async def test_post_filing_round_trips(self, transaction_session: AsyncSession, statements: list[str]):
+        creator = await repo.add_user_action(
+            transaction_session,
+            UserActionDTO(
+                user_id="123456-7890-ABCDEF-GHIJ",
+                user_name="test creator",
+                user_email="test@local.host",
+                action_type=UserActionType.CREATE,
+            ),
+        )
+        assert statements == ["INSERT"]
+        assert creator.timestamp is not None
+
+        statements.clear()
+        res = await repo.create_new_filing(transaction_session, lei="12345ABCDE", filing_period="2024", creator_id=4)
+        # the INSERT, then loading the new filing's relationships for its response
+        assert statements == ["INSERT", "SELECT", "SELECT", "SELECT", "SELECT"]
+        assert res.creator.id == 4
+        assert res.tasks == []
+        assert res.signatures == []
+        assert res.contact_info is None
+
+    async def test_sign_filing_round_trips(self, transaction_session: AsyncSession, statements: list[str]):
+        filing = await repo.get_filing(transaction_session, lei="1234567890", filing_period="2024")
+        statements.clear()
+
+        sig = await repo.add_user_action(
+            transaction_session,
+            UserActionDTO(
+                user_id="test_sig@local.host",
+                user_name="signer name",
+                user_email="test_sig@local.host",
+                action_type=UserActionType.SIGN,
+            ),
+        )
+        filing.confirmation_id = "1234567890-2024-1-1"
+        filing.signatures.insert(0, sig)
+        res = await repo.upsert_filing(transaction_session, filing)
+        # the signature's user action, the filing's change and its filing_signature row
+        assert statements == ["INSERT", "UPDATE", "INSERT"]
+        assert res.confirmation_id == "1234567890-2024-1-1"
+        assert res.signatures[0].id == sig.id
+
+    async def test_accept_submission_round_trips(self, transaction_session: AsyncSession, statements: list[str]):
+        submission = await repo.get_submission(transaction_session, 1)
+        statements.clear()
+
+        accepter = await repo.add_user_action(
+            transaction_session,
+            UserActionDTO(
+                user_id="test2@cfpb.gov",
+                user_name="test2 accepter name",
+                user_email="test2@cfpb.gov",
+                action_type=UserActionType.ACCEPT,
+            ),
+        )
+        submission.accepter_id = accepter.id
+        submission.accepter = accepter
+        submission.state = SubmissionState.SUBMISSION_ACCEPTED
+        res = await repo.update_submission(transaction_session, submission)
+        assert statements == ["INSERT", "UPDATE"]
+        assert res.accepter_id == accepter.id
+        assert res.accepter.user_id == "test2@cfpb.gov"
+
+    async def test_validation_round_trips(self, transaction_session: AsyncSession, statements: list[str]):
+        submission = await repo.get_submission(transaction_session, 4)
+        statements.clear()
+
+        submission.state = SubmissionState.VALIDATION_IN_PROGRESS
+        await repo.update_submission(transaction_session, submission)
+        submission.validation_results = self.get_error_json()
+        submission.state = SubmissionState.VALIDATION_WITH_ERRORS
+        await repo.update_submission(transaction_session, submission)
+        assert statements == ["UPDATE", "UPDATE"]
+
+        statements.clear()
+        await repo.error_out_submission(4)
+        assert statements == ["UPDATE"]
+
+    async def test_upsert_detached_round_trips(self, session_generator: async_scoped_session, statements: list[str]):
+        async with session_generator() as load_session:
+            submission = await repo.get_submission(load_session, 4)
+        statements.clear()
+
+        async with session_generator() as update_session:
+            submission.state = SubmissionState.VALIDATION_SUCCESSFUL
+            res = await repo.update_submission(update_session, submission)
+        # an upsert rather than a SELECT to merge it, then its submitter for the response
+        assert statements == ["INSERT", "SELECT"]
+        assert res.state == SubmissionState.VALIDATION_SUCCESSFUL
+        assert res.submitter.id == submission.submitter_id
+
     def get_error_json(self):
         df_columns = [
             "record_no",
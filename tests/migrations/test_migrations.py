@@ -462,3 +462,58 @@ def test_migrations_to_63138f5cf036(alembic_runner: MigrationContext, alembic_en
     inspector = sqlalchemy.inspect(alembic_engine)
     columns = inspector.get_columns("filing")
     assert next(c for c in columns if c["name"] == "is_voluntary")["nullable"]
+
+
+def test_migrations_to_27fd1b6b25e0(alembic_runner: MigrationContext, alembic_engine: Engine):
+    alembic_runner.migrate_up_to("27fd1b6b25e0")
+
+    alembic_runner.insert_into(
+        "submission",
+        {
+            "filing": 1,
+            "counter": 1,
+            "submitter_id": 1,
+            "state": "SUBMISSION_SUPERSEDED",
+            "filename": "file1.csv",
+        },
+    )
+
+    with alembic_engine.connect() as conn:
+        states = conn.execute(sqlalchemy.text("SELECT state FROM submission")).scalars().all()
+    assert states == ["SUBMISSION_SUPERSEDED"]
+
+
+def test_migrations_to_01e8b6709cff(alembic_runner: MigrationContext, alembic_engine: Engine):
+    alembic_runner.migrate_up_to("01e8b6709cff")
+
+    inspector = sqlalchemy.inspect(alembic_engine)
+
+    assert "validation_summary" in inspector.get_table_names()
+    assert {
+        "id",
+        "submission",
+        "validation_id",
+        "severity",
+        "scope",
+        "field_name",
+        "finding_count",
+        "record_count",
+    } == set([c["name"] for c in inspector.get_columns("validation_summary")])
+
+    summary_submission_fk = inspector.get_foreign_keys("validation_summary")[0]
+    assert summary_submission_fk["name"] == "validation_summary_submission_fkey"
+    assert (
+        "submission" in summary_submission_fk["constrained_columns"]
+        and "submission" == summary_submission_fk["referred_table"]
+        and "id" in summary_submission_fk["referred_columns"]
+    )
+    assert ["submission"] == inspector.get_indexes("validation_summary")[0]["column_names"]
+
+
+def test_migrations_to_8d3c51a7e2f4(alembic_runner: MigrationContext, alembic_engine: Engine):
+    alembic_runner.migrate_up_to("8d3c51a7e2f4")
+
+    inspector = sqlalchemy.inspect(alembic_engine)
+
+    uploaded_index = next(i for i in inspector.get_indexes("submission") if i["name"] == "ix_submission_uploaded")
+    assert ["submission_time"] == uploaded_index["column_names"]
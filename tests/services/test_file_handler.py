@@ -1,4 +1,5 @@
 from pytest_mock import MockerFixture
+from botocore.exceptions import ClientError
 from unittest.mock import Mock
 import io
 
@@ -81,3 +82,49 @@ def test_download_s3(mocker: MockerFixture):
     )
     assert res == content
     settings.fs_upload_config.protocol = default_file_proto
+
+
+def test_upload_file_local_fs(mocker: MockerFixture):
+    default_file_proto = settings.fs_upload_config.protocol
+    settings.fs_upload_config.protocol = FsProtocol.FILE
+
+    path_mock = mocker.patch("sbl_filing_api.services.file_handler.Path")
+    move_mock = mocker.patch("sbl_filing_api.services.file_handler.shutil.move")
+
+    fh.upload_file("test.parquet", "/tmp/local.parquet")
+    path_mock.assert_called_with(f"{settings.fs_upload_config.root}/test.parquet")
+    path_mock.return_value.parent.mkdir.assert_called_with(parents=True, exist_ok=True)
+    move_mock.assert_called_once_with("/tmp/local.parquet", path_mock.return_value)
+    settings.fs_upload_config.protocol = default_file_proto
+
+
+def test_upload_file_s3(mocker: MockerFixture):
+    default_file_proto = settings.fs_upload_config.protocol
+    settings.fs_upload_config.protocol = FsProtocol.S3
+
+    boto3_mock = mocker.patch("sbl_filing_api.services.file_handler.boto3")
+
+    fh.upload_file("test.parquet", "/tmp/local.parquet")
+    boto3_mock.client.return_value.upload_file.assert_called_once_with(
+        "/tmp/local.parquet", settings.fs_upload_config.root, "test.parquet"
+    )
+    settings.fs_upload_config.protocol = default_file_proto
+
+
+def test_exists(mocker: MockerFixture):
+    default_file_proto = settings.fs_upload_config.protocol
+    settings.fs_upload_config.protocol = FsProtocol.FILE
+    path_mock = mocker.patch("sbl_filing_api.services.file_handler.Path")
+    path_mock.return_value.is_file.return_value = False
+    assert not fh.exists("test.parquet")
+    path_mock.assert_called_with(f"{settings.fs_upload_config.root}/test.parquet")
+
+    settings.fs_upload_config.protocol = FsProtocol.S3
+    boto3_mock = mocker.patch("sbl_filing_api.services.file_handler.boto3")
+    client_mock = boto3_mock.client.return_value
+    assert fh.exists("test.parquet")
+    client_mock.head_object.assert_called_once_with(Bucket=settings.fs_upload_config.root, Key="test.parquet")
+
+    client_mock.head_object.side_effect = ClientError({"Error": {"Code": "404"}}, "HeadObject")
+    assert not fh.exists("test.parquet")
+    settings.fs_upload_config.protocol = default_file_proto
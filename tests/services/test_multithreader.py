@@ -1,10 +1,20 @@
 import asyncio
+from concurrent.futures import ThreadPoolExecutor
 from concurrent.futures.process import BrokenProcessPool
 
+from datetime import datetime, timedelta
 from multiprocessing import Manager
+from threading import BrokenBarrierError
 from pytest_mock import MockerFixture
-from sbl_filing_api.entities.models.dao import SubmissionDAO, SubmissionState
-from sbl_filing_api.services.multithread_handler import check_future, handle_submission
+from sbl_filing_api.entities.models.dao import SubmissionState
+from sbl_filing_api.services import multithread_handler, validation_worker
+from sbl_filing_api.services.multithread_handler import (
+    ValidationPool,
+    check_future,
+    estimate_queue,
+    handle_submission,
+)
+from types import SimpleNamespace
 from unittest.mock import Mock
 
 
@@ -67,22 +77,240 @@ class TestMultithreader:
         assert not error_mock.called
         assert not log_mock.called
 
-    async def test_handler(self, mocker: MockerFixture):
-        mock_sub = SubmissionDAO(
-            id=1,
-            filing=1,
-            state=SubmissionState.SUBMISSION_UPLOADED,
-            filename="submission.csv",
+    async def test_validation_pool_recovers_broken_pool(self, mocker: MockerFixture):
+        mocker.patch.object(ValidationPool, "new_executor", side_effect=lambda: Mock())
+        state_mock = mocker.patch("sbl_filing_api.entities.repos.submission_repo.get_submission_state")
+        error_mock = mocker.patch("sbl_filing_api.entities.repos.submission_repo.error_out_submission")
+        loop = asyncio.get_running_loop()
+        broken, retried = loop.create_future(), loop.create_future()
+        run_mock = mocker.patch.object(loop, "run_in_executor", side_effect=[broken, retried])
+        done_mock = Mock()
+
+        pool = ValidationPool()
+        first_executor = pool.executor
+        pool.submit(loop, "2024", "123456789TESTBANK123", 1, {}, on_done=done_mock)
+
+        state_mock.return_value = SubmissionState.VALIDATION_IN_PROGRESS
+        broken.set_exception(BrokenProcessPool("Pool died."))
+        await asyncio.sleep(0.1)
+
+        assert pool.executor is not first_executor
+        first_executor.shutdown.assert_called_once_with(wait=False)
+        run_mock.assert_called_with(pool.executor, handle_submission, "2024", "123456789TESTBANK123", 1, {})
+        assert not done_mock.called
+
+        retried.set_exception(BrokenProcessPool("Pool died."))
+        await asyncio.sleep(0.1)
+        error_mock.assert_called_once_with(1)
+        done_mock.assert_called_once()
+
+    async def test_validation_pool_skips_errored_submission(self, mocker: MockerFixture):
+        mocker.patch.object(ValidationPool, "new_executor", side_effect=lambda: Mock())
+        state_mock = mocker.patch("sbl_filing_api.entities.repos.submission_repo.get_submission_state")
+        state_mock.return_value = SubmissionState.VALIDATION_ERROR
+        loop = asyncio.get_running_loop()
+        broken = loop.create_future()
+        run_mock = mocker.patch.object(loop, "run_in_executor", return_value=broken)
+        done_mock = Mock()
+
+        pool = ValidationPool()
+        pool.submit(loop, "2024", "123456789TESTBANK123", 1, {}, on_done=done_mock)
+        broken.set_exception(BrokenProcessPool("Pool died."))
+        await asyncio.sleep(0.1)
+
+        assert run_mock.call_count == 1
+        done_mock.assert_called_once()
+
+    def test_validation_pool_new_executor(self, mocker: MockerFixture):
+        executor_mock = mocker.patch("sbl_filing_api.services.multithread_handler.ProcessPoolExecutor")
+        mocker.patch.object(multithread_handler.settings, "validation_concurrency", 3)
+        mocker.patch.object(multithread_handler.settings, "validation_max_tasks_per_child", 10)
+
+        mocker.patch.object(multithread_handler.settings, "web_concurrency", 1)
+        ValidationPool.new_executor()
+        executor_mock.assert_called_once_with(
+            max_workers=3,
+            mp_context=mocker.ANY,
+            initializer=multithread_handler.init_validation_worker,
+            # one more for the warm up task
+            max_tasks_per_child=11,
         )
+        assert executor_mock.call_args.kwargs["mp_context"].get_start_method() == "spawn"
+        assert not executor_mock.return_value.submit.called
 
-        validation_mock = mocker.patch("sbl_filing_api.services.multithread_handler.validate_and_update_submission")
-        mock_new_loop = mocker.patch("asyncio.get_event_loop")
-        mock_event_loop = Mock()
-        mock_new_loop.return_value = mock_event_loop
+        mocker.patch.object(multithread_handler.settings, "validation_max_tasks_per_child", 0)
+        ValidationPool.new_executor()
+        assert executor_mock.call_args.kwargs["max_tasks_per_child"] is None
 
-        exec_check = Manager().dict()
-        exec_check["continue"] = True
+        # each uvicorn worker gets its share of the host's validations
+        mocker.patch.object(multithread_handler.settings, "web_concurrency", 2)
+        ValidationPool.new_executor()
+        assert executor_mock.call_args.kwargs["max_workers"] == 2
+        mocker.patch.object(multithread_handler.settings, "web_concurrency", 4)
+        ValidationPool.new_executor()
+        assert executor_mock.call_args.kwargs["max_workers"] == 1
+
+    async def test_validation_pool_warm(self, mocker: MockerFixture):
+        mocker.patch.object(multithread_handler.settings, "validation_concurrency", 2)
+        mocker.patch.object(multithread_handler.settings, "web_concurrency", 1)
+        manager_mock = mocker.patch("sbl_filing_api.services.multithread_handler.multiprocessing.Manager")
+        barrier_mock = manager_mock.return_value.__enter__.return_value.Barrier
+        mocker.patch.object(ValidationPool, "new_executor", return_value=ThreadPoolExecutor(2))
+
+        pool = ValidationPool(Mock())
+        await pool.warm()
+        # every worker is started, each holding on to its warm up task until all of them have
+        barrier_mock.assert_called_once_with(2, timeout=multithread_handler.settings.validation_warm_timeout_secs)
+        assert barrier_mock.return_value.wait.call_count == 2
+
+        log_mock = mocker.patch("sbl_filing_api.services.multithread_handler.logger")
+        barrier_mock.return_value.wait.side_effect = BrokenBarrierError()
+        await pool.warm()
+        log_mock.warning.assert_called_once_with("Unable to warm up the validation workers.", exc_info=True)
+
+    async def test_validation_pool_load_header(self, mocker: MockerFixture):
+        mocker.patch.object(ValidationPool, "new_executor", return_value=Mock())
+        executor_mock = mocker.patch("sbl_filing_api.services.multithread_handler.ProcessPoolExecutor").return_value
+        wrap_mock = mocker.patch("asyncio.wrap_future")
+        wrap_mock.return_value = asyncio.sleep(0, result=["uid", "app_date"])
+
+        pool = ValidationPool(Mock())
+        await pool.load_header()
+        # in its own process, so it isn't one of a validation worker's tasks
+        executor_mock.submit.assert_called_once_with(multithread_handler.expected_header)
+        executor_mock.shutdown.assert_called_once_with(wait=False)
+        assert not pool.executor.submit.called
+        assert pool.header == ["uid", "app_date"]
+
+        log_mock = mocker.patch("sbl_filing_api.services.multithread_handler.logger")
+        pool = ValidationPool(Mock())
+        executor_mock.submit.side_effect = RuntimeError("Pool died.")
+        await pool.load_header()
+        assert pool.header is None
+        log_mock.warning.assert_called_once()
+
+    async def test_validation_pool_get_header(self, mocker: MockerFixture):
+        mocker.patch.object(ValidationPool, "new_executor", return_value=Mock())
+        pool = ValidationPool(Mock())
+
+        async def load_header():
+            pool.header = ["uid", "app_date"]
+
+        load_mock = mocker.patch.object(pool, "load_header", side_effect=load_header)
+        # only loaded once it's first asked for, and only the once
+        assert not load_mock.called
+        assert await pool.get_header() == ["uid", "app_date"]
+        assert await pool.get_header() == ["uid", "app_date"]
+        load_mock.assert_called_once()
+
+    def test_worker_entry_points(self, mocker: MockerFixture):
+        init_mock = mocker.patch.object(validation_worker, "init_worker")
+        handle_mock = mocker.patch.object(validation_worker, "handle_submission")
+        mocker.patch.object(validation_worker, "expected_header", return_value=["uid"])
+
+        multithread_handler.init_validation_worker()
+        init_mock.assert_called_once()
+
+        handle_submission("2024", "123456789TESTBANK123", 1, {})
+        handle_mock.assert_called_once_with("2024", "123456789TESTBANK123", 1, {})
+
+        assert multithread_handler.expected_header() == ["uid"]
+
+    def test_validation_pool_dispatches_shortest_first(self, mocker: MockerFixture):
+        mocker.patch.object(ValidationPool, "new_executor", side_effect=lambda: Mock())
+        mocker.patch("sbl_filing_api.services.multithread_handler.time.time", return_value=1000.0)
+        governor = Mock()
+        governor.try_acquire.return_value = None
+        loop = Mock()
+        pool = ValidationPool(governor)
+        submit_mock = mocker.patch.object(pool, "submit")
+
+        pool.enqueue(loop, "2024", "123456789TESTBANK123", 1, {}, 500000)
+        pool.enqueue(loop, "2024", "123456789TESTBANK456", 2, {}, 100)
+        pool.enqueue(loop, "2024", "123456789TESTBANK123", 3, {}, 10)
+        assert not submit_mock.called
+        loop.call_later.assert_called_once_with(
+            multithread_handler.settings.validation_dispatch_retry_secs, pool.retry_dispatch, loop
+        )
+
+        slots = [Mock(), Mock(), Mock()]
+        governor.try_acquire.side_effect = slots
+        pool.retry_dispatch(loop)
+
+        # the smallest job for each LEI runs, the big one waits behind the LEI's running validation
+        assert [c.args[3] for c in submit_mock.call_args_list] == [3, 2]
+        assert [j.submission_id for j in pool.pending] == [1]
+        assert pool.running == {"123456789TESTBANK123": 1, "123456789TESTBANK456": 1}
+
+        submit_mock.call_args_list[0].kwargs["on_done"]()
+        slots[0].release.assert_called_once()
+        assert submit_mock.call_args.args[3] == 1
+        assert pool.pending == []
+
+    def test_validation_pool_ages_queued_jobs(self, mocker: MockerFixture):
+        mocker.patch.object(ValidationPool, "new_executor", side_effect=lambda: Mock())
+        mocker.patch.object(multithread_handler.settings, "validation_aging_records_per_sec", 1000)
+        time_mock = mocker.patch("sbl_filing_api.services.multithread_handler.time.time")
+        governor = Mock()
+        governor.try_acquire.return_value = None
+        pool = ValidationPool(governor)
+        submit_mock = mocker.patch.object(pool, "submit")
+
+        time_mock.return_value = 1000.0
+        pool.enqueue(Mock(), "2024", "123456789TESTBANK123", 1, {}, 50000)
+        time_mock.return_value = 1100.0
+        pool.enqueue(Mock(), "2024", "123456789TESTBANK456", 2, {}, 10000)
+
+        governor.try_acquire.side_effect = [Mock(), None]
+        pool.dispatch(Mock())
+        assert submit_mock.call_args.args[3] == 1
+
+    def test_validation_pool_is_full(self, mocker: MockerFixture):
+        mocker.patch.object(ValidationPool, "new_executor", side_effect=lambda: Mock())
+        mocker.patch.object(multithread_handler.settings, "validation_max_queue", 2)
+        governor = Mock()
+        governor.try_acquire.return_value = None
+        pool = ValidationPool(governor)
+
+        pool.enqueue(Mock(), "2024", "123456789TESTBANK123", 1, {}, 10)
+        assert not pool.is_full()
+        pool.enqueue(Mock(), "2024", "123456789TESTBANK456", 2, {}, 10)
+        assert pool.is_full()
+
+    def test_estimate_queue(self, mocker: MockerFixture):
+        mocker.patch.object(multithread_handler.settings, "validation_records_per_sec", 1000)
+        mocker.patch.object(multithread_handler.settings, "validation_concurrency", 2)
+        now = datetime.now()
+        queued = [
+            SimpleNamespace(id=1, total_records=6000, submission_time=now),
+            SimpleNamespace(id=2, total_records=2000, submission_time=now),
+            SimpleNamespace(id=3, total_records=1000, submission_time=now + timedelta(seconds=60)),
+        ]
+
+        position, eta = estimate_queue(2, queued)
+        assert position == 1
+        assert timedelta(seconds=0) < eta - datetime.now().astimezone() <= timedelta(seconds=1)
+
+        position, eta = estimate_queue(1, queued)
+        assert position == 2
+        assert timedelta(seconds=3) < eta - datetime.now().astimezone() <= timedelta(seconds=4)
+
+        assert estimate_queue(4, queued) == (None, None)
+
+    def test_validation_pool_cancel(self, mocker: MockerFixture):
+        mocker.patch.object(ValidationPool, "new_executor", side_effect=lambda: Mock())
+        governor = Mock()
+        governor.try_acquire.side_effect = [Mock(), None]
+        pool = ValidationPool(governor)
+        mocker.patch.object(pool, "submit")
+        running, queued, newest = {"continue": True}, {"continue": True}, {"continue": True}
 
-        handle_submission("2024", "123456789TESTBANK123", mock_sub, b"\00\00", exec_check)
+        pool.enqueue(Mock(), "2024", "123456789TESTBANK123", 1, running, 10)
+        pool.enqueue(Mock(), "2024", "123456789TESTBANK123", 2, queued, 10)
+        pool.enqueue(Mock(), "2024", "123456789TESTBANK123", 3, newest, 10)
+        assert list(pool.active) == [1]
 
-        validation_mock.assert_called_with("2024", "123456789TESTBANK123", mock_sub, b"\00\00", exec_check)
+        pool.cancel([1, 2])
+        assert running["superseded"]
+        assert "superseded" not in queued
+        assert [j.submission_id for j in pool.pending] == [3]
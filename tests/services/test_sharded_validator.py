@@ -0,0 +1,188 @@
+import polars as pl
+
+from pytest_mock import MockerFixture
+
+from sbl_filing_api.services import sharded_validator
+from regtech_data_validator.validation_results import ValidationPhase, ValidationResults, Counts
+from regtech_data_validator.checks import Severity
+
+
+def logic_results(uids, scopes, record_nos, register_count=0) -> ValidationResults:
+    return ValidationResults(
+        error_counts=Counts(register_count=register_count, total_count=len(uids)),
+        warning_counts=Counts(),
+        is_valid=not uids,
+        findings=pl.DataFrame(
+            {
+                "finding_no": list(range(1, len(uids) + 1)),
+                "validation_type": [Severity.ERROR] * len(uids),
+                "scope": scopes,
+                "uid": uids,
+                "record_no": record_nos,
+            }
+        ),
+        phase=ValidationPhase.LOGICAL,
+    )
+
+
+def syntax_results(is_valid: bool) -> ValidationResults:
+    return ValidationResults(
+        error_counts=Counts(total_count=0 if is_valid else 1),
+        warning_counts=Counts(),
+        is_valid=is_valid,
+        findings=pl.DataFrame() if is_valid else pl.DataFrame({"validation_type": [Severity.ERROR], "record_no": [2]}),
+        phase=ValidationPhase.SYNTACTICAL,
+    )
+
+
+class TestShardedValidator:
+    def test_shard_ranges(self):
+        # the last shard reads to the end of the file
+        assert sharded_validator.shard_ranges(10, 3) == [(0, 4), (4, 4), (8, None)]
+        assert sharded_validator.shard_ranges(8, 4) == [(0, 2), (2, 2), (4, 2), (6, None)]
+        assert sharded_validator.shard_ranges(2, 4) == [(0, 1), (1, None)]
+
+    def test_scan_submission(self, tmp_path):
+        csv_path = tmp_path / "1.csv"
+        csv_path.write_text('uid,app_date\n001,""\n002,20240101\n')
+        lf = sharded_validator.scan_submission(str(csv_path))
+        lf.sink_parquet(tmp_path / "1.parquet")
+
+        parquet = sharded_validator.scan_submission(str(tmp_path / "1.parquet")).collect()
+        assert parquet.equals(lf.collect())
+        assert parquet.schema == {"uid": pl.String, "app_date": pl.String}
+        assert parquet["app_date"].to_list() == ["", "20240101"]
+
+    def test_offset_findings(self):
+        findings = pl.DataFrame({"finding_no": [1, 2], "record_no": [1, 3]})
+        offset = sharded_validator.offset_findings(findings, 100, 10)
+        assert offset["finding_no"].to_list() == [11, 12]
+        assert offset["record_no"].to_list() == [101, 103]
+        assert sharded_validator.offset_findings(pl.DataFrame(), 100, 10).is_empty()
+
+    def test_drop_register_findings(self):
+        results = logic_results(["a", "a", "b"], ["single-field", "register", "register"], [1, 1, 2], register_count=2)
+        dropped = sharded_validator.drop_register_findings(results, ["a"])
+        assert dropped.findings["uid"].to_list() == ["a", "b"]
+        assert dropped.error_counts.register_count == 1
+        assert dropped.error_counts.total_count == 2
+
+        assert sharded_validator.drop_register_findings(results, ["c"]) is results
+
+    def test_merge_results(self):
+        shard_results = [
+            [syntax_results(True), logic_results(["a", "b"], ["register", "single-field"], [1, 2], register_count=1)],
+            [syntax_results(True), logic_results(["c"], ["single-field"], [1])],
+        ]
+        register_results = logic_results(["a", "a"], ["register", "register"], [1, 5], register_count=2)
+
+        merged = sharded_validator.merge_results(shard_results, [0, 4], ["a"], register_results)
+
+        assert [r.phase for r in merged] == [ValidationPhase.SYNTACTICAL, ValidationPhase.LOGICAL] * 2 + [
+            ValidationPhase.LOGICAL
+        ]
+        findings = pl.concat([r.findings for r in merged], how="diagonal")
+        assert findings["uid"].to_list() == ["b", "c", "a", "a"]
+        assert findings["record_no"].to_list() == [2, 5, 1, 5]
+        assert findings["finding_no"].to_list() == [2, 3, 4, 5]
+        assert sum(r.error_counts.register_count for r in merged) == 2
+
+    def test_merge_results_syntax_errors(self):
+        shard_results = [
+            [syntax_results(True), logic_results(["a"], ["single-field"], [1])],
+            [syntax_results(False)],
+        ]
+        register_results = logic_results(["a"], ["register"], [1], register_count=1)
+
+        merged = sharded_validator.merge_results(shard_results, [0, 4], ["a"], register_results)
+
+        assert [r.phase for r in merged] == [ValidationPhase.SYNTACTICAL, ValidationPhase.SYNTACTICAL]
+        assert merged[1].findings["record_no"].to_list() == [6]
+
+    def test_cap_findings(self):
+        results = [
+            syntax_results(True),
+            logic_results(["a", "b"], ["single-field", "single-field"], [1, 2]),
+            sharded_validator.offset_findings(
+                logic_results(["c", "d"], ["single-field", "single-field"], [1, 2]).findings, 4, 2
+            ),
+        ]
+        results[2] = ValidationResults(
+            error_counts=Counts(total_count=2),
+            warning_counts=Counts(),
+            is_valid=False,
+            findings=results[2],
+            phase=ValidationPhase.LOGICAL,
+        )
+
+        capped = sharded_validator.cap_findings(results, 3)
+        assert capped[0] is results[0]
+        assert capped[1] is results[1]
+        assert capped[2].findings["uid"].to_list() == ["c"]
+        assert capped[2].error_counts.total_count == 2
+
+        capped = sharded_validator.cap_findings([syntax_results(False), syntax_results(False)], 1)
+        assert [r.findings.height for r in capped] == [1, 0]
+
+    def test_validate_shard(self, tmp_path, mocker: MockerFixture):
+        csv_path = tmp_path / "1.csv"
+        csv_path.write_text("uid\n001\n002\n003\n")
+        validate_mock = mocker.patch("sbl_filing_api.services.sharded_validator.validate_data")
+        validate_mock.side_effect = lambda lf, **kwargs: iter([syntax_results(True), lf.collect()])
+
+        results = sharded_validator.validate_shard(str(csv_path), "123456790", 1, None)
+        assert results[1]["uid"].to_list() == ["002", "003"]
+
+        assert sharded_validator.validate_shard(str(csv_path), "123456790", 0, 2, {"superseded": True}) is None
+
+    def test_validate_sharded(self, mocker: MockerFixture):
+        mocker.patch.object(sharded_validator.settings, "sharded_validation_workers", 2)
+        mocker.patch.object(sharded_validator.settings, "max_validation_errors", 100)
+        governor_mock = mocker.patch("sbl_filing_api.services.sharded_validator.ValidationGovernor")
+        slots = [mocker.Mock(), mocker.Mock()]
+        governor_mock.return_value.try_acquire.side_effect = slots
+        pool_mock = mocker.patch("sbl_filing_api.services.sharded_validator.ProcessPoolExecutor")
+        pool = pool_mock.return_value.__enter__.return_value
+        pool.submit.side_effect = [mocker.Mock(result=mocker.Mock(return_value=[])) for _ in range(2)]
+        mocker.patch("sbl_filing_api.services.sharded_validator.as_completed", side_effect=iter)
+        register_mock = mocker.patch("sbl_filing_api.services.sharded_validator.validate_register")
+        register_mock.return_value = ([], None)
+        merge_mock = mocker.patch("sbl_filing_api.services.sharded_validator.merge_results")
+        merge_mock.return_value = []
+        init_mock = mocker.Mock()
+        exec_check = {"continue": True}
+
+        result = sharded_validator.validate_sharded(
+            "test.csv", "123456790", 10, exec_check, initializer=init_mock, initargs=(1,)
+        )
+
+        pool_mock.assert_called_once_with(max_workers=2, mp_context=mocker.ANY, initializer=init_mock, initargs=(1,))
+        assert pool_mock.call_args.kwargs["mp_context"].get_start_method() == "spawn"
+        register_mock.assert_called_once_with("test.csv", "123456790", 5, 2)
+        pool.submit.assert_any_call(sharded_validator.validate_shard, "test.csv", "123456790", 0, 5, exec_check)
+        pool.submit.assert_any_call(sharded_validator.validate_shard, "test.csv", "123456790", 5, None, exec_check)
+        assert result == []
+        for slot in slots:
+            slot.release.assert_called_once()
+
+        # superseded part way through
+        governor_mock.return_value.try_acquire.side_effect = [mocker.Mock(), mocker.Mock()]
+        pool.submit.side_effect = [mocker.Mock(result=mocker.Mock(return_value=None)) for _ in range(2)]
+        assert sharded_validator.validate_sharded("test.csv", "123456790", 10, exec_check) is None
+        pool.shutdown.assert_called_once_with(wait=False, cancel_futures=True)
+
+    def test_validate_sharded_without_slots(self, mocker: MockerFixture):
+        mocker.patch.object(sharded_validator.settings, "sharded_validation_workers", 4)
+        governor_mock = mocker.patch("sbl_filing_api.services.sharded_validator.ValidationGovernor")
+        slot = mocker.Mock()
+        governor_mock.return_value.try_acquire.side_effect = [slot, None]
+        pool_mock = mocker.patch("sbl_filing_api.services.sharded_validator.ProcessPoolExecutor")
+        shard_mock = mocker.patch("sbl_filing_api.services.sharded_validator.validate_shard")
+        exec_check = {"continue": True}
+
+        result = sharded_validator.validate_sharded("test.csv", "123456790", 10, exec_check)
+
+        assert not pool_mock.called
+        shard_mock.assert_called_once_with("test.csv", "123456790", 0, None, exec_check)
+        assert result == shard_mock.return_value
+        slot.release.assert_called_once()
@@ -0,0 +1,39 @@
+import multiprocessing
+
+from sbl_filing_api.services.validation_governor import ValidationGovernor
+
+
+def hold_slot(slot_dir: str, acquired, done):
+    slot = ValidationGovernor(slot_dir, 1).try_acquire()
+    acquired.set()
+    done.wait(5)
+    slot.release()
+
+
+class TestValidationGovernor:
+    def test_acquire_and_release(self, tmp_path):
+        governor = ValidationGovernor(str(tmp_path), 2)
+        first = governor.try_acquire()
+        second = governor.try_acquire()
+        assert {first.index, second.index} == {0, 1}
+        assert governor.try_acquire() is None
+
+        first.release()
+        first.release()
+        assert governor.held == {1}
+        third = governor.try_acquire()
+        assert third.index == 0
+
+    def test_slots_shared_across_processes(self, tmp_path):
+        ctx = multiprocessing.get_context("spawn")
+        acquired, done = ctx.Event(), ctx.Event()
+        holder = ctx.Process(target=hold_slot, args=(str(tmp_path), acquired, done))
+        holder.start()
+        try:
+            assert acquired.wait(30)
+            governor = ValidationGovernor(str(tmp_path), 1)
+            assert governor.try_acquire() is None
+        finally:
+            done.set()
+            holder.join(10)
+        assert governor.try_acquire().index == 0
@@ -0,0 +1,846 @@
+import polars as pl
+
+from multiprocessing import Manager
+from pytest_mock import MockerFixture
+from unittest.mock import Mock
+
+from sbl_filing_api.config import settings
+from sbl_filing_api.entities.models.dao import SubmissionDAO, SubmissionState
+from sbl_filing_api.services import validation_worker
+from regtech_data_validator.validation_results import ValidationPhase, ValidationResults, Counts
+from regtech_data_validator.checks import Severity
+
+
+class TestValidationWorker:
+    async def test_validate_and_update_successful(
+        self,
+        mocker: MockerFixture,
+        successful_submission_mock: Mock,
+        build_validation_results_mock: Mock,
+        get_submission_mock: Mock,
+    ):
+        mock_sub = SubmissionDAO(
+            id=1,
+            filing=1,
+            counter=2,
+            state=SubmissionState.SUBMISSION_UPLOADED,
+            filename="submission.csv",
+        )
+        get_submission_mock.return_value = mock_sub
+
+        mock_download_formatting = mocker.patch("sbl_filing_api.services.validation_worker.df_to_download")
+        mock_download_formatting.return_value = b"\x01"
+
+        file_mock = mocker.patch("sbl_filing_api.services.validation_worker.upload_to_storage")
+        cache_mock = mocker.spy(validation_worker, "cache_submission")
+
+        await validation_worker.validate_and_update_submission("2024", "123456790", mock_sub.id, {"continue": True})
+
+        file_mock.assert_called_once_with(
+            "2024", "123456790", "2" + validation_worker.REPORT_QUALIFIER, mock_download_formatting.return_value
+        )
+        validation_worker.repo.add_validation_summary.assert_called_once_with(mocker.ANY, 1, [])
+        assert successful_submission_mock.mock_calls[0].args[2] == SubmissionState.VALIDATION_IN_PROGRESS
+        assert successful_submission_mock.mock_calls[0].kwargs["validation_ruleset_version"] == "0.1.0"
+        assert successful_submission_mock.mock_calls[1].args[2] == "VALIDATION_SUCCESSFUL"
+        # validated in one pass over the csv for the first time, so it isn't converted to Parquet
+        cache_mock.assert_called_once_with("2024", "123456790", 2, convert=False)
+
+        # picked up again, e.g. after its worker died, so the Parquet copy pays for itself
+        mocker.patch("sbl_filing_api.services.validation_worker.upload_file_to_storage")
+        mock_sub.state = SubmissionState.VALIDATION_IN_PROGRESS
+        await validation_worker.validate_and_update_submission("2024", "123456790", mock_sub.id, {"continue": True})
+        cache_mock.assert_called_with("2024", "123456790", 2, convert=True)
+
+    async def test_validate_and_update_sharded(
+        self,
+        mocker: MockerFixture,
+        validate_submission_mock: Mock,
+        build_validation_results_mock: Mock,
+        df_to_download_mock: Mock,
+        get_submission_mock: Mock,
+    ):
+        mocker.patch.object(settings, "sharded_validation_min_records", 10)
+        mock_sub = SubmissionDAO(
+            id=1,
+            filing=1,
+            counter=2,
+            state=SubmissionState.SUBMISSION_UPLOADED,
+            filename="submission.csv",
+            total_records=11,
+        )
+        get_submission_mock.return_value = mock_sub
+        validate_data_mock = mocker.patch("sbl_filing_api.services.validation_worker.validate_data")
+        sharded_mock = mocker.patch("sbl_filing_api.services.validation_worker.sharded_validator.validate_sharded")
+        sharded_mock.return_value = [
+            ValidationResults(
+                error_counts=Counts(),
+                warning_counts=Counts(),
+                is_valid=True,
+                findings=pl.DataFrame(),
+                phase=ValidationPhase.LOGICAL,
+            )
+        ]
+        mocker.patch("sbl_filing_api.services.validation_worker.upload_to_storage")
+        mocker.patch("sbl_filing_api.services.validation_worker.upload_file_to_storage")
+        cache_mock = mocker.spy(validation_worker, "cache_submission")
+
+        await validation_worker.validate_and_update_submission("2024", "123456790", mock_sub.id, {"continue": True})
+
+        # every shard scans the submission, so it's converted even on its first validation
+        cache_mock.assert_called_once_with("2024", "123456790", 2, convert=True)
+        sharded_mock.assert_called_once_with(
+            cache_mock.spy_return,
+            "123456790",
+            11,
+            {"continue": True},
+            initializer=validation_worker.init_shard_worker,
+            initargs=(1,),
+        )
+        assert not validate_data_mock.called
+        assert validate_submission_mock.mock_calls[1].args[2] == SubmissionState.VALIDATION_SUCCESSFUL
+
+        mock_sub.total_records = 10
+        validate_data_mock.return_value = iter(sharded_mock.return_value)
+        await validation_worker.validate_and_update_submission("2024", "123456790", mock_sub.id, {"continue": True})
+        assert sharded_mock.call_count == 1
+        assert validate_data_mock.called
+
+        # superseded while the shards were being validated
+        mock_sub.total_records = 11
+        sharded_mock.return_value = None
+        validate_submission_mock.reset_mock()
+        await validation_worker.validate_and_update_submission("2024", "123456790", mock_sub.id, {"continue": True})
+        assert validate_submission_mock.call_count == 1
+
+    async def test_validate_and_update_warnings(
+        self,
+        mocker: MockerFixture,
+        warning_submission_mock: Mock,
+        get_submission_mock: Mock,
+    ):
+        mock_sub = SubmissionDAO(
+            id=1,
+            filing=1,
+            counter=3,
+            state=SubmissionState.SUBMISSION_UPLOADED,
+            filename="submission.csv",
+        )
+        get_submission_mock.return_value = mock_sub
+
+        mock_build_json = mocker.patch("sbl_filing_api.services.validation_worker.build_validation_results")
+        mock_build_json.return_value = {"logic_errors": {"total_count": 0}, "logic_warnings": {"total_count": 1}}
+
+        mock_download_formatting = mocker.patch("sbl_filing_api.services.validation_worker.df_to_download")
+        mock_download_formatting.return_value = b"\x01"
+
+        file_mock = mocker.patch("sbl_filing_api.services.validation_worker.upload_to_storage")
+
+        await validation_worker.validate_and_update_submission("2024", "123456790", mock_sub.id, {"continue": True})
+
+        file_mock.assert_called_once_with(
+            "2024", "123456790", "3" + validation_worker.REPORT_QUALIFIER, mock_download_formatting.return_value
+        )
+        assert warning_submission_mock.mock_calls[0].args[2] == SubmissionState.VALIDATION_IN_PROGRESS
+        assert warning_submission_mock.mock_calls[0].kwargs["validation_ruleset_version"] == "0.1.0"
+        assert warning_submission_mock.mock_calls[1].args[2] == SubmissionState.VALIDATION_WITH_WARNINGS
+
+    async def test_validate_and_update_errors(
+        self,
+        mocker: MockerFixture,
+        error_submission_mock: Mock,
+        get_submission_mock: Mock,
+    ):
+        mock_sub = SubmissionDAO(
+            id=1,
+            filing=1,
+            counter=4,
+            state=SubmissionState.SUBMISSION_UPLOADED,
+            filename="submission.csv",
+        )
+        get_submission_mock.return_value = mock_sub
+
+        mock_build_json = mocker.patch("sbl_filing_api.services.validation_worker.build_validation_results")
+        mock_build_json.return_value = {"logic_errors": {"total_count": 1}}
+
+        mock_download_formatting = mocker.patch("sbl_filing_api.services.validation_worker.df_to_download")
+        mock_download_formatting.return_value = b"\x01"
+
+        file_mock = mocker.patch("sbl_filing_api.services.validation_worker.upload_to_storage")
+
+        await validation_worker.validate_and_update_submission("2024", "123456790", mock_sub.id, {"continue": True})
+
+        file_mock.assert_called_once_with(
+            "2024", "123456790", "4" + validation_worker.REPORT_QUALIFIER, mock_download_formatting.return_value
+        )
+        assert error_submission_mock.mock_calls[0].args[2] == SubmissionState.VALIDATION_IN_PROGRESS
+        assert error_submission_mock.mock_calls[0].kwargs["validation_ruleset_version"] == "0.1.0"
+        assert error_submission_mock.mock_calls[1].args[2] == SubmissionState.VALIDATION_WITH_ERRORS
+
+    async def test_validate_and_update_submission_malformed(
+        self,
+        mocker: MockerFixture,
+        get_submission_mock: Mock,
+    ):
+        log_mock = mocker.patch("sbl_filing_api.services.validation_worker.log")
+
+        mock_sub = SubmissionDAO(
+            id=1,
+            filing=1,
+            state=SubmissionState.SUBMISSION_UPLOADED,
+            filename="submission.csv",
+        )
+        get_submission_mock.return_value = mock_sub
+
+        mock_set_state = mocker.patch("sbl_filing_api.services.validation_worker.set_submission_state")
+        mock_set_state.return_value = True
+
+        mock_read_csv = mocker.patch("sbl_filing_api.services.validation_worker.validate_data")
+        re = RuntimeError("File not in csv format")
+        mock_read_csv.side_effect = re
+
+        await validation_worker.validate_and_update_submission("2024", "123456790", mock_sub.id, {"continue": True})
+
+        mock_set_state.assert_called()
+        log_mock.exception.assert_called_with("The file is malformed.")
+
+        assert mock_set_state.mock_calls[0].args[2] == SubmissionState.VALIDATION_IN_PROGRESS
+        assert mock_set_state.mock_calls[1].args[2] == SubmissionState.SUBMISSION_UPLOAD_MALFORMED
+
+        mock_read_csv.side_effect = None
+        mock_validation = mocker.patch("sbl_filing_api.services.validation_worker.validate_data")
+        re = RuntimeError("File can not be parsed by validator")
+        mock_validation.side_effect = re
+
+        await validation_worker.validate_and_update_submission("2024", "123456790", mock_sub.id, {"continue": True})
+        log_mock.exception.assert_called_with("The file is malformed.")
+        assert mock_set_state.mock_calls[0].args[2] == SubmissionState.VALIDATION_IN_PROGRESS
+        assert mock_set_state.mock_calls[1].args[2] == SubmissionState.SUBMISSION_UPLOAD_MALFORMED
+
+        e = Exception("Test exception")
+        mock_validation.side_effect = e
+
+        await validation_worker.validate_and_update_submission("2024", "123456790", mock_sub.id, {"continue": True})
+        log_mock.exception.assert_called_with(
+            "Validation for submission %d did not complete due to an unexpected error.", mock_sub.id
+        )
+
+    async def test_validate_submission_not_found(
+        self, mocker: MockerFixture, validate_submission_mock: Mock, get_submission_mock: Mock
+    ):
+        log_mock = mocker.patch("sbl_filing_api.services.validation_worker.log")
+        get_submission_mock.return_value = None
+
+        await validation_worker.validate_and_update_submission("2024", "123456790", 1, {"continue": True})
+
+        get_submission_mock.assert_called_with(mocker.ANY, 1)
+        log_mock.error.assert_called_with("Submission %d not found, unable to validate.", 1)
+        assert not validate_submission_mock.called
+
+    async def test_validation_expired(
+        self,
+        mocker: MockerFixture,
+        validate_submission_mock: Mock,
+        error_submission_mock: Mock,
+        build_validation_results_mock: Mock,
+        df_to_download_mock: Mock,
+        get_submission_mock: Mock,
+    ):
+        log_mock = mocker.patch("sbl_filing_api.services.validation_worker.log")
+
+        mock_sub = SubmissionDAO(
+            id=1,
+            filing=1,
+            state=SubmissionState.SUBMISSION_UPLOADED,
+            filename="submission.csv",
+        )
+        get_submission_mock.return_value = mock_sub
+
+        mock_set_state = mocker.patch("sbl_filing_api.services.validation_worker.set_submission_state")
+        mock_set_state.return_value = True
+
+        mock_build_json = mocker.patch("sbl_filing_api.services.validation_worker.build_validation_results")
+        mock_build_json.return_value = {"logic_errors": {"total_count": 1}}
+
+        await validation_worker.validate_and_update_submission("2024", "123456790", mock_sub.id, {"continue": False})
+
+        # second update shouldn't be called
+        assert len(mock_set_state.mock_calls) == 1
+        log_mock.warning.assert_called_with("Submission 1 is expired, will not be updating final state with results.")
+
+    async def test_validate_and_update_superseded(
+        self,
+        mocker: MockerFixture,
+        successful_submission_mock: Mock,
+        build_validation_results_mock: Mock,
+        df_to_download_mock: Mock,
+        get_submission_mock: Mock,
+    ):
+        mocker.patch.object(settings, "supersede_validations", True)
+        state_mock = mocker.patch("sbl_filing_api.entities.repos.submission_repo.get_submission_state")
+        state_mock.return_value = SubmissionState.SUBMISSION_SUPERSEDED
+        mocker.patch("sbl_filing_api.services.validation_worker.upload_to_storage")
+        get_submission_mock.return_value = SubmissionDAO(
+            id=1,
+            filing=1,
+            counter=1,
+            state=SubmissionState.SUBMISSION_UPLOADED,
+            filename="submission.csv",
+        )
+
+        await validation_worker.validate_and_update_submission("2024", "123456790", 1, {"continue": True})
+
+        # superseded while validating, so only the VALIDATION_IN_PROGRESS update happens
+        assert successful_submission_mock.call_count == 1
+        state_mock.assert_called_once_with(1)
+
+    async def test_validate_and_update_superseded_while_running(
+        self,
+        mocker: MockerFixture,
+        successful_submission_mock: Mock,
+        df_to_download_mock: Mock,
+        get_submission_mock: Mock,
+    ):
+        upload_mock = mocker.patch("sbl_filing_api.services.validation_worker.upload_to_storage")
+        get_submission_mock.return_value = SubmissionDAO(
+            id=1,
+            filing=1,
+            counter=1,
+            state=SubmissionState.SUBMISSION_UPLOADED,
+            filename="submission.csv",
+        )
+
+        await validation_worker.validate_and_update_submission(
+            "2024", "123456790", 1, {"continue": True, "superseded": True}
+        )
+
+        assert successful_submission_mock.call_count == 1
+        assert not df_to_download_mock.called
+        assert not upload_mock.called
+
+    async def test_validate_and_update_superseded_before_start(
+        self, validate_submission_mock: Mock, get_submission_mock: Mock
+    ):
+        get_submission_mock.return_value = SubmissionDAO(
+            id=1,
+            filing=1,
+            counter=1,
+            state=SubmissionState.SUBMISSION_SUPERSEDED,
+            filename="submission.csv",
+        )
+
+        await validation_worker.validate_and_update_submission("2024", "123456790", 1, {"continue": True})
+
+        assert not validate_submission_mock.called
+
+    async def test_validate_and_update_superseded_while_loading(
+        self, mocker: MockerFixture, validate_submission_mock: Mock, get_submission_mock: Mock
+    ):
+        validate_data_mock = mocker.patch("sbl_filing_api.services.validation_worker.validate_data")
+        get_submission_mock.return_value = SubmissionDAO(
+            id=1,
+            filing=1,
+            counter=1,
+            state=SubmissionState.SUBMISSION_UPLOADED,
+            filename="submission.csv",
+        )
+        # superseded between loading the submission and setting it VALIDATION_IN_PROGRESS
+        validate_submission_mock.return_value = False
+
+        await validation_worker.validate_and_update_submission("2024", "123456790", 1, {"continue": True})
+
+        validate_submission_mock.assert_called_once_with(
+            mocker.ANY, 1, SubmissionState.VALIDATION_IN_PROGRESS, validation_ruleset_version="0.1.0"
+        )
+        assert not validate_data_mock.called
+
+    def test_cache_submission(self, mocker: MockerFixture, tmp_path):
+        mocker.patch.object(settings.fs_upload_config, "root", str(tmp_path))
+        mocker.patch.object(settings.fs_upload_config, "protocol", "file")
+        csv_path = tmp_path / "upload" / "2024" / "123456790" / "1.csv"
+        csv_path.parent.mkdir(parents=True)
+        csv_path.write_text("uid,app_date\n001,20240101\n")
+
+        # read once, so it isn't worth converting
+        assert validation_worker.cache_submission("2024", "123456790", 1, convert=False) == str(csv_path)
+        assert not csv_path.with_suffix(".parquet").exists()
+
+        file_path = validation_worker.cache_submission("2024", "123456790", 1)
+        assert file_path == str(csv_path.with_suffix(".parquet"))
+        assert pl.read_parquet(file_path).to_dicts() == [{"uid": "001", "app_date": "20240101"}]
+
+        # already cached, so it isn't written again, and is read even when not converting
+        sink_mock = mocker.patch("polars.LazyFrame.sink_parquet")
+        assert validation_worker.cache_submission("2024", "123456790", 1) == file_path
+        assert validation_worker.cache_submission("2024", "123456790", 1, convert=False) == file_path
+        assert not sink_mock.called
+
+        mocker.patch.object(settings, "submission_parquet_cache", False)
+        assert validation_worker.cache_submission("2024", "123456790", 1) == str(csv_path)
+
+    def test_cache_submission_failure(self, mocker: MockerFixture, tmp_path):
+        mocker.patch.object(settings.fs_upload_config, "root", str(tmp_path))
+        mocker.patch.object(settings.fs_upload_config, "protocol", "file")
+        log_mock = mocker.patch("sbl_filing_api.services.validation_worker.log")
+
+        assert validation_worker.cache_submission("2024", "123456790", 1) == f"{tmp_path}/upload/2024/123456790/1.csv"
+        log_mock.warning.assert_called_once()
+        assert not (tmp_path / "upload" / "2024" / "123456790" / "1.parquet").exists()
+
+    def test_upload_report(self, mocker: MockerFixture):
+        download_mock = mocker.patch("sbl_filing_api.services.validation_worker.df_to_download")
+        download_mock.return_value = b"validation_type,validation_id\nError,E0001\n"
+        upload_mock = mocker.patch("sbl_filing_api.services.validation_worker.upload_to_storage")
+        results = [
+            ValidationResults(
+                error_counts=Counts(total_count=2),
+                warning_counts=Counts(total_count=1),
+                is_valid=False,
+                findings=pl.DataFrame(),
+                phase=ValidationPhase.LOGICAL,
+            )
+        ] * 2
+        final_df = pl.DataFrame({"validation_type": [Severity.ERROR]})
+
+        validation_worker.upload_report("2024", "123456790", 2, final_df, results)
+
+        download_mock.assert_called_once_with(
+            final_df, warning_count=2, error_count=4, max_errors=settings.max_validation_errors
+        )
+        upload_mock.assert_called_once_with(
+            "2024", "123456790", "2" + validation_worker.REPORT_QUALIFIER, download_mock.return_value
+        )
+
+    def test_expected_header(self, mocker: MockerFixture):
+        mocker.patch(
+            "sbl_filing_api.services.validation_worker.get_template",
+            return_value={"uid": Mock(), "app_date": Mock(), "app_method": Mock()},
+        )
+        assert validation_worker.expected_header() == ["uid", "app_date", "app_method"]
+
+    def test_summarize_findings(self):
+        assert validation_worker.summarize_findings(pl.DataFrame()) == []
+
+        findings = pl.DataFrame(
+            {
+                "finding_no": [1, 2, 2, 3, 4],
+                "record_no": [1, 2, 2, 2, 5],
+                "validation_type": [
+                    Severity.ERROR,
+                    Severity.WARNING,
+                    Severity.WARNING,
+                    Severity.WARNING,
+                    Severity.ERROR,
+                ],
+                "validation_id": ["E0001", "W2000", "W2000", "W2000", "E0001"],
+                "scope": ["single-field", "multi-field", "multi-field", "multi-field", "single-field"],
+                "field_name": ["uid", "app_date", "action_taken_date", "app_date", "uid"],
+            }
+        )
+        summary = sorted(
+            validation_worker.summarize_findings(findings), key=lambda s: (s["validation_id"], s["field_name"])
+        )
+        assert summary == [
+            {
+                "validation_id": "E0001",
+                "severity": "Error",
+                "scope": "single-field",
+                "field_name": "uid",
+                "finding_count": 2,
+                "record_count": 2,
+            },
+            {
+                "validation_id": "W2000",
+                "severity": "Warning",
+                "scope": "multi-field",
+                "field_name": "action_taken_date",
+                "finding_count": 1,
+                "record_count": 1,
+            },
+            {
+                "validation_id": "W2000",
+                "severity": "Warning",
+                "scope": "multi-field",
+                "field_name": "app_date",
+                "finding_count": 2,
+                "record_count": 1,
+            },
+        ]
+
+        # without field names, findings are counted per validation
+        summary = validation_worker.summarize_findings(findings.drop("field_name", "finding_no").unique())
+        assert {(s["validation_id"], s["finding_count"], s["record_count"]) for s in summary} == {
+            ("E0001", 2, 2),
+            ("W2000", 1, 1),
+        }
+
+    def test_sum_counts(self):
+        results = [
+            ValidationResults(
+                error_counts=Counts(single_field_count=1, register_count=2, total_count=3),
+                warning_counts=Counts(multi_field_count=4, total_count=4),
+                is_valid=False,
+                findings=pl.DataFrame(),
+                phase=ValidationPhase.LOGICAL,
+            ),
+            ValidationResults(
+                error_counts=Counts(single_field_count=5, total_count=5),
+                warning_counts=Counts(),
+                is_valid=False,
+                findings=pl.DataFrame(),
+                phase=ValidationPhase.LOGICAL,
+            ),
+        ]
+        errors, warnings = validation_worker.sum_counts(results)
+        assert errors == {"single_field_count": 6, "multi_field_count": 0, "register_count": 2, "total_count": 8}
+        assert warnings == {"single_field_count": 0, "multi_field_count": 4, "register_count": 0, "total_count": 4}
+
+    def test_trim_findings(self, mocker: MockerFixture):
+        assert validation_worker.trim_findings(pl.DataFrame(), 1).is_empty()
+
+        findings = pl.DataFrame(
+            {
+                "finding_no": [1, 2, 3, 4, 5, 5, 6, 6, 7],
+                "record_no": [1, 2, 3, 4, 1, 1, 2, 2, 3],
+                "validation_id": ["E0001"] * 4 + ["W2000"] * 5,
+                "field_name": ["uid"] * 4 + ["app_date", "action_taken_date"] * 2 + ["app_date"],
+            }
+        )
+        trimmed = validation_worker.trim_findings(findings, 1)
+        # one finding past the group size is kept, with every field of a multi-field finding
+        assert trimmed.to_dict(as_series=False) == {
+            "finding_no": [1, 2, 5, 5, 6, 6],
+            "record_no": [1, 2, 1, 1, 2, 2],
+            "validation_id": ["E0001", "E0001", "W2000", "W2000", "W2000", "W2000"],
+            "field_name": ["uid", "uid", "app_date", "action_taken_date", "app_date", "action_taken_date"],
+        }
+        assert validation_worker.trim_findings(findings, 10).equals(findings)
+
+        df_to_dicts_mock = mocker.patch("sbl_filing_api.services.validation_worker.df_to_dicts")
+        df_to_dicts_mock.return_value = []
+        mocker.patch.object(settings, "max_json_group_size", 1)
+        validation_worker.build_validation_results(findings, [], ValidationPhase.LOGICAL)
+        assert df_to_dicts_mock.call_args.args[0].equals(trimmed)
+        assert df_to_dicts_mock.call_args.args[1:] == (settings.max_json_records, 1)
+
+    async def test_build_validation_results_success(self, mocker: MockerFixture):
+
+        df_to_dicts_mock = mocker.patch("sbl_filing_api.services.validation_worker.df_to_dicts")
+        df_to_dicts_mock.return_value = []
+
+        validation_results = validation_worker.build_validation_results(pl.DataFrame(), [], ValidationPhase.LOGICAL)
+        assert validation_results["syntax_errors"]["single_field_count"] == 0
+        assert validation_results["syntax_errors"]["multi_field_count"] == 0
+        assert validation_results["syntax_errors"]["register_count"] == 0
+        assert validation_results["logic_errors"]["single_field_count"] == 0
+        assert validation_results["logic_errors"]["multi_field_count"] == 0
+        assert validation_results["logic_errors"]["register_count"] == 0
+        assert validation_results["logic_warnings"]["single_field_count"] == 0
+        assert validation_results["logic_warnings"]["multi_field_count"] == 0
+        assert validation_results["logic_warnings"]["register_count"] == 0
+
+    async def test_build_validation_results_syntax_errors(self, mocker: MockerFixture):
+
+        df_to_dicts_mock = mocker.patch("sbl_filing_api.services.validation_worker.df_to_dicts")
+        df_to_dicts_mock.return_value = [
+            {
+                "validation": {
+                    "id": "E0001",
+                    "name": "uid.invalid_text_length",
+                    "description": "* 'Unique identifier' must be at least 21 characters in\nlength and at most 45 characters in length.",
+                    "severity": "Error",
+                    "scope": "single-field",
+                    "fig_link": "https://www.consumerfinance.gov/data-research/small-business-lending/filing-instructions-guide/2024-guide/#4.1.1",
+                },
+                "records": [
+                    {
+                        "record_no": 1,
+                        "uid": "12345",
+                        "fields": [{"name": "uid", "value": "12345"}],
+                    }
+                ],
+            },
+            {
+                "validation": {
+                    "id": "E0002",
+                    "name": "uid.invalid_text_pattern",
+                    "description": "* 'Unique identifier' may contain any combination of numbers and/or uppercase letters (i.e., 0-9 and A-Z), and must **not** contain any other characters.",
+                    "severity": "Error",
+                    "scope": "single-field",
+                    "fig_link": "https://www.consumerfinance.gov/data-research/small-business-lending/filing-instructions-guide/2024-guide/#4.1.2",
+                },
+                "records": [
+                    {
+                        "record_no": 1,
+                        "uid": "123-45",
+                        "fields": [{"name": "uid", "value": "123-45"}],
+                    }
+                ],
+            },
+        ]
+        findings = pl.DataFrame(
+            {
+                "validation_type": [Severity.ERROR, Severity.ERROR, Severity.WARNING],
+                "scope": ["single-field", "single-field", "multi-field"],
+            }
+        )
+        result_counts = ValidationResults(
+            error_counts=Counts(single_field_count=2),
+            warning_counts=Counts(),
+            is_valid=False,
+            findings=findings,
+            phase=ValidationPhase.SYNTACTICAL,
+        )
+
+        validation_results = validation_worker.build_validation_results(
+            findings, [result_counts], ValidationPhase.SYNTACTICAL
+        )
+        assert validation_results["syntax_errors"]["single_field_count"] == 2
+        assert validation_results["syntax_errors"]["multi_field_count"] == 0
+        assert validation_results["syntax_errors"]["register_count"] == 0
+
+    def test_build_validation_results_logic_errors(self, mocker: MockerFixture):
+
+        df_to_dicts_mock = mocker.patch("sbl_filing_api.services.validation_worker.df_to_dicts")
+        df_to_dicts_mock.return_value = [
+            {
+                "validation": {
+                    "id": "E3000",
+                    "name": "uid.duplicates_in_dataset",
+                    "description": "* Any 'unique identifier' may **not** be used in more than one \nrecord within a small business lending application register.\n",
+                    "severity": "Error",
+                    "scope": "register",
+                    "fig_link": "https://www.consumerfinance.gov/data-research/small-business-lending/filing-instructions-guide/2024-guide/#4.3.1",
+                },
+                "records": [
+                    {
+                        "record_no": 1,
+                        "uid": "12345678901234567890",
+                        "fields": [{"name": "uid", "value": "12345678901234567890"}],
+                    },
+                    {
+                        "record_no": 2,
+                        "uid": "12345678901234567890",
+                        "fields": [{"name": "uid", "value": "12345678901234567890"}],
+                    },
+                ],
+            },
+        ]
+        findings = pl.DataFrame(
+            {
+                "validation_type": [Severity.ERROR, Severity.ERROR, Severity.WARNING],
+                "scope": ["register", "register", "multi-field"],
+            }
+        )
+
+        result_counts = ValidationResults(
+            error_counts=Counts(register_count=2),
+            warning_counts=Counts(),
+            is_valid=False,
+            findings=findings,
+            phase=ValidationPhase.LOGICAL,
+        )
+
+        validation_results = validation_worker.build_validation_results(
+            findings, [result_counts], ValidationPhase.LOGICAL
+        )
+        assert validation_results["logic_errors"]["single_field_count"] == 0
+        assert validation_results["logic_errors"]["multi_field_count"] == 0
+        assert validation_results["logic_errors"]["register_count"] == 2
+
+    def test_build_validation_results_logic_warnings(self, mocker: MockerFixture):
+
+        df_to_dicts_mock = mocker.patch("sbl_filing_api.services.validation_worker.df_to_dicts")
+        df_to_dicts_mock.return_value = [
+            {
+                "validation": {
+                    "id": "W0003",
+                    "name": "uid.invalid_uid_lei",
+                    "description": "* The first 20 characters of the 'unique identifier' should\nmatch the Legal Entity Identifier (LEI) for the financial institution.",
+                    "severity": "Warning",
+                    "scope": "single-field",
+                    "fig_link": "https://www.consumerfinance.gov/data-research/small-business-lending/filing-instructions-guide/2024-guide/#4.4.1",
+                },
+                "records": [
+                    {
+                        "record_no": 3,
+                        "uid": "12345678901234567891",
+                        "fields": [{"name": "uid", "value": "12345678901234567891"}],
+                    }
+                ],
+            },
+        ]
+
+        findings = pl.DataFrame({"validation_type": [Severity.WARNING], "scope": ["single-field"]})
+
+        result_counts = ValidationResults(
+            error_counts=Counts(),
+            warning_counts=Counts(single_field_count=1),
+            is_valid=False,
+            findings=findings,
+            phase=ValidationPhase.LOGICAL,
+        )
+
+        validation_results = validation_worker.build_validation_results(
+            findings, [result_counts], ValidationPhase.LOGICAL
+        )
+        assert validation_results["logic_warnings"]["single_field_count"] == 1
+        assert validation_results["logic_warnings"]["multi_field_count"] == 0
+        assert validation_results["logic_warnings"]["register_count"] == 0
+
+    def test_build_validation_results_logic_warnings_and_errors(self, mocker: MockerFixture):
+
+        df_to_dicts_mock = mocker.patch("sbl_filing_api.services.validation_worker.df_to_dicts")
+        df_to_dicts_mock.return_value = [
+            {
+                "validation": {
+                    "id": "W0003",
+                    "name": "uid.invalid_uid_lei",
+                    "description": "* The first 20 characters of the 'unique identifier' should\nmatch the Legal Entity Identifier (LEI) for the financial institution.",
+                    "severity": "Warning",
+                    "scope": "single-field",
+                    "fig_link": "https://www.consumerfinance.gov/data-research/small-business-lending/filing-instructions-guide/2024-guide/#4.4.1",
+                },
+                "records": [
+                    {
+                        "record_no": 3,
+                        "uid": "12345678901234567891",
+                        "fields": [{"name": "uid", "value": "12345678901234567891"}],
+                    }
+                ],
+            },
+            {
+                "validation": {
+                    "id": "E3000",
+                    "name": "uid.duplicates_in_dataset",
+                    "description": "* Any 'unique identifier' may **not** be used in more than one \nrecord within a small business lending application register.\n",
+                    "severity": "Error",
+                    "scope": "register",
+                    "fig_link": "https://www.consumerfinance.gov/data-research/small-business-lending/filing-instructions-guide/2024-guide/#4.3.1",
+                },
+                "records": [
+                    {
+                        "record_no": 1,
+                        "uid": "12345678901234567890",
+                        "fields": [{"name": "uid", "value": "12345678901234567890"}],
+                    },
+                    {
+                        "record_no": 2,
+                        "uid": "12345678901234567890",
+                        "fields": [{"name": "uid", "value": "12345678901234567890"}],
+                    },
+                ],
+            },
+        ]
+
+        findings = pl.DataFrame(
+            {
+                "validation_type": [Severity.ERROR, Severity.ERROR, Severity.WARNING],
+                "scope": ["register", "register", "single-field"],
+            }
+        )
+
+        result_counts = ValidationResults(
+            error_counts=Counts(register_count=2),
+            warning_counts=Counts(single_field_count=1),
+            is_valid=False,
+            findings=findings,
+            phase=ValidationPhase.LOGICAL,
+        )
+
+        validation_results = validation_worker.build_validation_results(
+            findings, [result_counts], ValidationPhase.LOGICAL
+        )
+        assert validation_results["logic_warnings"]["single_field_count"] == 1
+        assert validation_results["logic_warnings"]["multi_field_count"] == 0
+        assert validation_results["logic_warnings"]["register_count"] == 0
+        assert validation_results["logic_errors"]["single_field_count"] == 0
+        assert validation_results["logic_errors"]["multi_field_count"] == 0
+        assert validation_results["logic_errors"]["register_count"] == 2
+
+    async def test_handler(self, mocker: MockerFixture):
+        mock_sub = SubmissionDAO(
+            id=1,
+            filing=1,
+            state=SubmissionState.SUBMISSION_UPLOADED,
+            filename="submission.csv",
+        )
+
+        validation_mock = mocker.patch("sbl_filing_api.services.validation_worker.validate_and_update_submission")
+        mock_new_loop = mocker.patch("asyncio.get_event_loop")
+        mock_event_loop = Mock()
+        mock_new_loop.return_value = mock_event_loop
+
+        exec_check = Manager().dict()
+        exec_check["continue"] = True
+
+        validation_worker.handle_submission("2024", "123456789TESTBANK123", mock_sub.id, exec_check)
+
+        validation_mock.assert_called_with("2024", "123456789TESTBANK123", mock_sub.id, exec_check)
+
+    def test_check_memory(self, mocker: MockerFixture):
+        mocker.patch.object(validation_worker.settings, "validation_max_rss", 100)
+        rss_mock = mocker.patch("sbl_filing_api.services.validation_worker.get_rss")
+        error_mock = mocker.patch("sbl_filing_api.entities.repos.submission_repo.error_out_submission")
+        exit_mock = mocker.patch("sbl_filing_api.services.validation_worker.os._exit")
+
+        rss_mock.return_value = 200
+        validation_worker.check_memory()
+        assert not exit_mock.called
+
+        mocker.patch.object(validation_worker, "current_submission_id", 1)
+        rss_mock.return_value = 100
+        validation_worker.check_memory()
+        assert not exit_mock.called
+
+        rss_mock.return_value = 101
+        validation_worker.check_memory()
+        error_mock.assert_called_with(1)
+        exit_mock.assert_called_once_with(1)
+
+    def test_warm_worker(self, mocker: MockerFixture):
+        validate_mock = mocker.patch("sbl_filing_api.services.validation_worker.validate_data")
+        validate_mock.return_value = iter([Mock()])
+        ping_mock = mocker.patch("sbl_filing_api.services.validation_worker.ping_db")
+        loop_mock = mocker.patch("asyncio.get_event_loop")
+        log_mock = mocker.patch("sbl_filing_api.services.validation_worker.log")
+
+        validation_worker.warm_worker()
+
+        validate_mock.assert_called_once()
+        ping_mock.assert_called_once()
+        loop_mock.return_value.run_until_complete.assert_called_once()
+        assert not log_mock.warning.called
+
+        validate_mock.side_effect = RuntimeError("Validator unavailable.")
+        validation_worker.warm_worker()
+        log_mock.warning.assert_called_with("Unable to warm up the validator.", exc_info=True)
+
+    def test_init_worker(self, mocker: MockerFixture):
+        mocker.patch.object(validation_worker.settings, "validation_max_rss", 0)
+        warm_mock = mocker.patch("sbl_filing_api.services.validation_worker.warm_worker")
+        mocker.patch.dict("os.environ")
+
+        mocker.patch.object(validation_worker.settings, "validation_warm_workers", False)
+        validation_worker.init_worker()
+        assert validation_worker.os.environ["POLARS_MAX_THREADS"] == "4"
+        assert not warm_mock.called
+
+        mocker.patch.object(validation_worker.settings, "validation_warm_workers", True)
+        validation_worker.init_worker()
+        warm_mock.assert_called_once()
+
+    def test_init_shard_worker(self, mocker: MockerFixture):
+        mocker.patch.object(validation_worker.settings, "validation_max_rss", 1024)
+        thread_mock = mocker.patch("sbl_filing_api.services.validation_worker.threading.Thread")
+        warm_mock = mocker.patch("sbl_filing_api.services.validation_worker.warm_worker")
+        mocker.patch.dict("os.environ")
+        mocker.patch.object(validation_worker, "current_submission_id", None)
+
+        validation_worker.init_shard_worker(1)
+        assert validation_worker.current_submission_id == 1
+        assert validation_worker.os.environ["POLARS_MAX_THREADS"] == "4"
+        thread_mock.assert_called_once_with(
+            target=validation_worker.watch_memory, name="validation-memory-watchdog", daemon=True
+        )
+        assert not warm_mock.called